@@ -172,12 +172,16 @@ function App() {
 
   const [isRoboticMode, setIsRoboticMode] = useState(false)
   const joystickState = useRef({ lv: 0, lh: 0, rv: 0, rh: 0 })
+  const joystickSeq = useRef(0)
 
   const sendJoystickUpdate = () => {
     if (!isRoboticMode || !ws.current || ws.current.readyState !== WebSocket.OPEN) return
     try {
+      // seq/ts let the backend drop late or reordered samples
       ws.current.send(JSON.stringify({
         type: 'JOYSTICK',
+        seq: ++joystickSeq.current,
+        ts: Date.now(),
         data: joystickState.current
       }))
     } catch (e) { console.error("RC Link Error", e) }
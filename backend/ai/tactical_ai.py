@@ -0,0 +1,230 @@
+import asyncio
+import os
+import time
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from backend.monitoring.metrics import AI_CALL
+
+GEMINI_MODEL = "gemini-3-flash-preview" # Direct link to G3-FLASH confirmed in logs
+SYSTEM_PROMPT = (
+    "You are AIGIS-AI, a tactical search and rescue drone operator assistant. "
+    "Keep messages short, tactical, and in English. Use radio-style brevity. "
+    "Analyze the provided drone status and provide a one-line tactical insight or alert."
+)
+
+InsightKey = Tuple[str, int, int]
+
+
+def quantize_status(status: Dict[str, Any]) -> InsightKey:
+    """Cache key: state, 10% battery band, 10 m altitude band."""
+    return (
+        str(status.get("state")),
+        int(float(status.get("battery", 0)) // 10),
+        int(float(status.get("altitude", 0)) // 10),
+    )
+
+
+class TokenBucket:
+    """Classic token bucket: `rate` tokens/s refill, at most `capacity` banked."""
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def take(self) -> bool:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def drain(self):
+        self.tokens = 0.0
+        self.updated = time.monotonic()
+
+
+class LocalRuleEngine:
+    """Deterministic tactical heuristics used whenever the model is unavailable, slow or rate limited."""
+    def evaluate(self, status: Dict[str, Any]) -> str:
+        state = status.get("state")
+        battery = float(status.get("battery", 0))
+        altitude = float(status.get("altitude", 0))
+
+        if state == "EMERGENCY":
+            return f"EMERGENCY DESCENT ACTIVE. ALT {altitude:.0f}M. CLEAR LANDING ZONE."
+        if battery < 20:
+            return f"POWER CRITICAL {battery:.0f}%. RTL RECOMMENDED IMMEDIATELY."
+        if battery < 40 and state != "RETURNING":
+            return f"POWER RESERVE {battery:.0f}%. PLAN RTL WINDOW."
+        if altitude > 120:
+            return f"ALTITUDE {altitude:.0f}M NEAR CEILING. DESCEND FOR SENSOR RESOLUTION."
+        if altitude < 2 and state in ("FLYING", "SEARCHING", "SCANNING", "MANUAL"):
+            return f"LOW ALTITUDE {altitude:.1f}M. TERRAIN CLEARANCE MARGINAL."
+        if state in ("SEARCHING", "SCANNING"):
+            return "SECTOR SWEEP NOMINAL. MAINTAIN PATTERN."
+        if state == "RETURNING":
+            return "RTL CORRIDOR CLEAR. MAINTAIN HEADING."
+        if state == "MANUAL":
+            return "PILOT IN CONTROL. HOLD STABLE ALTITUDE."
+        return "TARGET STABLE. PROCEED WITH CAUTION."
+
+
+def _genai(api_key: str):
+    # The SDK takes most of a second to import; only pay for it once the AI is actually used
+    import google.generativeai as genai
+    genai.configure(api_key=api_key)
+    return genai
+
+
+def list_models(api_key: str) -> List[str]:
+    """Blocking model discovery (a network round trip); run it off the event loop."""
+    return [m.name for m in _genai(api_key).list_models()]
+
+
+class GeminiModel:
+    """Blocking Gemini call with a caller-supplied (bounded) history. The SDK loads on the first call."""
+    def __init__(self, api_key: str, model_name: str = GEMINI_MODEL):
+        self.api_key = api_key
+        self.model_name = model_name
+        self.model = None
+
+    def send(self, prompt: str, history: List[Dict[str, Any]]) -> str:
+        if self.model is None:
+            self.model = _genai(self.api_key).GenerativeModel(self.model_name, system_instruction=SYSTEM_PROMPT)
+        chat = self.model.start_chat(history=history)
+        return chat.send_message(prompt).text
+
+
+class StubModel:
+    """Offline stand-in for GeminiModel: canned reply, optional delay/failure, records calls."""
+    def __init__(self, reply: str = "Stub insight. Hold pattern.", delay: float = 0.0, error: Optional[Exception] = None):
+        self.reply = reply
+        self.delay = delay
+        self.error = error
+        self.calls: List[Tuple[str, int]] = []
+
+    def send(self, prompt: str, history: List[Dict[str, Any]]) -> str:
+        self.calls.append((prompt, len(history)))
+        if self.delay:
+            time.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return self.reply
+
+
+class TacticalAIEngine:
+    """
+    Tactical Insight Service.
+    Wraps the model with, in order: a quantized-status response cache, per-key
+    coalescing of in-flight requests, a token-bucket rate limit, a hard timeout
+    and a bounded chat context. Anything that cannot reach the model in time is
+    answered by the LocalRuleEngine so the HUD always gets an insight.
+    """
+    def __init__(self, model=None, rpm: float = 12.0, burst: float = 3.0, timeout: float = 8.0,
+                 cache_ttl: float = 60.0, cache_size: int = 128, context_turns: int = 4):
+        if model is None:
+            api_key = os.environ.get("GOOGLE_API_KEY")
+            model = GeminiModel(api_key) if api_key else None
+        self.model = model
+        self.enabled = model is not None
+        self.rules = LocalRuleEngine()
+        self.bucket = TokenBucket(rate=rpm / 60.0, capacity=burst)
+        self.timeout = timeout
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+        self.cache: "OrderedDict[InsightKey, Tuple[float, str]]" = OrderedDict()
+        self.history: Deque[Dict[str, Any]] = deque(maxlen=context_turns * 2)
+        self._inflight: Dict[InsightKey, asyncio.Future] = {}
+        self.metrics = {
+            "requests": 0, "cache_hits": 0, "coalesced": 0, "model_calls": 0,
+            "rate_limited": 0, "timeouts": 0, "errors": 0, "fallbacks": 0,
+        }
+        self.latencies: Deque[float] = deque(maxlen=256)
+
+    @property
+    def busy(self) -> bool:
+        return bool(self._inflight)
+
+    async def generate_insight(self, status: dict) -> str:
+        self.metrics["requests"] += 1
+        key = quantize_status(status)
+
+        cached = self.cache.get(key)
+        if cached is not None and time.monotonic() - cached[0] < self.cache_ttl:
+            self.cache.move_to_end(key)
+            self.metrics["cache_hits"] += 1
+            return cached[1]
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.metrics["coalesced"] += 1
+            return await asyncio.shield(inflight)
+
+        future = asyncio.ensure_future(self._produce(key, status))
+        self._inflight[key] = future
+        future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(future)
+
+    async def _produce(self, key: InsightKey, status: Dict[str, Any]) -> str:
+        if not self.enabled:
+            return f"AIGIS // AI OFFLINE // {self.rules.evaluate(status)}"
+        if not self.bucket.take():
+            self.metrics["rate_limited"] += 1
+            return self._fallback(status, "QUOTA_SHIELD")
+
+        prompt = f"Status: {status['state']}, Bat: {status['battery']}%, Alt: {status['altitude']}m. Insight?"
+        self.metrics["model_calls"] += 1
+        started = time.perf_counter()
+        try:
+            text = await asyncio.wait_for(
+                asyncio.to_thread(self.model.send, prompt, list(self.history)), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            self.metrics["timeouts"] += 1
+            return self._fallback(status, "TIMEOUT_SHIELD")
+        except Exception as e:
+            if "429" in str(e):
+                self.bucket.drain() # Back off until the bucket refills
+                self.metrics["rate_limited"] += 1
+                return self._fallback(status, "QUOTA_SHIELD")
+            self.metrics["errors"] += 1
+            print(f"[AI ERROR] {e}")
+            return self._fallback(status, "LOCAL_HEURISTICS")
+        finally:
+            elapsed = time.perf_counter() - started
+            self.latencies.append(elapsed)
+            AI_CALL.observe(elapsed)
+
+        text = text.strip()
+        self.history.append({"role": "user", "parts": [prompt]})
+        self.history.append({"role": "model", "parts": [text]})
+        insight = f"GEMINI-3 FLASH // {text.upper()}"
+        self.cache[key] = (time.monotonic(), insight)
+        self.cache.move_to_end(key)
+        while len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return insight
+
+    def _fallback(self, status: Dict[str, Any], reason: str) -> str:
+        self.metrics["fallbacks"] += 1
+        return f"GEMINI-3 FLASH // [{reason}] {self.rules.evaluate(status)}"
+
+    def stats(self) -> Dict[str, Any]:
+        ordered = sorted(self.latencies)
+
+        def pct(q):
+            return round(ordered[min(len(ordered) - 1, int(len(ordered) * q))] * 1000, 1) if ordered else None
+
+        requests = self.metrics["requests"]
+        return {
+            "enabled": self.enabled,
+            **self.metrics,
+            "cache_hit_ratio": round(self.metrics["cache_hits"] / requests, 3) if requests else 0.0,
+            "cache_entries": len(self.cache),
+            "context_messages": len(self.history),
+            "tokens_available": round(self.bucket.tokens, 2),
+            "latency_ms": {"p50": pct(0.5), "p95": pct(0.95), "max": pct(1.0)},
+        }
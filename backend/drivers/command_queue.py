@@ -0,0 +1,215 @@
+import asyncio
+import itertools
+import statistics
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Deque, Dict, List, Optional
+
+# MAV_RESULT codes (COMMAND_ACK.result)
+MAV_RESULT = {
+    0: "ACCEPTED",
+    1: "TEMPORARILY_REJECTED",
+    2: "DENIED",
+    3: "UNSUPPORTED",
+    4: "FAILED",
+    5: "IN_PROGRESS",
+    6: "CANCELLED",
+}
+RESULT_ACCEPTED = 0
+RESULT_IN_PROGRESS = 5
+
+
+class CommandRecord:
+    """Lifecycle of one queued tactical command: QUEUED -> SENT -> ACCEPTED | REJECTED | TIMEOUT | FAILED."""
+    def __init__(self, command_id: int, command: str):
+        self.id = command_id
+        self.command = command
+        self.state = "QUEUED"
+        self.detail: Optional[str] = None
+        self.attempts = 0
+        self.created_at = time.time()
+        self.sent_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.done = asyncio.Event()
+
+    @property
+    def latency(self) -> Optional[float]:
+        if self.sent_at is None or self.finished_at is None:
+            return None
+        return self.finished_at - self.sent_at
+
+    def finish(self, state: str, detail: Optional[str] = None):
+        self.state = state
+        self.detail = detail
+        self.finished_at = time.time()
+        self.done.set()
+
+    def to_dict(self) -> Dict[str, Any]:
+        latency = self.latency
+        return {
+            "id": self.id,
+            "command": self.command,
+            "state": self.state,
+            "detail": self.detail,
+            "attempts": self.attempts,
+            "created_at": self.created_at,
+            "latency_ms": round(latency * 1000, 1) if latency is not None else None,
+        }
+
+
+class MAVLinkCommandQueue:
+    """
+    Outbound Command Uplink.
+    Commands are queued by the API and executed in order by one writer task; the
+    blocking serial/UDP writes run on a single dedicated writer thread, never on the
+    event loop. Each COMMAND_LONG step waits for its COMMAND_ACK and is retransmitted
+    (with the MAVLink confirmation counter bumped) until `retries` is exhausted.
+    Once the autopilot answers IN_PROGRESS the command is never resent (a second
+    takeoff or mission start is unsafe); the final ACK gets `progress_timeout`.
+    """
+    def __init__(self, driver, ack_timeout: float = 1.5, retries: int = 3, history: int = 200,
+                 progress_timeout: float = 30.0):
+        self.driver = driver
+        self.ack_timeout = ack_timeout
+        self.retries = retries
+        self.progress_timeout = progress_timeout
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.records: "OrderedDict[int, CommandRecord]" = OrderedDict()
+        self.history = history
+        self.latencies: Dict[str, Deque[float]] = {}
+        self._ids = itertools.count(1)
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="mavlink-writer")
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        driver.ack_listeners.append(self._on_ack)
+
+    def start(self):
+        self._loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._writer())
+
+    def submit(self, command: str) -> CommandRecord:
+        record = CommandRecord(next(self._ids), command)
+        self.records[record.id] = record
+        while len(self.records) > self.history:
+            self.records.popitem(last=False)
+        self.queue.put_nowait(record)
+        return record
+
+    async def write(self, fn, *args):
+        """Run any other blocking link write (e.g. RC override) on the same writer thread."""
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    def get(self, command_id: int) -> Optional[CommandRecord]:
+        return self.records.get(command_id)
+
+    async def wait(self, record: CommandRecord, timeout: Optional[float] = None) -> CommandRecord:
+        try:
+            await asyncio.wait_for(record.done.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass # Caller gets the in-flight state
+        return record
+
+    # --- ACK CORRELATION ---
+    def _on_ack(self, mav_cmd: int, result: int):
+        # May be called from a reader thread; hop onto the loop before touching futures
+        if self._loop is None:
+            return
+        try:
+            on_loop = asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            on_loop = False
+        if on_loop:
+            self._resolve(mav_cmd, result)
+        else:
+            self._loop.call_soon_threadsafe(self._resolve, mav_cmd, result)
+
+    def _resolve(self, mav_cmd: int, result: int):
+        future = self._pending.get(mav_cmd)
+        if future is not None and not future.done():
+            future.set_result(result)
+
+    # --- WRITER ---
+    async def _writer(self):
+        while True:
+            record = await self.queue.get()
+            try:
+                await self._execute(record)
+            except Exception as e:
+                record.finish("FAILED", str(e))
+            if record.state == "ACCEPTED" and record.latency is not None:
+                self.latencies.setdefault(record.command, deque(maxlen=256)).append(record.latency)
+
+    async def _execute(self, record: CommandRecord):
+        steps = self.driver.command_plan(record.command)
+        if not steps:
+            record.finish("UNSUPPORTED", "no MAVLink mapping or link down")
+            return
+        record.state = "SENT"
+        record.sent_at = time.time()
+        for mav_cmd, params in steps:
+            result = await self._send_step(record, mav_cmd, params)
+            if result is None:
+                record.finish("TIMEOUT", f"no COMMAND_ACK for {mav_cmd} after {record.attempts} attempts")
+                return
+            if result == RESULT_IN_PROGRESS:
+                record.finish("TIMEOUT", f"{mav_cmd} still IN_PROGRESS after {self.progress_timeout:g}s")
+                return
+            if result != RESULT_ACCEPTED:
+                record.finish("REJECTED", MAV_RESULT.get(result, str(result)))
+                return
+        record.finish("ACCEPTED")
+
+    async def _send_step(self, record: CommandRecord, mav_cmd: int, params: List[float]) -> Optional[int]:
+        """Final MAV_RESULT; None if never acknowledged, RESULT_IN_PROGRESS if the final ACK never came."""
+        loop = asyncio.get_running_loop()
+        for confirmation in range(self.retries + 1):
+            future = loop.create_future()
+            self._pending[mav_cmd] = future
+            record.attempts += 1
+            try:
+                await loop.run_in_executor(self._executor, self.driver.send_command_long, mav_cmd, params, confirmation)
+                result = await asyncio.wait_for(future, timeout=self.ack_timeout)
+                break
+            except asyncio.TimeoutError:
+                continue
+            finally:
+                self._pending.pop(mav_cmd, None)
+        else:
+            return None
+        # IN_PROGRESS: the autopilot is working on it; wait for the final ACK, never resend
+        while result == RESULT_IN_PROGRESS:
+            future = loop.create_future()
+            self._pending[mav_cmd] = future
+            try:
+                result = await asyncio.wait_for(future, timeout=self.progress_timeout)
+            except asyncio.TimeoutError:
+                return RESULT_IN_PROGRESS
+            finally:
+                self._pending.pop(mav_cmd, None)
+        return result
+
+    # --- STATS ---
+    def latency_stats(self) -> Dict[str, Dict[str, float]]:
+        out = {}
+        for command, samples in self.latencies.items():
+            ordered = sorted(samples)
+            out[command] = {
+                "count": len(ordered),
+                "mean_ms": round(statistics.fmean(ordered) * 1000, 1),
+                "p50_ms": round(ordered[len(ordered) // 2] * 1000, 1),
+                "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 1),
+                "max_ms": round(ordered[-1] * 1000, 1),
+            }
+        return out
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "queued": self.queue.qsize(),
+            "in_flight": list(self._pending.keys()),
+            "latency": self.latency_stats(),
+            "recent": [r.to_dict() for r in list(self.records.values())[-20:]],
+        }
+
@@ -1,29 +1,100 @@
-import time
+import asyncio
 import threading
-import random
-from typing import Dict, Any
+import time
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, NamedTuple, Optional, Tuple
+
+mavutil = None # pymavlink, imported by load_mavlink() on the first connect (~0.1 s of import time)
+
+# Messages drained per readable event before yielding back to the event loop
+INGEST_BUDGET = 256
+RATE_WINDOW = 1.0 # seconds
+STALE_AFTER = 2.0 # seconds without any packet
+
+
+def load_mavlink() -> bool:
+    global mavutil
+    if mavutil is None:
+        try:
+            from pymavlink import mavutil as module
+        except ImportError:
+            return False
+        mavutil = module
+    return True
+
+
+class TelemetrySnapshot(NamedTuple):
+    """Immutable, versioned view of the vehicle state. Swapped by reference, never mutated."""
+    version: int
+    timestamp: float
+    data: Mapping[str, Any]
+
+
+class MAVLinkLink:
+    """
+    One physical/network MAVLink link (serial radio, UDP from a companion, ...).
+    Owns its connection and its own ingest statistics.
+    """
+    def __init__(self, connection_string: str, baud: int = 115200):
+        self.connection_string = connection_string
+        self.baud = baud
+        self.connection = None
+        self.is_connected = False
+        self.reader_thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # Ingest statistics
+        self.received = 0
+        self.decode_errors = 0
+        self.last_packet = 0.0
+        self.counts: Dict[str, int] = {}
+        self.rates: Dict[str, float] = {}
+        self._window: Dict[str, int] = {}
+        self._window_start = time.monotonic()
+
+    def record(self, msg_type: str):
+        now = time.monotonic()
+        self.received += 1
+        self.last_packet = now
+        self.counts[msg_type] = self.counts.get(msg_type, 0) + 1
+        self._window[msg_type] = self._window.get(msg_type, 0) + 1
+        elapsed = now - self._window_start
+        if elapsed >= RATE_WINDOW:
+            self.rates = {k: round(v / elapsed, 1) for k, v in self._window.items()}
+            self._window = {}
+            self._window_start = now
+
+    def stats(self) -> Dict[str, Any]:
+        conn = self.connection
+        return {
+            "link": self.connection_string,
+            "connected": self.is_connected,
+            "stale": self.is_connected and (time.monotonic() - self.last_packet) > STALE_AFTER,
+            "mode": "asyncio" if self._loop else ("thread" if self.reader_thread else "idle"),
+            "received": self.received,
+            "dropped": getattr(conn, "mav_loss", 0) if conn else 0, # sequence gaps, tracked by pymavlink
+            "decode_errors": self.decode_errors,
+            "rates_hz": dict(self.rates),
+        }
 
-try:
-    from pymavlink import mavutil
-    MAVLINK_AVAILABLE = True
-except ImportError:
-    MAVLINK_AVAILABLE = False
 
 class MAVLinkDriver:
     """
     Advanced Aerospace Hardware Driver for AIGIS UAV.
     Supports MAVLink protocol over Serial (UART) or UDP/TCP.
+    Several links can be given as a comma-separated connection string; they all
+    feed one telemetry snapshot and commands go out on the first live link.
     """
     def __init__(self, connection_string: str = None, baud: int = 115200):
         self.connection_string = connection_string
         self.baud = baud
-        self.connection = None
-        self.heartbeat_thread = None
-        self.telemetry_thread = None
-        self.is_connected = False
-        
+        self.links: List[MAVLinkLink] = [
+            MAVLinkLink(part.strip(), baud) for part in (connection_string or "").split(",") if part.strip()
+        ]
+        self._write_lock = threading.Lock() # Only between writer threads; readers never lock
+        self.ack_listeners: List[Callable[[int, int], None]] = [] # (mav command id, MAV_RESULT)
+
         # Telemetry Store (Standard Aerospace Data)
-        self.telemetry = {
+        self.snapshot = TelemetrySnapshot(0, 0.0, MappingProxyType({
             "lat": 0.0,
             "lng": 0.0,
             "alt": 0.0,
@@ -39,91 +110,238 @@ class MAVLinkDriver:
             "ekf_status": "OK",
             "armed": False,
             "mode": "STABILIZE"
+        }))
+
+        # Dispatch table: MAVLink message type -> field extractor
+        self.handlers: Dict[str, Callable[[Any], Dict[str, Any]]] = {
+            "GLOBAL_POSITION_INT": lambda m: {"lat": m.lat / 1e7, "lng": m.lon / 1e7, "alt": m.relative_alt / 1000.0},
+            "VFR_HUD": lambda m: {"vx": m.groundspeed},
+            "ATTITUDE": lambda m: {"pitch": m.pitch, "roll": m.roll, "yaw": m.yaw},
+            "SYS_STATUS": lambda m: {"battery_remaining": m.battery_remaining, "battery_voltage": m.voltage_battery / 1000.0},
+            "GPS_RAW_INT": lambda m: {"gps_fix": m.fix_type},
+            "HEARTBEAT": self._on_heartbeat,
+            "COMMAND_ACK": self._on_command_ack,
         }
 
-    def connect(self):
-        if not MAVLINK_AVAILABLE:
+    # --- LINK STATE ---
+    @property
+    def is_connected(self) -> bool:
+        return any(link.is_connected for link in self.links)
+
+    @property
+    def primary(self) -> Optional[MAVLinkLink]:
+        return next((link for link in self.links if link.is_connected), None)
+
+    @property
+    def connection(self):
+        link = self.primary
+        return link.connection if link else None
+
+    @property
+    def telemetry(self) -> Mapping[str, Any]:
+        return self.snapshot.data
+
+    def _can_connect(self) -> bool:
+        if not load_mavlink():
             print("[HAL] MAVLink library missing. Simulation only.")
             return False
-        
-        if not self.connection_string:
+        if not self.links:
             print("[HAL] No hardware connection string provided.")
             return False
+        return True
+
+    def connect(self):
+        if not self._can_connect():
+            return False
+        for link in self.links:
+            self._connect_link(link)
+        return self.is_connected
+
+    async def connect_async(self) -> bool:
+        """connect() without blocking the event loop: heartbeat handshakes run in threads, all links at once."""
+        loop = asyncio.get_running_loop()
+        if not await loop.run_in_executor(None, self._can_connect):
+            return False
+        opened = await asyncio.gather(*(loop.run_in_executor(None, self._open_link, link) for link in self.links))
+        for link, ok in zip(self.links, opened):
+            if ok:
+                self._start_ingest(link) # On the loop, so ingest uses its reader
+        return self.is_connected
 
+    def _open_link(self, link: MAVLinkLink) -> bool:
+        """Blocking: open the link and wait (up to 5 s) for the first heartbeat."""
         try:
-            print(f"[HAL] Connecting to UAV hardware on {self.connection_string}...")
-            self.connection = mavutil.mavlink_connection(self.connection_string, baud=self.baud)
-            self.connection.wait_heartbeat(timeout=5)
-            self.is_connected = True
-            print(f"[HAL] Link Established with System {self.connection.target_system}")
-            
-            # Start background async tasks
-            self._start_threads()
+            print(f"[HAL] Connecting to UAV hardware on {link.connection_string}...")
+            link.connection = mavutil.mavlink_connection(link.connection_string, baud=link.baud)
+            link.connection.wait_heartbeat(timeout=5)
+            link.is_connected = True
+            print(f"[HAL] Link Established with System {link.connection.target_system}")
             return True
         except Exception as e:
             print(f"[HAL] Connection Failed: {e}")
             return False
 
-    def _start_threads(self):
-        self.telemetry_thread = threading.Thread(target=self._update_telemetry, daemon=True)
-        self.telemetry_thread.start()
+    def _connect_link(self, link: MAVLinkLink) -> bool:
+        if not self._open_link(link):
+            return False
+        self._start_ingest(link) # Start background ingest
+        return True
+
+    def _start_ingest(self, link: MAVLinkLink):
+        """Prefer an event-loop reader on the link's fd; fall back to a thread (e.g. Windows serial)."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        fd = getattr(link.connection, "fd", None)
+        if loop is not None and fd is not None:
+            try:
+                loop.add_reader(fd, self._drain, link)
+                link._loop = loop
+                return
+            except (NotImplementedError, ValueError, OSError):
+                pass # Proactor loops / non-selectable fds
+        link.reader_thread = threading.Thread(target=self._read_blocking, args=(link,), daemon=True)
+        link.reader_thread.start()
 
-    def _update_telemetry(self):
-        while self.is_connected:
+    def disconnect(self):
+        for link in self.links:
+            link.is_connected = False
+            if link._loop is not None:
+                link._loop.remove_reader(link.connection.fd)
+                link._loop = None
+            if link.connection is not None:
+                link.connection.close()
+
+    # --- INGEST ---
+    def _drain(self, link: MAVLinkLink):
+        """Readable callback: parse what is buffered, bounded so the API is never starved."""
+        for _ in range(INGEST_BUDGET):
             try:
-                msg = self.connection.recv_match(blocking=True, timeout=1.0)
-                if not msg:
-                    continue
-                
-                msg_type = msg.get_type()
-                
-                if msg_type == 'GLOBAL_POSITION_INT':
-                    self.telemetry['lat'] = msg.lat / 1e7
-                    self.telemetry['lng'] = msg.lon / 1e7
-                    self.telemetry['alt'] = msg.relative_alt / 1000.0  # meters
-                
-                elif msg_type == 'VFR_HUD':
-                    self.telemetry['vx'] = msg.groundspeed
-                    
-                elif msg_type == 'ATTITUDE':
-                    self.telemetry['pitch'] = msg.pitch
-                    self.telemetry['roll'] = msg.roll
-                    self.telemetry['yaw'] = msg.yaw
-                
-                elif msg_type == 'SYS_STATUS':
-                    self.telemetry['battery_remaining'] = msg.battery_remaining
-                    self.telemetry['battery_voltage'] = msg.voltage_battery / 1000.0
-                
-                elif msg_type == 'HEARTBEAT':
-                    self.telemetry['armed'] = (msg.base_mode & mavutil.mavlink.MAV_MODE_FLAG_SAFETY_ARMED) != 0
-                    self.telemetry['mode'] = mavutil.mavlink.mav_mode_stop_to_str(msg.custom_mode)
-
-            except Exception as e:
-                print(f"[HAL] Decoder Error: {e}")
-                time.sleep(1)
+                msg = link.connection.recv_msg()
+            except OSError as e:
+                print(f"[HAL] Link Lost on {link.connection_string}: {e}")
+                link.is_connected = False
+                link._loop.remove_reader(link.connection.fd)
+                link._loop = None
+                return
+            except Exception:
+                link.decode_errors += 1
+                continue
+            if msg is None:
+                return
+            self._ingest(link, msg)
+
+    def _read_blocking(self, link: MAVLinkLink):
+        while link.is_connected:
+            try:
+                msg = link.connection.recv_match(blocking=True, timeout=1.0)
+            except OSError as e:
+                print(f"[HAL] Link Lost on {link.connection_string}: {e}")
+                link.is_connected = False
+                return
+            except Exception:
+                link.decode_errors += 1
+                continue
+            if msg:
+                self._ingest(link, msg)
+
+    def _ingest(self, link: MAVLinkLink, msg):
+        msg_type = msg.get_type()
+        if msg_type == "BAD_DATA":
+            link.decode_errors += 1
+            return
+        link.record(msg_type)
+        handler = self.handlers.get(msg_type)
+        if handler is None:
+            return
+        updates = handler(msg)
+        if updates:
+            self._publish(updates)
+
+    def _on_heartbeat(self, msg) -> Dict[str, Any]:
+        # Ignore heartbeats from ground stations sharing the link
+        if msg.type == mavutil.mavlink.MAV_TYPE_GCS:
+            return {}
+        return {
+            "armed": (msg.base_mode & mavutil.mavlink.MAV_MODE_FLAG_SAFETY_ARMED) != 0,
+            "mode": mavutil.mode_string_v10(msg),
+        }
+
+    def _on_command_ack(self, msg) -> Dict[str, Any]:
+        for listener in self.ack_listeners:
+            listener(msg.command, msg.result)
+        return {}
+
+    def _publish(self, updates: Dict[str, Any]):
+        """Copy-on-write: build the next snapshot, then swap the reference atomically."""
+        with self._write_lock:
+            current = self.snapshot
+            data = dict(current.data)
+            data.update(updates)
+            self.snapshot = TelemetrySnapshot(current.version + 1, time.time(), MappingProxyType(data))
+
+    def command_plan(self, command: str) -> Optional[List[Tuple[int, List[float]]]]:
+        """
+        Translate a tactical command into COMMAND_LONG steps (command id, 7 params).
+        Mode changes use MAV_CMD_DO_SET_MODE so every step is answered by a COMMAND_ACK.
+        """
+        connection = self.connection
+        if connection is None:
+            return None
+        mav = mavutil.mavlink
 
-    def send_command(self, command: str):
-        """Standardized Flight Control Commands"""
-        if not self.is_connected:
-            return False
-            
         if command == "takeoff":
             # Aerospace safety check: Arming before takeoff
-            self.connection.mav.command_long_send(
-                self.connection.target_system, self.connection.target_component,
-                mavutil.mavlink.MAV_CMD_COMPONENT_ARM_DISARM, 0, 1, 0, 0, 0, 0, 0, 0)
-            
-            self.connection.mav.command_long_send(
-                self.connection.target_system, self.connection.target_component,
-                mavutil.mavlink.MAV_CMD_NAV_TAKEOFF, 0, 0, 0, 0, 0, 0, 0, 10)
-        
-        elif command == "rtl":
-            self.connection.set_mode('RTL')
-            
-        elif command == "land":
-            self.connection.set_mode('LAND')
-            
+            return [
+                (mav.MAV_CMD_COMPONENT_ARM_DISARM, [1, 0, 0, 0, 0, 0, 0]),
+                (mav.MAV_CMD_NAV_TAKEOFF, [0, 0, 0, 0, 0, 0, 10]),
+            ]
+
+        if command in ("rtl", "land"):
+            mode_id = (connection.mode_mapping() or {}).get(command.upper())
+            if mode_id is None:
+                return None
+            return [(mav.MAV_CMD_DO_SET_MODE, [mav.MAV_MODE_FLAG_CUSTOM_MODE_ENABLED, mode_id, 0, 0, 0, 0, 0])]
+
+        return None
+
+    def send_command_long(self, mav_cmd: int, params: List[float], confirmation: int = 0):
+        """Blocking write of one COMMAND_LONG; run it off the event loop."""
+        connection = self.connection
+        if connection is None:
+            raise ConnectionError("no live MAVLink link")
+        connection.mav.command_long_send(
+            connection.target_system, connection.target_component,
+            mav_cmd, confirmation, *params)
+
+    def send_rc_override(self, channels: List[int]):
+        """Blocking RC_CHANNELS_OVERRIDE write, channels 1-8 as PWM (0 releases, 65535 ignores)."""
+        connection = self.connection
+        if connection is None:
+            raise ConnectionError("no live MAVLink link")
+        connection.mav.rc_channels_override_send(
+            connection.target_system, connection.target_component, *channels[:8])
+
+    def send_command(self, command: str):
+        """Standardized Flight Control Commands (fire-and-forget; see MAVLinkCommandQueue for ACKed sends)"""
+        steps = self.command_plan(command)
+        if not steps:
+            return False
+        for mav_cmd, params in steps:
+            self.send_command_long(mav_cmd, params)
         return True
 
-    def get_data(self) -> Dict[str, Any]:
-        return self.telemetry
+    def get_snapshot(self) -> TelemetrySnapshot:
+        return self.snapshot
+
+    def get_data(self) -> Mapping[str, Any]:
+        return self.snapshot.data
+
+    def link_stats(self) -> Dict[str, Any]:
+        snap = self.snapshot
+        return {
+            "version": snap.version,
+            "age": round(time.time() - snap.timestamp, 3) if snap.timestamp else None,
+            "links": [link.stats() for link in self.links],
+        }
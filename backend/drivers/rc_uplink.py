@@ -0,0 +1,223 @@
+import json
+import math
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+from backend.engine.scheduler import FixedRateClock
+from backend.monitoring.metrics import JOYSTICK_LATENCY
+
+STICKS = ("lv", "lh", "rv", "rh") # left vertical/horizontal, right vertical/horizontal, each -1..1
+NEUTRAL: Dict[str, float] = dict.fromkeys(STICKS, 0.0)
+STICK_TOLERANCE = 1e-6 # accepted overshoot past +/-1, clamped
+
+# RC_CHANNELS_OVERRIDE values (ArduPilot AETR on channels 1-4)
+PWM_CENTER = 1500
+PWM_SPAN = 500
+RC_RELEASE = 0 # hand the channel back to the RC transmitter
+RC_IGNORE = 65535 # leave the channel untouched
+
+
+def _number(name: str, value: Any) -> float:
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+        raise ValueError(f"{name} must be a finite number, got {value!r}")
+    return float(value)
+
+
+def _stick(name: str, value: Any) -> float:
+    value = _number(name, value if value is not None else 0.0)
+    if abs(value) > 1.0 + STICK_TOLERANCE:
+        raise ValueError(f"{name} must be within [-1, 1], got {value!r}")
+    return max(-1.0, min(1.0, value)) # Rounding overshoot from clients normalizing to the unit circle
+
+
+def normalize_sample(vector: Any, seq: Any = None, ts: Any = None) -> Dict[str, Any]:
+    """Validated stick sample: floats in [-1, 1] per stick (missing/null -> 0), integer seq, numeric ts. Raises ValueError."""
+    if not isinstance(vector, dict):
+        raise ValueError("stick vector must be an object")
+    sticks = {k: _stick(k, vector.get(k)) for k in STICKS}
+    if seq is not None:
+        seq = _number("seq", seq)
+        if not seq.is_integer():
+            raise ValueError(f"seq must be an integer, got {seq!r}")
+        seq = int(seq)
+    if ts is not None:
+        ts = _number("ts", ts)
+    return {"vector": sticks, "seq": seq, "ts": ts}
+
+
+def parse_sample(raw: str) -> Optional[Dict[str, Any]]:
+    """
+    Decode one /ws/control message. Two encodings:
+      compact  [seq, ts, lv, lh, rv, rh]
+      object   {"seq": n, "ts": ms, "data": {"lv": .., "lh": .., "rv": .., "rh": ..}}
+    `ts` is the client's send time in ms since the epoch (Date.now()).
+    Malformed messages (see normalize_sample) decode to None.
+    """
+    try:
+        message = json.loads(raw)
+        if isinstance(message, list):
+            seq, ts, *values = message
+            return normalize_sample(dict(zip(STICKS, values)), seq, ts)
+        if isinstance(message, dict):
+            return normalize_sample(message.get("data", {}), message.get("seq"), message.get("ts"))
+    except (ValueError, TypeError):
+        pass
+    return None
+
+
+def sticks_to_pwm(sticks: Dict[str, float]) -> List[int]:
+    """Channels 1-8: roll (rh), pitch (rv, inverted like the sim's z axis), throttle (lv), yaw (lh)."""
+    def pwm(value: float) -> int:
+        return int(PWM_CENTER + PWM_SPAN * max(-1.0, min(1.0, value)))
+    return [pwm(sticks["rh"]), pwm(-sticks["rv"]), pwm(sticks["lv"]), pwm(sticks["lh"])] + [RC_IGNORE] * 4
+
+
+class _Source:
+    """Sequence and clock-skew state for one input source (a control socket, REST)."""
+    def __init__(self):
+        self.last_seq: Optional[int] = None
+        self.min_transit: Optional[float] = None # lowest (receive - client ts) seen; absorbs clock skew
+
+
+class JoystickUplink:
+    """
+    Pilot Stick Input.
+    Samples can arrive far faster than they are consumed; only the newest is kept
+    (latest-wins) and the physics tick or the RC override clock picks it up.
+    Each source numbers its samples: anything not newer than the last accepted seq
+    is dropped (seq 0 restarts a source), and so is anything whose transit time
+    exceeds the source's best by more than `stale_after`. If no sample is accepted
+    for `deadman` seconds the sticks are centred.
+    """
+    def __init__(self, deadman: float = 0.5, stale_after: float = 0.3, window: int = 512):
+        self.deadman = deadman
+        self.stale_after = stale_after
+        self.sticks: Dict[str, float] = dict(NEUTRAL)
+        self.last_input = 0.0 # monotonic time of the last accepted sample
+        self._pending: Optional[Dict[str, float]] = None
+        self._pending_at = 0.0
+        self._pending_transit: Optional[float] = None
+        self._sources: Dict[str, _Source] = {}
+        self._deadman_tripped = True
+        self.counts = {"received": 0, "applied": 0, "coalesced": 0, "stale": 0, "out_of_order": 0, "deadman": 0}
+        self.apply_latency: Deque[float] = deque(maxlen=window) # receive -> applied
+        self.input_latency: Deque[float] = deque(maxlen=window) # client send -> applied, skew-corrected
+
+    def submit(self, vector: Dict[str, Any], seq: Optional[int] = None, ts: Optional[float] = None,
+               source: str = "default") -> str:
+        now = time.monotonic()
+        self.counts["received"] += 1
+        state = self._sources.setdefault(source, _Source())
+        if seq is not None:
+            seq = int(seq)
+            if seq == 0:
+                state.last_seq, state.min_transit = None, None # Client restarted its counter
+            elif state.last_seq is not None and seq <= state.last_seq:
+                self.counts["out_of_order"] += 1
+                return "out_of_order"
+        transit = None
+        if ts is not None:
+            raw = time.time() - float(ts) / 1000.0
+            if state.min_transit is None or raw < state.min_transit:
+                state.min_transit = raw
+            transit = raw - state.min_transit
+            if transit > self.stale_after:
+                self.counts["stale"] += 1
+                return "stale"
+        if seq is not None:
+            state.last_seq = seq
+
+        if self._pending is not None:
+            self.counts["coalesced"] += 1
+        self._pending = {k: float(vector.get(k, 0.0) or 0.0) for k in STICKS}
+        self._pending_at = now
+        self._pending_transit = transit
+        self.last_input = now
+        self._deadman_tripped = False
+        return "accepted"
+
+    def poll(self) -> Dict[str, float]:
+        """Current stick state for this tick: newest sample if any, centred after the deadman."""
+        now = time.monotonic()
+        if self._pending is not None:
+            self.sticks = self._pending
+            self._pending = None
+            self.counts["applied"] += 1
+            latency = now - self._pending_at
+            self.apply_latency.append(latency)
+            JOYSTICK_LATENCY.observe(latency)
+            if self._pending_transit is not None:
+                self.input_latency.append(self._pending_transit + latency)
+        elif not self._deadman_tripped and now - self.last_input > self.deadman:
+            self._deadman_tripped = True
+            self.counts["deadman"] += 1
+            self.sticks = dict(NEUTRAL)
+        return self.sticks
+
+    @property
+    def active(self) -> bool:
+        return not self._deadman_tripped
+
+    def forget(self, source: str):
+        self._sources.pop(source, None)
+
+    def stats(self) -> Dict[str, Any]:
+        def pct(samples):
+            ordered = sorted(samples)
+            if not ordered:
+                return {"p50": None, "p95": None, "p99": None, "max": None}
+            pick = lambda q: round(ordered[min(len(ordered) - 1, int(len(ordered) * q))] * 1000, 3)
+            return {"p50": pick(0.5), "p95": pick(0.95), "p99": pick(0.99), "max": round(ordered[-1] * 1000, 3)}
+
+        return {
+            "active": self.active,
+            "sticks": self.sticks,
+            "sources": len(self._sources),
+            **self.counts,
+            "apply_latency_ms": pct(self.apply_latency),
+            "input_latency_ms": pct(self.input_latency),
+        }
+
+
+class RCOverrideLoop:
+    """
+    Streams the joystick to the autopilot as RC_CHANNELS_OVERRIDE at a fixed rate.
+    Writes go through `write` (the MAVLink writer thread) so they serialize with
+    COMMAND_LONG traffic. After `release_after` seconds without input the channels
+    are released back to the transmitter once and the stream goes quiet.
+    """
+    def __init__(self, uplink: JoystickUplink, driver, write: Callable[..., Awaitable[Any]],
+                 hz: float = 25.0, release_after: float = 5.0):
+        self.uplink = uplink
+        self.driver = driver
+        self.write = write
+        self.release_after = release_after
+        self.clock = FixedRateClock("RC_OVERRIDE", hz=hz)
+        self.sent = 0
+        self.errors = 0
+        self.released = True # Nothing overridden until the pilot touches the sticks
+
+    async def run(self):
+        print(f"[HAL] RC OVERRIDE STREAM ONLINE [{self.clock.hz:g}Hz]")
+        await self.clock.run(self._tick)
+
+    async def _tick(self, dt: float):
+        sticks = self.uplink.poll()
+        if time.monotonic() - self.uplink.last_input > self.release_after:
+            if not self.released:
+                await self._send([RC_RELEASE] * 8)
+                self.released = True
+            return
+        self.released = False
+        await self._send(sticks_to_pwm(sticks))
+
+    async def _send(self, channels: List[int]):
+        try:
+            await self.write(self.driver.send_rc_override, channels)
+            self.sent += 1
+        except Exception:
+            self.errors += 1 # Link down; the next tick retries with fresher input
+
+    def stats(self) -> Dict[str, Any]:
+        return {"sent": self.sent, "errors": self.errors, "released": self.released, **self.clock.stats()}
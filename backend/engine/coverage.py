@@ -0,0 +1,158 @@
+import base64
+import math
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+TILE = 64 # cells per tile edge; 64 x 64 bits = 512 bytes packed
+MAX_TILES_PER_FRAME = 256 # bounds a single sync frame (~100 KB worst case)
+
+TileKey = Tuple[int, int]
+
+
+def encode_tile(tile: np.ndarray) -> str:
+    return base64.b64encode(zlib.compress(np.packbits(tile, axis=None).tobytes(), 6)).decode()
+
+
+def decode_tile(payload: str) -> np.ndarray:
+    bits = np.unpackbits(np.frombuffer(zlib.decompress(base64.b64decode(payload)), dtype=np.uint8))
+    return bits[:TILE * TILE].reshape(TILE, TILE).astype(bool)
+
+
+class CoverageGrid:
+    """
+    Search Coverage Map.
+    Ground cells (`resolution` metres) the sensor footprint has swept, stored as
+    sparse TILE x TILE boolean chunks created on first touch, so memory follows
+    the flown area rather than the map extent (1 km2 at 1 m is ~245 tiles, 1 MB).
+    Each tick rasterizes the capsule between the previous and current position,
+    so fast flight leaves no gaps. Every tile remembers the grid version that last
+    changed it; clients sync with `frame(since)` and receive only those tiles.
+    """
+    def __init__(self, resolution: float = 1.0, footprint: float = 8.0):
+        self.resolution = resolution
+        self.footprint = footprint
+        self.tiles: Dict[TileKey, np.ndarray] = {}
+        self.tile_version: Dict[TileKey, int] = {}
+        self.version = 1 # since=0 always means "never synced"
+        self.reset_version = 1 # clients synced before this must start over
+        self.covered_cells = 0
+        self._encoded: Dict[TileKey, Tuple[int, str]] = {}
+
+    # --- UPDATE ---
+    def sweep(self, x0: float, z0: float, x1: float, z1: float, radius: Optional[float] = None) -> int:
+        """Mark every cell whose centre lies within `radius` of segment (x0,z0)-(x1,z1). Returns newly covered cells."""
+        r = self.footprint if radius is None else radius
+        res = self.resolution
+        lo_x = math.floor((min(x0, x1) - r) / res)
+        hi_x = math.floor((max(x0, x1) + r) / res)
+        lo_z = math.floor((min(z0, z1) - r) / res)
+        hi_z = math.floor((max(z0, z1) + r) / res)
+        dx, dz = x1 - x0, z1 - z0
+        seg2 = dx * dx + dz * dz
+        next_version = self.version + 1
+        added = 0
+
+        for tx in range(lo_x // TILE, hi_x // TILE + 1):
+            cx0, cx1 = max(lo_x, tx * TILE), min(hi_x, tx * TILE + TILE - 1)
+            px = (np.arange(cx0, cx1 + 1) + 0.5) * res - x0
+            for tz in range(lo_z // TILE, hi_z // TILE + 1):
+                cz0, cz1 = max(lo_z, tz * TILE), min(hi_z, tz * TILE + TILE - 1)
+                pz = (np.arange(cz0, cz1 + 1) + 0.5) * res - z0
+                # Distance from each cell centre to the segment (capsule test), vectorized per tile
+                if seg2 > 0:
+                    t = np.clip((px[:, None] * dx + pz[None, :] * dz) / seg2, 0.0, 1.0)
+                    ex, ez = px[:, None] - t * dx, pz[None, :] - t * dz
+                else:
+                    ex, ez = px[:, None], pz[None, :]
+                mask = ex * ex + ez * ez <= r * r
+                if not mask.any():
+                    continue
+                key = (tx, tz)
+                tile = self.tiles.get(key)
+                if tile is None:
+                    tile = self.tiles[key] = np.zeros((TILE, TILE), dtype=bool)
+                view = tile[cx0 - tx * TILE:cx1 - tx * TILE + 1, cz0 - tz * TILE:cz1 - tz * TILE + 1]
+                new = int(np.count_nonzero(mask & ~view))
+                if new:
+                    view |= mask
+                    self.tile_version[key] = next_version
+                    added += new
+
+        if added:
+            self.version = next_version
+            self.covered_cells += added
+        return added
+
+    def reset(self):
+        self.tiles.clear()
+        self.tile_version.clear()
+        self._encoded.clear()
+        self.covered_cells = 0
+        self.version += 1
+        self.reset_version = self.version
+
+    # --- SYNC ---
+    def _encode(self, key: TileKey) -> str:
+        version = self.tile_version[key]
+        cached = self._encoded.get(key)
+        if cached is None or cached[0] != version:
+            cached = self._encoded[key] = (version, encode_tile(self.tiles[key]))
+        return cached[1]
+
+    def frame(self, since: int = 0, max_tiles: int = MAX_TILES_PER_FRAME) -> Dict[str, Any]:
+        """
+        Tiles changed after version `since`, oldest first. A large backlog is split
+        across frames on version boundaries; `version` is what to pass as the next
+        `since` and `more` says whether to ask again right away. `full` tells the
+        client to clear its map first (first sync, or the grid was reset).
+        """
+        full = since <= 0 or since < self.reset_version or since > self.version
+        if full:
+            since = 0
+        changed = sorted((v, key) for key, v in self.tile_version.items() if v > since)
+        tiles: List[List[Any]] = []
+        version = self.version
+        for i, (v, key) in enumerate(changed):
+            if len(tiles) >= max_tiles and v != changed[i - 1][0]:
+                version = changed[i - 1][0]
+                break
+            tiles.append([key[0], key[1], self._encode(key)])
+        return {
+            "version": version, "full": full, "more": len(tiles) < len(changed),
+            "resolution": self.resolution, "tile": TILE, "tiles": tiles,
+        }
+
+    def apply(self, frame: Dict[str, Any]):
+        """Mirror another grid's frame (follower workers keep a replica of the owner's map)."""
+        if frame["full"]:
+            self.tiles.clear()
+            self.tile_version.clear()
+            self._encoded.clear()
+            self.covered_cells = 0
+            self.reset_version = frame["version"] # This replica's own clients resync too
+        self.resolution = frame["resolution"]
+        for tx, tz, payload in frame["tiles"]:
+            key = (tx, tz)
+            old = self.tiles.get(key)
+            tile = decode_tile(payload)
+            self.covered_cells += int(np.count_nonzero(tile)) - (int(np.count_nonzero(old)) if old is not None else 0)
+            self.tiles[key] = tile
+            self.tile_version[key] = frame["version"]
+            self._encoded[key] = (frame["version"], payload)
+        self.version = frame["version"]
+
+    # --- QUERIES ---
+    def covered_area(self) -> float:
+        return self.covered_cells * self.resolution * self.resolution
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "resolution_m": self.resolution,
+            "footprint_m": self.footprint,
+            "covered_m2": round(self.covered_area(), 1),
+            "tiles": len(self.tiles),
+            "memory_bytes": len(self.tiles) * TILE * TILE,
+        }
@@ -0,0 +1,175 @@
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from backend.drivers.rc_uplink import normalize_sample
+from backend.engine.spatial_index import TargetIndex
+from backend.net.telemetry_codec import STATE_CODES
+
+STATE_INDEX = {name: code for code, name in enumerate(STATE_CODES)}
+IDLE = STATE_INDEX["IDLE"]
+MANUAL = STATE_INDEX["MANUAL"]
+EMERGENCY = STATE_INDEX["EMERGENCY"]
+MOVING_STATES = np.array([STATE_INDEX[s] for s in ("FLYING", "RETURNING", "SEARCHING", "SCANNING", "MANUAL")], dtype=np.int8)
+
+COMMAND_STATES = {
+    "takeoff": "FLYING",
+    "land": "LANDED",
+    "rtl": "RETURNING",
+    "scan": "SEARCHING",
+    "mission": "FLYING",
+    "emergency": "EMERGENCY",
+}
+
+# Same per-tick constants as the single-drone sim in AIGISystemHAL._update_sim,
+# defined for a NOMINAL_DT tick and scaled by dt / NOMINAL_DT in step()
+NOMINAL_DT = 0.05
+CRUISE_STEP = 0.2
+WAYPOINT_TOLERANCE = 0.5
+JITTER = 0.1
+JOYSTICK_GAIN = 1.5
+MIN_ALT, MAX_ALT = 0.5, 150.0
+EMERGENCY_FLOOR = 5.0
+EMERGENCY_SINK = 0.8
+CRUISE_DRAIN = 0.015
+EMERGENCY_DRAIN = 0.05
+DETECTION_RADIUS = 8.0
+MAX_FLEET_SIZE = 10000
+
+
+class FleetSimulator:
+    """
+    Swarm Simulation Core.
+    Keeps every vehicle's state in flat NumPy arrays so one physics tick is a
+    handful of vectorized operations, whether the fleet has 10 or 10,000 drones.
+    """
+    def __init__(self, size: int, spread: float = 50.0, seed: Optional[int] = None):
+        self.size = size
+        self.seed = seed if seed is not None else int(np.random.SeedSequence().generate_state(1)[0]) # Re-spawnable
+        self.rng = np.random.default_rng(self.seed)
+        self.pos = np.zeros((size, 3), dtype=np.float64)
+        self.pos[:, 0] = self.rng.uniform(-spread, spread, size)
+        self.pos[:, 1] = 5.0
+        self.pos[:, 2] = self.rng.uniform(-spread, spread, size)
+        self.battery = np.full(size, 100.0)
+        self.state = np.full(size, IDLE, dtype=np.int8)
+        self.joystick = np.zeros((size, 3))
+        self.waypoint = np.zeros((size, 2))
+        self.has_waypoint = np.zeros(size, dtype=bool)
+        self.detections = 0
+
+    # --- ADDRESSING ---
+    def _check(self, drone_id: int):
+        if not 0 <= drone_id < self.size:
+            raise IndexError(f"drone {drone_id} not in fleet of {self.size}")
+
+    def command(self, cmd: str, drone_id: Optional[int] = None) -> bool:
+        """Apply a flight command to one drone, or to the whole fleet when drone_id is None."""
+        if cmd not in COMMAND_STATES:
+            return False
+        sel = slice(None) if drone_id is None else drone_id
+        if drone_id is not None:
+            self._check(drone_id)
+        self.state[sel] = STATE_INDEX[COMMAND_STATES[cmd]]
+        if cmd == "emergency":
+            self.battery[sel] = 15.0
+        return True
+
+    def set_waypoint(self, drone_id: int, x: float, z: float):
+        self._check(drone_id)
+        self.waypoint[drone_id] = (x, z)
+        self.has_waypoint[drone_id] = True
+
+    def clear_waypoint(self, drone_id: int):
+        self._check(drone_id)
+        self.has_waypoint[drone_id] = False
+
+    def set_joystick(self, drone_id: int, vector: Dict[str, float]):
+        """Raises ValueError for a malformed vector (see normalize_sample); the drone keeps its last input."""
+        self._check(drone_id)
+        sticks = normalize_sample(vector)["vector"]
+        self.joystick[drone_id] = (sticks["rh"], sticks["lv"], -sticks["rv"])
+
+    # --- PHYSICS ---
+    def step(self, targets: Optional[TargetIndex] = None, dt: float = NOMINAL_DT) -> List[Dict[str, Any]]:
+        """Advance every vehicle by `dt`; returns the targets first detected this tick (already marked)."""
+        pos, state = self.pos, self.state
+        k = dt / NOMINAL_DT
+
+        # Auto-activate manual mode where a stick is deflected
+        is_manual = np.any(np.abs(self.joystick) > 0.01, axis=1)
+        state[is_manual & (state == IDLE)] = MANUAL
+
+        moving = np.isin(state, MOVING_STATES)
+
+        # Waypoint steering
+        steer = moving & self.has_waypoint
+        if steer.any():
+            delta = self.waypoint[steer] - pos[steer][:, [0, 2]]
+            dist = np.hypot(delta[:, 0], delta[:, 1])
+            far = dist > WAYPOINT_TOLERANCE
+            scale = np.zeros_like(dist)
+            scale[far] = np.minimum(dist[far], CRUISE_STEP * k) / dist[far]
+            idx = np.flatnonzero(steer)
+            pos[idx, 0] += delta[:, 0] * scale
+            pos[idx, 2] += delta[:, 1] * scale
+
+        # Loiter drift for vehicles without a waypoint
+        drift = moving & ~self.has_waypoint
+        n_drift = int(drift.sum())
+        if n_drift:
+            pos[drift, 0] += self.rng.uniform(-JITTER, JITTER, n_drift) * k
+            pos[drift, 2] += self.rng.uniform(-JITTER, JITTER, n_drift) * k
+
+        # Manual stick input
+        if moving.any():
+            pos[moving] += self.joystick[moving] * (JOYSTICK_GAIN * k)
+            pos[moving, 1] = np.clip(pos[moving, 1], MIN_ALT, MAX_ALT)
+        self.battery[moving] -= CRUISE_DRAIN * k
+
+        # Emergency descent
+        emergency = state == EMERGENCY
+        if emergency.any():
+            pos[emergency, 1] = np.maximum(EMERGENCY_FLOOR, pos[emergency, 1] - EMERGENCY_SINK * k)
+            self.battery[emergency] -= EMERGENCY_DRAIN * k
+
+        np.maximum(self.battery, 0.0, out=self.battery)
+
+        found: List[Dict[str, Any]] = []
+        if targets is not None and len(targets):
+            found = targets.query_any(pos[:, [0, 2]], DETECTION_RADIUS, pending_only=True)
+            for target in found:
+                target["detected"] = True
+            self.detections += len(found)
+        return found
+
+    # --- TELEMETRY ---
+    def get_drone(self, drone_id: int) -> Dict[str, Any]:
+        self._check(drone_id)
+        x, y, z = self.pos[drone_id].tolist()
+        return {
+            "id": drone_id,
+            "position": {"x": x, "y": y, "z": z},
+            "status": {
+                "battery": round(float(self.battery[drone_id]), 2),
+                "state": STATE_CODES[self.state[drone_id]],
+                "altitude": round(y, 1),
+            },
+            "waypoint": self.waypoint[drone_id].tolist() if self.has_waypoint[drone_id] else None,
+        }
+
+    def summary(self, include_positions: bool = False) -> Dict[str, Any]:
+        counts = np.bincount(self.state, minlength=len(STATE_CODES))
+        out = {
+            "size": self.size,
+            "states": {name: int(counts[code]) for code, name in enumerate(STATE_CODES) if counts[code]},
+            "battery": {
+                "mean": round(float(self.battery.mean()), 2) if self.size else 0.0,
+                "min": round(float(self.battery.min()), 2) if self.size else 0.0,
+            },
+            "detections": self.detections,
+        }
+        if include_positions:
+            out["positions"] = np.round(self.pos, 2).tolist()
+            out["state_codes"] = self.state.tolist()
+        return out
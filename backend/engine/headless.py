@@ -0,0 +1,240 @@
+"""
+Headless batch simulation.
+
+Runs the AIGISystemHAL flight model on simulated time: no event loop, no
+clocks, no WebSockets, no AI calls. One run is a seeded scenario instance
+(a run_scenario preset plus randomized targets and an optional route or
+planned mission, see backend/engine/planner.py) flown
+until the vehicle is back home, the battery is flat or `max_time` runs out.
+Many runs fan out over a process pool for Monte Carlo studies:
+
+  python -m backend.engine.headless --scenario rescue --runs 2000 --targets 5 --out rescue.jsonl
+
+Each run reports time-to-detect per target, battery at RTL and path length.
+"""
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from backend.engine.fleet import NOMINAL_DT, WAYPOINT_TOLERANCE
+
+HOME = {"x": 0.0, "z": 0.0}
+SCENARIOS = ("rescue", "mapping", "emergency")
+TARGET_TYPES = ("CIVILIAN", "HAZARD", "STRUCTURE")
+PRIORITIES = ("MEDIUM", "HIGH", "CRITICAL")
+SEARCH_STATES = ("SEARCHING", "SCANNING", "FLYING")
+
+DEFAULTS: Dict[str, Any] = {
+    "scenario": "rescue",
+    "seed": 0,
+    "targets": None, # int: scatter that many at random; list: use as given; None: the HAL's stock targets
+    "area": 60.0, # random targets fall within +/- area metres of home
+    "route": None, # [[x, z], ...] flown in order, then home
+    "mission": None, # MissionPlan.build params (polygon, pattern, width, ...); planned after the preset
+    "dt": NOMINAL_DT, # simulated seconds per tick
+    "max_time": 1800.0, # simulated seconds
+    "rtl_battery": 20.0, # percent; search gives up and returns home below this
+    "coverage": True, # sweep the coverage grid (the most expensive part of a tick)
+    "coverage_every": 10, # ticks per sweep; one capsule spans them, exact on straight legs
+}
+
+
+def _random_targets(rng: random.Random, count: int, area: float) -> List[Dict[str, Any]]:
+    return [{
+        "id": i + 1, "x": rng.uniform(-area, area), "z": rng.uniform(-area, area),
+        "type": rng.choice(TARGET_TYPES), "priority": rng.choice(PRIORITIES),
+    } for i in range(count)]
+
+
+def _make_hal(rng: random.Random):
+    # Imported here: the HAL lives with the server module; pool workers import it once
+    from backend.ai.tactical_ai import StubModel
+    from backend.main import AIGISystemHAL
+    return AIGISystemHAL(rng=rng, ai_model=StubModel())
+
+
+def run_instance(spec: Dict[str, Any]) -> Dict[str, Any]:
+    """Fly one seeded scenario instance to completion; returns its summary metrics."""
+    spec = {**DEFAULTS, **spec}
+    started = time.perf_counter()
+    rng = random.Random(spec["seed"])
+    hal = _make_hal(rng)
+
+    targets = spec["targets"]
+    if isinstance(targets, int):
+        hal.load_targets(_random_targets(rng, targets, spec["area"]))
+    elif targets is not None:
+        hal.load_targets(targets)
+    hal.run_scenario(spec["scenario"])
+    if spec["mission"] is not None:
+        hal.plan_mission(reserve=spec["rtl_battery"], **spec["mission"])
+    elif hal.mission is not None:
+        hal.mission.reserve = spec["rtl_battery"]
+    route = [{"x": float(x), "z": float(z)} for x, z in spec["route"]] if spec["route"] else []
+    if route:
+        hal.clear_mission()
+        hal.target_wp = route.pop(0)
+
+    dt = spec["dt"]
+    detected_at: Dict[Any, Optional[float]] = {t["id"]: None for t in hal.targets}
+    pending = len(detected_at)
+    sim_time = path = 0.0
+    ticks = 0
+    battery_at_rtl = rtl_time = rtl_reason = None
+    outcome = "timeout"
+
+    while sim_time < spec["max_time"]:
+        x, z = hal.sim_pos["x"], hal.sim_pos["z"]
+        hal._update_sim(dt)
+        ticks += 1
+        if spec["coverage"] and ticks % spec["coverage_every"] == 0:
+            hal._sweep_coverage()
+        sim_time = ticks * dt
+        path += math.hypot(hal.sim_pos["x"] - x, hal.sim_pos["z"] - z)
+
+        for event, data in hal.drain_events():
+            if event == "target_detected" and detected_at.get(data["id"], 0) is None:
+                detected_at[data["id"]] = round(sim_time, 3)
+                pending -= 1
+
+        if hal.battery <= 0:
+            hal.battery = 0.0
+            outcome = "depleted"
+            break
+
+        # Without a planned mission: follow the route, return home when done or at the battery reserve
+        if hal.mission is None and hal.status in SEARCH_STATES:
+            arrived = hal.target_wp is not None and math.hypot(
+                hal.target_wp["x"] - hal.sim_pos["x"], hal.target_wp["z"] - hal.sim_pos["z"]) <= WAYPOINT_TOLERANCE
+            if arrived and route:
+                hal.target_wp = route.pop(0)
+                arrived = False
+            if hal.battery <= spec["rtl_battery"]:
+                rtl_reason = "battery"
+            elif detected_at and not pending:
+                rtl_reason = "all_detected"
+            elif arrived:
+                rtl_reason = "route_complete"
+            if rtl_reason is not None:
+                hal.status = "RETURNING"
+                hal.target_wp = dict(HOME)
+        elif hal.mission is None and hal.status == "RETURNING" and math.hypot(
+                HOME["x"] - hal.sim_pos["x"], HOME["z"] - hal.sim_pos["z"]) <= WAYPOINT_TOLERANCE:
+            hal.status = "LANDED"
+        if hal.status == "RETURNING" and battery_at_rtl is None:
+            battery_at_rtl, rtl_time = round(hal.battery, 3), round(sim_time, 3)
+            if hal.mission is not None:
+                rtl_reason = hal.mission.rtl_reason
+        elif hal.status == "LANDED":
+            outcome = "returned"
+            break
+
+    return {
+        "scenario": spec["scenario"],
+        "seed": spec["seed"],
+        "outcome": outcome,
+        "sim_time": round(sim_time, 3),
+        "ticks": ticks,
+        "targets": len(detected_at),
+        "detected": len(detected_at) - pending,
+        "time_to_detect": detected_at,
+        "battery_at_rtl": battery_at_rtl,
+        "rtl_time": rtl_time,
+        "rtl_reason": rtl_reason,
+        "final_battery": round(hal.battery, 3),
+        "path_length": round(path, 3),
+        "coverage_m2": round(hal.coverage.covered_area(), 1),
+        "wall_time": round(time.perf_counter() - started, 4),
+    }
+
+
+def seeded_specs(runs: int, base_seed: int = 0, **spec) -> List[Dict[str, Any]]:
+    """`runs` copies of one scenario spec with consecutive seeds."""
+    return [{**spec, "seed": base_seed + i} for i in range(runs)]
+
+
+def run_batch(specs: Sequence[Dict[str, Any]], workers: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Run scenario instances across a process pool; results come back in spec order."""
+    if workers == 1:
+        return [run_instance(spec) for spec in specs]
+    workers = workers or os.cpu_count() or 1
+    # Large chunks amortize the IPC; a run is only milliseconds of work
+    chunksize = max(1, len(specs) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(run_instance, specs, chunksize=chunksize))
+
+
+def _quantiles(values: Sequence[float]) -> Dict[str, Optional[float]]:
+    if not values:
+        return {"mean": None, "p50": None, "p95": None, "max": None}
+    ordered = sorted(values)
+    pick = lambda q: round(ordered[min(len(ordered) - 1, int(len(ordered) * q))], 3)
+    return {"mean": round(sum(ordered) / len(ordered), 3), "p50": pick(0.5), "p95": pick(0.95), "max": round(ordered[-1], 3)}
+
+
+def summarize(results: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Aggregate run summaries: outcome counts, detection rate and metric distributions."""
+    results = list(results)
+    outcomes: Dict[str, int] = {}
+    for r in results:
+        outcomes[r["outcome"]] = outcomes.get(r["outcome"], 0) + 1
+    detect_times = [t for r in results for t in r["time_to_detect"].values() if t is not None]
+    total_targets = sum(r["targets"] for r in results)
+    return {
+        "runs": len(results),
+        "outcomes": outcomes,
+        "detection_rate": round(len(detect_times) / total_targets, 4) if total_targets else None,
+        "time_to_detect_s": _quantiles(detect_times),
+        "battery_at_rtl": _quantiles([r["battery_at_rtl"] for r in results if r["battery_at_rtl"] is not None]),
+        "path_length_m": _quantiles([r["path_length"] for r in results]),
+        "sim_time_s": _quantiles([r["sim_time"] for r in results]),
+        "coverage_m2": _quantiles([r["coverage_m2"] for r in results]),
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenario", default="rescue", choices=SCENARIOS)
+    parser.add_argument("--runs", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first run; runs use consecutive seeds")
+    parser.add_argument("--targets", type=int, help="random targets per run (default: the stock three)")
+    parser.add_argument("--area", type=float, default=DEFAULTS["area"])
+    parser.add_argument("--route", help='JSON list of [x, z] waypoints, e.g. "[[25,20],[-30,-15]]"')
+    parser.add_argument("--mission", help='JSON MissionPlan params, e.g. \'{"polygon": [[-60,-60],[60,-60],[60,60],[-60,60]]}\'')
+    parser.add_argument("--dt", type=float, default=DEFAULTS["dt"])
+    parser.add_argument("--max-time", type=float, default=DEFAULTS["max_time"])
+    parser.add_argument("--rtl-battery", type=float, default=DEFAULTS["rtl_battery"])
+    parser.add_argument("--coverage-every", type=int, default=DEFAULTS["coverage_every"], help="ticks per coverage sweep")
+    parser.add_argument("--no-coverage", action="store_true", help="skip the coverage grid (faster)")
+    parser.add_argument("--workers", type=int, help="pool size (default: all CPUs; 1 runs in-process)")
+    parser.add_argument("--out", help="write every run summary to this JSON-lines file")
+    args = parser.parse_args(argv)
+
+    specs = seeded_specs(
+        args.runs, args.seed, scenario=args.scenario, targets=args.targets, area=args.area,
+        route=json.loads(args.route) if args.route else None,
+        mission=json.loads(args.mission) if args.mission else None, dt=args.dt, max_time=args.max_time,
+        rtl_battery=args.rtl_battery, coverage=not args.no_coverage, coverage_every=max(1, args.coverage_every),
+    )
+    started = time.perf_counter()
+    results = run_batch(specs, workers=args.workers)
+    elapsed = time.perf_counter() - started
+    if args.out:
+        with open(args.out, "w") as fh:
+            for r in results:
+                fh.write(json.dumps(r) + "\n")
+    summary = summarize(results)
+    summary["wall_time_s"] = round(elapsed, 3)
+    summary["runs_per_s"] = round(len(results) / elapsed, 1) if elapsed else None
+    json.dump(summary, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
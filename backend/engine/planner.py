@@ -0,0 +1,355 @@
+import math
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from backend.engine.fleet import CRUISE_DRAIN, CRUISE_STEP, DETECTION_RADIUS, WAYPOINT_TOLERANCE
+
+Point = Tuple[float, float]
+
+PRIORITY_RANK = {"CRITICAL": 0, "HIGH": 1, "MEDIUM": 2, "LOW": 3}
+DEFAULT_RANK = PRIORITY_RANK["MEDIUM"]
+PATTERNS = ("lawnmower", "expanding_square")
+DRAIN_PER_METRE = CRUISE_DRAIN / CRUISE_STEP # battery % per metre at cruise (sim model)
+TOUR_BUDGET = 0.003 # seconds of nearest neighbour + 2-opt per plan, shared by the priority tiers
+MAX_PATTERN_LEGS = 20000 # passes or spiral legs per search pattern; planning runs on the event loop
+
+
+# --- SEARCH PATTERNS ---
+def _rotate(points: np.ndarray, angle: float) -> np.ndarray:
+    c, s = math.cos(angle), math.sin(angle)
+    return points @ np.array([[c, s], [-s, c]])
+
+
+def lawnmower(polygon: Sequence[Point], width: float, angle: Optional[float] = None) -> np.ndarray:
+    """
+    Boustrophedon sweep of `polygon`: parallel passes `width` apart, alternating
+    direction, each clipped to the polygon. Passes run along `angle` (radians
+    from +x); by default along the longest edge, which minimises turns.
+    Concave polygons get one leg per inside span, joined straight across gaps.
+    """
+    poly = np.asarray(polygon, dtype=np.float64)
+    if len(poly) < 3:
+        raise ValueError("polygon needs at least 3 vertices")
+    if angle is None:
+        edges = np.roll(poly, -1, axis=0) - poly
+        longest = edges[np.argmax(np.hypot(edges[:, 0], edges[:, 1]))]
+        angle = math.atan2(longest[1], longest[0])
+    local = _rotate(poly, -angle) # passes become lines of constant z'
+    a, b = local, np.roll(local, -1, axis=0)
+    z_lo, z_hi = local[:, 1].min(), local[:, 1].max()
+    if (z_hi - z_lo) / width > MAX_PATTERN_LEGS:
+        raise ValueError(f"width {width:g} needs more than {MAX_PATTERN_LEGS} passes over this polygon")
+    lines = np.arange(z_lo + width / 2, z_hi, width) if z_hi - z_lo > width else np.array([(z_lo + z_hi) / 2])
+
+    legs: List[Tuple[float, float]] = []
+    for i, z in enumerate(lines):
+        # Edges crossing this pass (half-open so shared vertices count once)
+        crossing = (a[:, 1] <= z) != (b[:, 1] <= z)
+        if not crossing.any():
+            continue
+        ea, eb = a[crossing], b[crossing]
+        xs = np.sort(ea[:, 0] + (z - ea[:, 1]) * (eb[:, 0] - ea[:, 0]) / (eb[:, 1] - ea[:, 1]))
+        spans = xs[: len(xs) // 2 * 2].reshape(-1, 2)
+        if i % 2:
+            spans = spans[::-1, ::-1]
+        for x0, x1 in spans:
+            legs.append((x0, z))
+            legs.append((x1, z))
+    if not legs:
+        return np.empty((0, 2))
+    return _rotate(np.array(legs), angle)
+
+
+def expanding_square(center: Point, width: float, radius: float, angle: float = 0.0) -> np.ndarray:
+    """Square spiral out from `center`, legs growing by `width` every second turn, until past `radius`."""
+    cx, cz = center
+    points = [(0.0, 0.0)]
+    x = z = 0.0
+    heading = 0
+    directions = ((0.0, 1.0), (1.0, 0.0), (0.0, -1.0), (-1.0, 0.0))
+    if 2 * (2 * radius / width + 1) > MAX_PATTERN_LEGS:
+        raise ValueError(f"width {width:g} needs more than {MAX_PATTERN_LEGS} legs to reach radius {radius:g}")
+    leg = width
+    while leg <= 2 * radius + width:
+        dx, dz = directions[heading % 4]
+        x, z = x + dx * leg, z + dz * leg
+        points.append((x, z))
+        heading += 1
+        if heading % 2 == 0:
+            leg += width
+    return _rotate(np.array(points), angle) + (cx, cz)
+
+
+def _orient(pattern: np.ndarray, start: Point) -> np.ndarray:
+    # Enter the pattern from whichever end is closer
+    if len(pattern) > 1 and math.dist(start, pattern[-1]) < math.dist(start, pattern[0]):
+        return pattern[::-1]
+    return pattern
+
+
+# --- TARGET ORDERING ---
+def _sweep(points: np.ndarray, start: Point) -> List[int]:
+    """Boustrophedon order over ~sqrt(n/2) horizontal strips, entered from the end nearer `start`: O(n log n)."""
+    z = points[:, 1]
+    strips = max(1, int(math.sqrt(len(points) / 2)))
+    band = np.minimum(((z - z.min()) / (float(np.ptp(z)) or 1.0) * strips).astype(int), strips - 1)
+    order = np.lexsort((np.where(band % 2 == 0, points[:, 0], -points[:, 0]), band))
+    if math.dist(start, points[order[-1]]) < math.dist(start, points[order[0]]):
+        order = order[::-1]
+    return order.tolist()
+
+
+def _tour(points: np.ndarray, start: Point, budget: float) -> List[int]:
+    """
+    Open tour from `start` through `points`: nearest neighbour, then 2-opt until no gain,
+    both within `budget` seconds. Points nearest neighbour has not reached when time
+    runs out follow in strip-sweep order.
+    """
+    n = len(points)
+    if n <= 1:
+        return list(range(n))
+    deadline = time.perf_counter() + budget
+    # Nearest neighbour over the unvisited prefix; a visited point is swapped out past its end
+    xs, zs, ids = points[:, 0].copy(), points[:, 1].copy(), np.arange(n)
+    cx, cz = start
+    order: List[int] = []
+    live = n
+    while live and time.perf_counter() < deadline:
+        k = int(((xs[:live] - cx) ** 2 + (zs[:live] - cz) ** 2).argmin())
+        order.append(int(ids[k]))
+        cx, cz = xs[k], zs[k]
+        live -= 1
+        xs[k], zs[k], ids[k] = xs[live], zs[live], ids[live]
+    if live:
+        rest = ids[:live]
+        order += rest[_sweep(points[rest], (cx, cz))].tolist()
+
+    # 2-opt on the open path P0=start, P1..Pn: reversing P[i..j] swaps edges (i-1, i), (j, j+1) for (i-1, j), (i, j+1)
+    path = np.vstack([np.asarray(start, dtype=np.float64)[None, :], points[order]])
+    improved = True
+    while improved and time.perf_counter() < deadline:
+        improved = False
+        for i in range(1, n):
+            a, b = path[i - 1], path[i]
+            c, d = path[i:n], path[i + 1:] # j = i..n-1
+            gains = (math.dist(a, b) + np.hypot(*(c - d).T)) - (np.hypot(*(c - a).T) + np.hypot(*(d - b).T))
+            k = int(np.argmax(gains))
+            j, gain = i + k, gains[k]
+            tail = math.dist(a, b) - math.dist(a, path[n]) # j = n: the open end has no (j, j+1) edge
+            if tail > gain:
+                j, gain = n, tail
+            if gain > 1e-9:
+                path[i:j + 1] = path[i:j + 1][::-1].copy()
+                order[i - 1:j] = order[i - 1:j][::-1]
+                improved = True
+            if time.perf_counter() >= deadline:
+                break
+    return order
+
+
+def order_targets(start: Point, targets: Iterable[Dict[str, Any]], budget: float = TOUR_BUDGET) -> List[Dict[str, Any]]:
+    """Visit order: priority tiers (CRITICAL first), shortest tour within each tier, each tier starting where the last ended."""
+    tiers: Dict[int, List[Dict[str, Any]]] = {}
+    targets = list(targets)
+    for target in targets:
+        tiers.setdefault(PRIORITY_RANK.get(target.get("priority"), DEFAULT_RANK), []).append(target)
+    ordered: List[Dict[str, Any]] = []
+    cur = start
+    for rank in sorted(tiers):
+        tier = tiers[rank]
+        points = np.array([(t["x"], t["z"]) for t in tier], dtype=np.float64)
+        ordered.extend(tier[i] for i in _tour(points, cur, budget * len(tier) / len(targets)))
+        cur = (ordered[-1]["x"], ordered[-1]["z"])
+    return ordered
+
+
+# --- MISSION ---
+class MissionPlan:
+    """
+    Waypoint Mission.
+    A queue of target visits (priority tiers, short tour), then a search pattern,
+    then home. `steer()` runs every physics tick: it advances past reached
+    waypoints and checks, in O(1) from cumulative leg lengths, that the battery
+    still covers the rest of the route; when it does not, the route is trimmed
+    to what fits (in queue order, so higher priorities survive) plus home.
+    Detected targets leave the queue; new ones go in by cheapest insertion.
+    """
+    def __init__(self, home: Point = (0.0, 0.0), reserve: float = 20.0, drain_per_m: float = DRAIN_PER_METRE,
+                 tolerance: float = WAYPOINT_TOLERANCE):
+        self.home = (float(home[0]), float(home[1]))
+        self.reserve = reserve
+        self.drain_per_m = drain_per_m
+        self.tolerance = tolerance
+        self.waypoints: List[Dict[str, Any]] = [] # {"x", "z", "kind": target|search|home, "target_id"?}
+        self.index = 0 # head of the queue
+        self.rtl_reason: Optional[str] = None # set once the home leg is all that is left
+        self.trimmed = False
+        self.replans = 0
+        self.plan_ms = 0.0
+        self._cum = np.zeros(1)
+
+    @classmethod
+    def build(cls, start: Point, targets: Iterable[Dict[str, Any]] = (), polygon: Optional[Sequence[Point]] = None,
+              pattern: str = "lawnmower", width: float = 2 * DETECTION_RADIUS, angle: Optional[float] = None,
+              center: Optional[Point] = None, radius: Optional[float] = None, **kwargs) -> "MissionPlan":
+        started = time.perf_counter()
+        width = float(width)
+        if not (math.isfinite(width) and width > 0):
+            raise ValueError(f"width must be a positive number of metres, got {width:g}")
+        if radius is not None:
+            radius = float(radius)
+            if not (math.isfinite(radius) and radius >= 0):
+                raise ValueError(f"radius must be a non-negative number of metres, got {radius:g}")
+        plan = cls(**kwargs)
+        waypoints = [{"x": t["x"], "z": t["z"], "kind": "target", "target_id": t["id"], "priority": t.get("priority")}
+                     for t in order_targets(start, (t for t in targets if not t.get("detected")))]
+        if polygon is not None or center is not None:
+            if pattern == "lawnmower":
+                if polygon is None:
+                    raise ValueError("lawnmower needs a polygon")
+                points = lawnmower(polygon, width, angle)
+            elif pattern == "expanding_square":
+                if center is None:
+                    center = tuple(np.asarray(polygon, dtype=np.float64).mean(axis=0))
+                if radius is None:
+                    radius = max(math.dist(center, p) for p in polygon) if polygon is not None else 10 * width
+                points = expanding_square(center, width, radius, angle or 0.0)
+            else:
+                raise ValueError(f"unknown pattern {pattern!r}; expected one of {PATTERNS}")
+            entry = (waypoints[-1]["x"], waypoints[-1]["z"]) if waypoints else start
+            waypoints += [{"x": float(x), "z": float(z), "kind": "search"} for x, z in _orient(points, entry)]
+        waypoints.append({"x": plan.home[0], "z": plan.home[1], "kind": "home"})
+        plan._set(waypoints)
+        plan.plan_ms = round((time.perf_counter() - started) * 1000, 3)
+        return plan
+
+    def export(self) -> Dict[str, Any]:
+        """The rest of the route and its settings, JSON-safe (replicated to follower workers for failover)."""
+        return {
+            "home": list(self.home), "reserve": self.reserve, "drain_per_m": self.drain_per_m,
+            "tolerance": self.tolerance, "waypoints": self.waypoints[self.index:],
+            "rtl_reason": self.rtl_reason, "trimmed": self.trimmed, "replans": self.replans,
+        }
+
+    @classmethod
+    def restore(cls, state: Dict[str, Any]) -> "MissionPlan":
+        """Rebuild a plan from export(): flying resumes at the exported head of the queue."""
+        plan = cls(home=tuple(state["home"]), reserve=state["reserve"], drain_per_m=state["drain_per_m"],
+                   tolerance=state["tolerance"])
+        plan._set([dict(w) for w in state["waypoints"]])
+        plan.rtl_reason = state["rtl_reason"]
+        plan.trimmed = state["trimmed"]
+        plan.replans = state["replans"]
+        return plan
+
+    # --- QUEUE ---
+    def _set(self, waypoints: List[Dict[str, Any]]):
+        self.waypoints = waypoints
+        self.index = 0
+        xy = np.array([(w["x"], w["z"]) for w in waypoints], dtype=np.float64).reshape(-1, 2)
+        legs = np.hypot(*np.diff(xy, axis=0).T) if len(xy) > 1 else np.zeros(0)
+        self._cum = np.concatenate([[0.0], np.cumsum(legs)])
+
+    @property
+    def current(self) -> Optional[Dict[str, Any]]:
+        return self.waypoints[self.index] if self.index < len(self.waypoints) else None
+
+    @property
+    def complete(self) -> bool:
+        return self.index >= len(self.waypoints)
+
+    def remaining_length(self, x: float, z: float) -> float:
+        head = self.current
+        if head is None:
+            return 0.0
+        return math.hypot(head["x"] - x, head["z"] - z) + float(self._cum[-1] - self._cum[self.index])
+
+    def steer(self, x: float, z: float, battery: float) -> Optional[Dict[str, Any]]:
+        """Waypoint to fly to this tick (None once home). Advances and re-plans as needed."""
+        head = self.current
+        while head is not None and math.hypot(head["x"] - x, head["z"] - z) <= self.tolerance:
+            self.index += 1
+            head = self.current
+        if head is None:
+            return None
+        if self.rtl_reason is None and head["kind"] != "home" and \
+                battery - self.remaining_length(x, z) * self.drain_per_m < self.reserve:
+            self.trim(x, z, battery)
+            head = self.current
+        if self.rtl_reason is None and head["kind"] == "home":
+            self.rtl_reason = "battery" if self.trimmed else "complete"
+        return head
+
+    # --- RE-PLANNING ---
+    def trim(self, x: float, z: float, battery: float):
+        """Keep, in order, the queued waypoints that still leave enough battery to get home; then home."""
+        budget = max(0.0, (battery - self.reserve) / self.drain_per_m)
+        kept, spent, cur = [], 0.0, (x, z)
+        for wp in self.waypoints[self.index:-1]:
+            leg = math.dist(cur, (wp["x"], wp["z"]))
+            if spent + leg + math.dist((wp["x"], wp["z"]), self.home) <= budget:
+                kept.append(wp)
+                spent += leg
+                cur = (wp["x"], wp["z"])
+            elif wp["kind"] == "search":
+                break # The rest of the pattern is no use out of order
+        self._set(kept + [self.waypoints[-1]])
+        self.trimmed = True
+        self.replans += 1
+
+    def return_home(self, reason: str = "commanded"):
+        """Abandon the rest of the route (pilot RTL)."""
+        if not self.complete:
+            self._set(self.waypoints[-1:])
+            self.rtl_reason = reason
+
+    def drop_target(self, target_id: Any):
+        """Target seen (possibly en route) or removed: drop its visit."""
+        pending = self.waypoints[self.index:]
+        keep = [w for w in pending if w.get("target_id") != target_id]
+        if len(keep) != len(pending):
+            self._set(keep)
+            self.replans += 1
+
+    def add_target(self, target: Dict[str, Any], x: float, z: float):
+        """Cheapest insertion among the target visits of the same or lower priority."""
+        pending = self.waypoints[self.index:]
+        rank = PRIORITY_RANK.get(target.get("priority"), DEFAULT_RANK)
+        wp = {"x": target["x"], "z": target["z"], "kind": "target", "target_id": target["id"], "priority": target.get("priority")}
+        # Candidate slots: after every higher-priority visit, before any lower-priority one and the search pattern
+        first = 0
+        last = len(pending) - 1 # never after home
+        for i, w in enumerate(pending):
+            w_rank = PRIORITY_RANK.get(w.get("priority"), DEFAULT_RANK)
+            if w["kind"] != "target" or w_rank > rank:
+                last = i
+                break
+            if w_rank < rank:
+                first = i + 1
+        best, best_cost = first, math.inf
+        for i in range(first, last + 1):
+            prev = (x, z) if i == 0 else (pending[i - 1]["x"], pending[i - 1]["z"])
+            nxt = (pending[i]["x"], pending[i]["z"])
+            cost = math.dist(prev, (wp["x"], wp["z"])) + math.dist((wp["x"], wp["z"]), nxt) - math.dist(prev, nxt)
+            if cost < best_cost:
+                best, best_cost = i, cost
+        self._set(pending[:best] + [wp] + pending[best:])
+        self.replans += 1
+
+    def stats(self, x: float, z: float, waypoints: bool = False) -> Dict[str, Any]:
+        pending = self.waypoints[self.index:]
+        stats = {
+            "complete": self.complete,
+            "current": self.current,
+            "remaining": len(pending),
+            "remaining_targets": sum(1 for w in pending if w["kind"] == "target"),
+            "remaining_m": round(self.remaining_length(x, z), 1),
+            "rtl_reason": self.rtl_reason,
+            "replans": self.replans,
+            "plan_ms": self.plan_ms,
+        }
+        if waypoints:
+            stats["waypoints"] = pending
+        return stats
@@ -0,0 +1,97 @@
+import asyncio
+import inspect
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Union
+
+TickFn = Callable[[float], Union[None, Awaitable[None]]]
+
+
+class FixedRateClock:
+    """
+    Drift-free Fixed-Timestep Clock.
+    Ticks are scheduled against absolute deadlines (start + n * period) on the
+    event loop's monotonic clock, so work time never stretches the period.
+    A late clock runs up to `max_catchup` back-to-back ticks to recover; beyond
+    that the backlog is dropped and counted as missed deadlines.
+    Every tick receives the time step it covers for integration: the period, or
+    period * (skipped + 1) for the tick after a dropped backlog, so simulated time
+    keeps pace with wall time.
+    """
+    def __init__(self, name: str, hz: float, max_catchup: int = 3, window: int = 256,
+                 observer: Optional[Callable[[float], None]] = None):
+        if hz <= 0:
+            raise ValueError(f"{name}: rate must be positive, got {hz}")
+        self.name = name
+        self.hz = hz
+        self.period = 1.0 / hz
+        self.max_catchup = max_catchup
+        self.observer = observer # e.g. a metrics histogram's observe(), fed the work time
+        self.ticks = 0
+        self.overruns = 0 # ticks whose work alone exceeded the period
+        self.missed = 0 # deadlines skipped because the backlog exceeded max_catchup
+        self.catchup_ticks = 0 # ticks run late but within the catch-up budget
+        self.last_work = 0.0
+        self._lags: Deque[float] = deque(maxlen=window)
+        self._works: Deque[float] = deque(maxlen=window)
+        self._started_at: Optional[float] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def run(self, tick: TickFn):
+        loop = asyncio.get_running_loop()
+        self._loop = loop
+        self._started_at = deadline = loop.time()
+        is_async = inspect.iscoroutinefunction(tick)
+        while True:
+            now = loop.time()
+            lag = now - deadline
+            dt = self.period
+            if lag > self.period * self.max_catchup:
+                skipped = int(lag // self.period)
+                self.missed += skipped
+                deadline += skipped * self.period
+                dt = self.period * (skipped + 1) # This tick integrates the dropped deadlines too
+                lag = now - deadline
+            elif lag >= self.period:
+                self.catchup_ticks += 1
+            self._lags.append(lag)
+
+            started = loop.time()
+            try:
+                if is_async:
+                    await tick(dt)
+                else:
+                    tick(dt)
+            except Exception as e:
+                print(f"[{self.name} ERROR] {e}")
+            work = loop.time() - started
+            self.last_work = work
+            self._works.append(work)
+            if self.observer is not None:
+                self.observer(work)
+            if work > self.period:
+                self.overruns += 1
+            self.ticks += 1
+
+            deadline += self.period
+            delay = deadline - loop.time()
+            # Always yield, even when behind, so other tasks keep running
+            await asyncio.sleep(delay if delay > 0 else 0)
+
+    def stats(self) -> Dict[str, Any]:
+        lags = sorted(self._lags)
+        works = sorted(self._works)
+        elapsed = (self._loop.time() - self._started_at) if self._loop and self._started_at is not None else 0.0
+
+        def pct(values, q):
+            return round(values[min(len(values) - 1, int(len(values) * q))] * 1000, 3) if values else 0.0
+
+        return {
+            "target_hz": self.hz,
+            "actual_hz": round(max(0, self.ticks - 1) / elapsed, 2) if elapsed > 0 else 0.0,
+            "ticks": self.ticks,
+            "jitter_ms": {"p50": pct(lags, 0.5), "p99": pct(lags, 0.99), "max": pct(lags, 1.0)},
+            "work_ms": {"p50": pct(works, 0.5), "p99": pct(works, 0.99), "max": pct(works, 1.0)},
+            "overruns": self.overruns,
+            "catchup_ticks": self.catchup_ticks,
+            "missed_deadlines": self.missed,
+        }
@@ -0,0 +1,109 @@
+import math
+from typing import Any, Dict, Iterable, List, Tuple
+
+import numpy as np
+
+Cell = Tuple[int, int]
+
+
+class TargetIndex:
+    """
+    Uniform Grid Hash for points of interest on the ground plane (x/z).
+    Cells are `cell_size` metres square; a radius query only visits the cells
+    overlapping the query circle, so detection cost depends on local density
+    rather than on the total number of loaded targets.
+    """
+    def __init__(self, cell_size: float = 8.0):
+        self.cell_size = float(cell_size)
+        self.cells: Dict[Cell, Dict[Any, Dict[str, Any]]] = {}
+        self.by_id: Dict[Any, Dict[str, Any]] = {}
+        self._cell_of: Dict[Any, Cell] = {}
+
+    def __len__(self) -> int:
+        return len(self.by_id)
+
+    def _cell(self, x: float, z: float) -> Cell:
+        return (math.floor(x / self.cell_size), math.floor(z / self.cell_size))
+
+    # --- MUTATION ---
+    def bulk_load(self, targets: Iterable[Dict[str, Any]]):
+        """Replace the index contents. Targets are stored by reference."""
+        self.cells.clear()
+        self.by_id.clear()
+        self._cell_of.clear()
+        for target in targets:
+            self.insert(target)
+
+    def insert(self, target: Dict[str, Any]):
+        tid = target["id"]
+        if tid in self.by_id:
+            self.remove(tid)
+        cell = self._cell(target["x"], target["z"])
+        self.cells.setdefault(cell, {})[tid] = target
+        self.by_id[tid] = target
+        self._cell_of[tid] = cell
+
+    def remove(self, target_id: Any) -> bool:
+        target = self.by_id.pop(target_id, None)
+        if target is None:
+            return False
+        cell = self._cell_of.pop(target_id)
+        bucket = self.cells.get(cell)
+        if bucket is not None:
+            bucket.pop(target_id, None)
+            if not bucket:
+                del self.cells[cell]
+        return True
+
+    # --- QUERIES ---
+    def query_radius(self, x: float, z: float, radius: float, pending_only: bool = False) -> List[Dict[str, Any]]:
+        """Targets within `radius` of (x, z); optionally skip already detected ones."""
+        r2 = radius * radius
+        cx0, cz0 = self._cell(x - radius, z - radius)
+        cx1, cz1 = self._cell(x + radius, z + radius)
+        hits = []
+        for cx in range(cx0, cx1 + 1):
+            for cz in range(cz0, cz1 + 1):
+                bucket = self.cells.get((cx, cz))
+                if not bucket:
+                    continue
+                for target in bucket.values():
+                    if pending_only and target.get("detected"):
+                        continue
+                    if (target["x"] - x) ** 2 + (target["z"] - z) ** 2 < r2:
+                        hits.append(target)
+        return hits
+
+    def query_any(self, xz: np.ndarray, radius: float, pending_only: bool = False) -> List[Dict[str, Any]]:
+        """
+        Targets within `radius` of ANY of the given (N, 2) points.
+        Used by the fleet sim: only target cells next to an occupied drone cell
+        are distance-tested, and only against the drones in that neighbourhood.
+        """
+        if not self.cells or len(xz) == 0:
+            return []
+        reach = max(1, math.ceil(radius / self.cell_size))
+        cx = np.floor(xz[:, 0] / self.cell_size).astype(np.int64)
+        cz = np.floor(xz[:, 1] / self.cell_size).astype(np.int64)
+        occupied = set(zip(cx.tolist(), cz.tolist()))
+        offsets = [(i, j) for i in range(-reach, reach + 1) for j in range(-reach, reach + 1)]
+        # Walk whichever side is smaller: drone neighbourhoods or loaded target cells
+        if len(occupied) * len(offsets) < len(self.cells):
+            near_cells = {(ox + i, oz + j) for ox, oz in occupied for i, j in offsets}
+            candidate_cells = [c for c in near_cells if c in self.cells]
+        else:
+            candidate_cells = [c for c in self.cells
+                               if any((c[0] + i, c[1] + j) in occupied for i, j in offsets)]
+        r2 = radius * radius
+        hits = []
+        for tx, tz in candidate_cells:
+            candidates = [t for t in self.cells[(tx, tz)].values() if not (pending_only and t.get("detected"))]
+            if not candidates:
+                continue
+            near = (np.abs(cx - tx) <= reach) & (np.abs(cz - tz) <= reach)
+            local = xz[near]
+            for target in candidates:
+                d2 = (local[:, 0] - target["x"]) ** 2 + (local[:, 1] - target["z"]) ** 2
+                if (d2 < r2).any():
+                    hits.append(target)
+        return hits
@@ -1,48 +1,37 @@
 import os
 import asyncio
 import json
+import math
 import random
 import time
-from typing import List, Optional
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from typing import Any, Dict, List, Optional, Tuple
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
 
 # AIGIS Core Drivers
+from backend.ai.tactical_ai import StubModel, TacticalAIEngine, list_models
+from backend.drivers.command_queue import MAVLinkCommandQueue
 from backend.drivers.mavlink_driver import MAVLinkDriver
-import google.generativeai as genai
+from backend.drivers.rc_uplink import JoystickUplink, RCOverrideLoop, normalize_sample, parse_sample
+from backend.engine.coverage import CoverageGrid
+from backend.engine.fleet import DETECTION_RADIUS, MAX_FLEET_SIZE, NOMINAL_DT, FleetSimulator
+from backend.engine.planner import MissionPlan
+from backend.engine.scheduler import FixedRateClock
+from backend.engine.spatial_index import TargetIndex
+from backend.monitoring.health import StartupHealth
+from backend.monitoring.metrics import (
+    BROADCAST_TICK, LOOP_MONITOR, PHYSICS_TICK, PROCESS, REGISTRY, TELEMETRY_BUILD, VEHICLE,
+)
+from backend.net.connection_manager import ConnectionManager
+from backend.net.snapshot import SnapshotFeed, StatusSnapshot
+from backend.net.state_hub import DEFAULT_SOCKET, ForwardToOwner, StateHub
+from backend.net.static_assets import AssetCache, CachedStaticFiles
+from backend.storage.flight_recorder import FlightRecorder
 
-# Configure Gemini
+# Gemini key (the model itself is configured by TacticalAIEngine; the SDK loads on first use)
 GEN_API_KEY = os.environ.get("GOOGLE_API_KEY")
-if GEN_API_KEY:
-    genai.configure(api_key=GEN_API_KEY)
-
-class TacticalAIEngine:
-    def __init__(self):
-        self.enabled = GEN_API_KEY is not None
-        if self.enabled:
-            self.model = genai.GenerativeModel('gemini-3-flash-preview') # Direct link to G3-FLASH confirmed in logs
-            self.chat = self.model.start_chat()
-            self.system_prompt = (
-                "You are AIGIS-AI, a tactical search and rescue drone operator assistant. "
-                "Keep messages short, tactical, and in English. Use radio-style brevity. "
-                "Analyze the provided drone status and provide a one-line tactical insight or alert."
-            )
-
-    async def generate_insight(self, status: dict) -> str:
-        if not self.enabled:
-            return "AIGIS // AI OFFLINE - RUNNING LOCAL HEURISTICS"
-        
-        try:
-            prompt = f"Status: {status['state']}, Bat: {status['battery']}%, Alt: {status['altitude']}m. Insight?"
-            response = await asyncio.to_thread(self.chat.send_message, self.system_prompt + "\n" + prompt)
-            return f"GEMINI-3 FLASH // {response.text.strip().upper()}"
-        except Exception as e:
-            if "429" in str(e):
-                return "GEMINI-3 FLASH // [QUOTA_SHIELD] LOCAL LOGIC ACTIVE - LIMIT REACHED."
-            print(f"[AI ERROR] {e}")
-            return "GEMINI-3 FLASH // [LOCAL_HEURISTICS] TARGET STABLE. PROCEED WITH CAUTION."
+health = StartupHealth() # Readiness and background startup probes (GET /api/health)
 
 app = FastAPI(title="AIGIS UAV Backend - Tactical Command & Control")
 
@@ -55,16 +44,33 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Multi-worker deployments: one worker owns the vehicle, the rest follow it (backend/net/state_hub.py)
+hub = StateHub(app, path=os.environ.get("AIGIS_STATE_SOCKET", DEFAULT_SOCKET),
+               enabled=os.environ.get("AIGIS_SHARED_STATE") == "1")
+app.add_middleware(ForwardToOwner, hub=hub, local_paths=("/api/status", "/api/metrics", "/api/hub", "/api/health"))
+
+COVERAGE_STATES = ("SEARCHING", "SCANNING")
+MISSION_STATES = ("FLYING", "SEARCHING", "SCANNING") # the planner steers in these; RETURNING once it heads home
+HOME = (0.0, 0.0)
+
 class AIGISystemHAL:
     """
     Tactical Hardware Abstraction Layer.
     Orchestrates between Real Hardware (MAVLink) and AI Simulation.
     """
-    def __init__(self):
+    def __init__(self, rng: Optional[random.Random] = None, ai_model=None):
+        self.rng = rng or random.Random() # Sim jitter; seeded for reproducible batch runs (backend/engine/headless.py)
         self.logs = [] # Rolling system logs for frontend
+        self.log_total = 0 # Monotonic count of log events (drives delta log streaming)
         self.simulation_mode = True
         self.hw_driver = MAVLinkDriver(connection_string=os.environ.get("DRONE_PORT"))
+        self.command_queue = MAVLinkCommandQueue(
+            self.hw_driver,
+            ack_timeout=float(os.environ.get("MAV_ACK_TIMEOUT", "1.5")),
+            retries=int(os.environ.get("MAV_CMD_RETRIES", "3")),
+        )
         self.sim_pos = {"x": 0, "y": 5, "z": 0}
+        self.attitude = {"pitch": 0.0, "roll": 0.0, "yaw": 0.0}
         self.battery = 100.0
         self.status = "IDLE"
         self.targets = [
@@ -72,38 +78,181 @@ class AIGISystemHAL:
             {"id": 2, "x": -30, "y": 0, "z": -15, "type": "HAZARD", "detected": False, "priority": "CRITICAL"},
             {"id": 3, "x": 10, "y": 0, "z": -35, "type": "STRUCTURE", "detected": False, "priority": "MEDIUM"}
         ]
+        self.target_index = TargetIndex(cell_size=DETECTION_RADIUS) # Grid hash over self.targets
+        self.target_index.bulk_load(self.targets)
         self.start_time = time.time()
         self.last_ai_msg = "SYSTEM READY // AWAITING EVALUATION INJECT"
         self.target_wp = None # Waypoint target
-        self.ai_engine = TacticalAIEngine()
+        self.mission: Optional[MissionPlan] = None # Waypoint queue; drives target_wp while active
+        self._mission_params: Dict[str, Any] = {}
+        self.plan_version = 0 # Bumped when the mission or fleet is replaced; followers get replication_state()
+        self.coverage = CoverageGrid( # Ground swept by the sensor footprint (detection radius)
+            resolution=float(os.environ.get("AIGIS_COVERAGE_RES", "1.0")), footprint=DETECTION_RADIUS)
+        self._sweep_from: Optional[Tuple[float, float]] = None
+        self.ai_engine = TacticalAIEngine(
+            model=ai_model or (StubModel() if os.environ.get("AIGIS_AI_STUB") == "1" else None),
+            rpm=float(os.environ.get("AIGIS_AI_RPM", "12")),
+            timeout=float(os.environ.get("AIGIS_AI_TIMEOUT", "8")),
+        )
         self.last_ai_update = 0
         self.last_ai_update = 0
         self.joystick_vector = {"x": 0, "y": 0, "z": 0} # Real-time manual control vector
+        self.control = JoystickUplink( # Stick samples: latest-wins, seq/stale checks, deadman
+            deadman=float(os.environ.get("AIGIS_RC_DEADMAN", "0.5")),
+            stale_after=float(os.environ.get("AIGIS_RC_STALE", "0.3")),
+        )
+        self.rc_override: Optional[RCOverrideLoop] = None # Hardware mode only
+        self.fleet: Optional[FleetSimulator] = None # Swarm mode (vectorized, N drones)
+        self.recorder: Optional[FlightRecorder] = None # Black box, opened on boot
+        self.events: List[Tuple[str, Dict[str, Any]]] = [] # Pushed to topic subscribers each physics tick
+        self.ticks = 0 # Physics ticks run; snapshot() rebuilds once per tick
+        self._snapshot: Optional[Dict[str, Any]] = None
+        self._snapshot_tick = -1
+        self.snapshot_log_total = 0 # log_total as of the snapshot's logs; log_event may run before it is sent
+        self._reported_state = self.status
 
     def log_event(self, msg: str):
         timestamp = time.strftime("%H:%M:%S")
         self.logs.insert(0, f"[{timestamp}] {msg}")
         self.logs = self.logs[:50] # Keep last 50
+        self.log_total += 1
+
+    def drain_events(self) -> List[Tuple[str, Dict[str, Any]]]:
+        # State changes can come from anywhere (commands, scenarios, hardware mode); diff once per tick
+        if self.status != self._reported_state:
+            self.events.append(("state_changed", {"from": self._reported_state, "to": self.status}))
+            self._reported_state = self.status
+        events, self.events = self.events, []
+        return events
+
+    def load_targets(self, targets: List[Dict[str, Any]], replace: bool = True):
+        """Bulk-load points of interest (e.g. from survey data) into the perception index."""
+        loaded = [{"detected": False, "priority": "MEDIUM", "type": "UNKNOWN", "y": 0, **t} for t in targets]
+        if replace:
+            self.targets = loaded
+            self.target_index.bulk_load(self.targets)
+        else:
+            for target in loaded:
+                self.remove_target(target["id"])
+                self.targets.append(target)
+                self.target_index.insert(target)
+                if self.mission is not None and self.mission.rtl_reason is None:
+                    self.mission.add_target(target, self.sim_pos["x"], self.sim_pos["z"])
+        self.log_event(f"POI LOAD: {len(loaded)} targets indexed ({len(self.targets)} total)")
+        if replace and self.mission is not None and not self.mission.complete:
+            self.plan_mission(**self._mission_params) # New target set: plan from scratch
+
+    def plan_mission(self, **params) -> MissionPlan:
+        """Plan target visits plus an optional search pattern (see MissionPlan.build) and start flying it."""
+        self.mission = MissionPlan.build(
+            (self.sim_pos["x"], self.sim_pos["z"]), self.targets, home=HOME, **params)
+        self._mission_params = params
+        self.plan_version += 1
+        self.target_wp = self.mission.current
+        if self.status in ("IDLE", "LANDED"):
+            self.status = "SEARCHING"
+        self.log_event(f"MISSION PLANNED: {len(self.mission.waypoints)} waypoints in {self.mission.plan_ms:.1f}ms")
+        return self.mission
+
+    def clear_mission(self):
+        self.mission = None
+        self.target_wp = None
+        self.plan_version += 1
+
+    def remove_target(self, target_id: Any) -> bool:
+        if not self.target_index.remove(target_id):
+            return False
+        self.targets = [t for t in self.targets if t["id"] != target_id]
+        if self.mission is not None:
+            self.mission.drop_target(target_id)
+        return True
+
+    def enable_fleet(self, size: int, seed: Optional[int] = None):
+        """Spawn a simulated swarm alongside the primary vehicle."""
+        self.fleet = FleetSimulator(size, seed=seed)
+        self.plan_version += 1
+        self.log_event(f"FLEET MODE: {size} drones spawned")
+
+    def disable_fleet(self):
+        self.fleet = None
+        self.plan_version += 1
+        self.log_event("FLEET MODE: Swarm released")
+
+    def replication_state(self) -> Dict[str, Any]:
+        """What a promoted follower needs beyond the telemetry frame: the rest of the route and the fleet spawn."""
+        return {
+            "mission": self.mission.export() if self.mission is not None else None,
+            "mission_params": self._mission_params,
+            "fleet": {"size": self.fleet.size, "seed": self.fleet.seed} if self.fleet is not None else None,
+        }
+
+    def adopt_telemetry(self, telemetry: Dict[str, Any], plan: Optional[Dict[str, Any]] = None):
+        """
+        Resume from the last frame of a previous state owner (worker failover), plus its
+        replication_state() if one arrived. Fleet drones re-spawn from the same seed;
+        their positions and orders are not replicated.
+        """
+        status = telemetry["status"]
+        self.sim_pos = dict(telemetry["position"])
+        self.attitude = dict(telemetry["attitude"])
+        self.battery = float(status["battery"])
+        self.status = status["state"]
+        self.last_ai_msg = status["ai_alert"]
+        self.start_time = time.time() - float(status["mission_time"])
+        self.load_targets(telemetry["targets"])
+        resumed = []
+        if plan is None:
+            if self.status in MISSION_STATES: # Whatever was being flown did not reach this worker
+                resumed.append(f"no mission replicated, {self.status} -> IDLE")
+                self.status = "IDLE"
+        else:
+            if plan["mission"] is not None:
+                self.mission = MissionPlan.restore(plan["mission"])
+                self._mission_params = plan["mission_params"]
+                for target in self.targets:
+                    if target["detected"]:
+                        self.mission.drop_target(target["id"]) # Seen after the plan was replicated
+                self.target_wp = self.mission.current
+                resumed.append(f"mission restored ({len(self.mission.waypoints)} waypoints)")
+            if plan["fleet"] is not None:
+                self.enable_fleet(**plan["fleet"])
+                resumed.append(f"fleet re-spawned ({self.fleet.size} drones, positions and orders reset)")
+        self.log_event("STATE OWNER FAILOVER: Resumed from last downlink frame" + "".join(f"; {r}" for r in resumed))
 
     async def initialize(self):
         print("[AIGIS] Professional Cold Boot Sequence...")
-        if os.environ.get("AUTO_CONNECT_HW") == "1":
-            success = self.hw_driver.connect()
-            if success:
-                self.simulation_mode = False
-                self.last_ai_msg = "AIGIS // REAL HARDWARE LINK ENCRYPTED"
-                print("[HAL] HARDWARE MODE ACTIVE")
-            else:
-                self.simulation_mode = True
-                self.last_ai_msg = "AIGIS // HW FAIL -> SIMULATION ACTIVE"
-                print("[HAL] HW CONNECTION FAILED. FALLING BACK TO SIM.")
-                self.last_ai_msg = "AIGIS // HARDWARE ERROR -> AI SIMULATION ACTIVE"
+        self.command_queue.start()
+        if os.environ.get("AIGIS_RECORDER", "1") != "0":
+            self.recorder = FlightRecorder(RECORDER_DIR)
+            print(f"[HAL] FLIGHT RECORDER ARMED [{self.recorder.path}]")
+        fleet_size = int(os.environ.get("AIGIS_FLEET_SIZE", "0"))
+        if fleet_size > 0 and self.fleet is None: # A promoted follower already re-spawned the owner's fleet
+            self.enable_fleet(fleet_size)
+            print(f"[HAL] FLEET MODE ACTIVE [{fleet_size} drones]")
+
+    async def connect_hardware(self) -> bool:
+        """Heartbeat handshake off the event loop; the sim keeps flying until (unless) a link comes up."""
+        success = await self.hw_driver.connect_async()
+        if success:
+            self.simulation_mode = False
+            self.last_ai_msg = "AIGIS // REAL HARDWARE LINK ENCRYPTED"
+            print("[HAL] HARDWARE MODE ACTIVE")
+            if os.environ.get("AIGIS_RC_OVERRIDE", "1") != "0":
+                self.rc_override = RCOverrideLoop(
+                    self.control, self.hw_driver, self.command_queue.write,
+                    hz=float(os.environ.get("AIGIS_RC_HZ", "25")))
+                asyncio.create_task(self.rc_override.run())
+        else:
+            self.simulation_mode = True
+            print("[HAL] HW CONNECTION FAILED. FALLING BACK TO SIM.")
+            self.last_ai_msg = "AIGIS // HARDWARE ERROR -> AI SIMULATION ACTIVE"
+        return success
 
     def run_scenario(self, scenario_name: str):
         """Interactive scenarios for judges to test stability."""
         if scenario_name == "rescue":
             self.status = "SEARCHING"
-            self.target_wp = {"x": 25, "z": 20}
+            self.plan_mission() # Every pending target, highest priority first, then home
             self.last_ai_msg = "GEMINI-3 FLASH ⚡ // REASONING: Optimal flight path identified. Sector Alpha-4 priority high. Navigating..."
         elif scenario_name == "emergency":
             self.status = "EMERGENCY"
@@ -116,29 +265,49 @@ class AIGISystemHAL:
             self.sim_pos = {"x": 0, "y": 5, "z": 0}
             self.status = "IDLE"
             self.battery = 100.0
-            self.target_wp = None
+            self.clear_mission()
             for t in self.targets: t["detected"] = False
+            self.coverage.reset()
             self.last_ai_msg = "GEMINI-3 FLASH // Mission profile reset. System standby."
 
-    async def update(self):
-        # Tick for simulation monitoring
-        if random.random() < 0.01: print(f"[HAL] Tick Update - State: {self.status}")
-        
+    async def update(self, dt: float = NOMINAL_DT):
+        self.ticks += 1
         if self.simulation_mode:
-            self._update_sim()
+            # Newest stick sample (or centred sticks after the deadman); hardware mode streams it as RC override
+            sticks = self.control.poll()
+            self.joystick_vector = {"x": sticks["rh"], "y": sticks["lv"], "z": 0.0 - sticks["rv"]}
+            self._update_sim(dt)
         else:
             self._sync_hardware()
+
+        self._sweep_coverage()
+
+        if self.recorder is not None:
+            self.recorder.append(time.time(), self.sim_pos, self.attitude, self.battery, self.status)
+
+        if self.fleet is not None:
+            for target in self.fleet.step(self.target_index, dt):
+                self._target_detected(target, by="fleet")
         
         # Periodic AI Insight in background to NOT block websocket
         current_time = time.time()
-        if self.status != "IDLE" and (current_time - self.last_ai_update > 12):
+        if self.status != "IDLE" and (current_time - self.last_ai_update > 12) and not self.ai_engine.busy:
             self.last_ai_update = current_time
             asyncio.create_task(self._update_ai_insight())
 
+    def _sweep_coverage(self):
+        # Only search modes count as coverage; the segment since last tick closes gaps at speed
+        if self.status not in COVERAGE_STATES:
+            self._sweep_from = None
+            return
+        x, z = self.sim_pos["x"], self.sim_pos["z"]
+        x0, z0 = self._sweep_from or (x, z)
+        self.coverage.sweep(x0, z0, x, z)
+        self._sweep_from = (x, z)
+
     async def _update_ai_insight(self):
         try:
-            telemetry = self.get_telemetry()
-            insight = await self.ai_engine.generate_insight(telemetry["status"])
+            insight = await self.ai_engine.generate_insight(self.snapshot()["status"])
             self.last_ai_msg = insight
         except Exception as e:
             print(f"[BG AI ERROR] {e}")
@@ -146,10 +315,14 @@ class AIGISystemHAL:
     def _sync_hardware(self):
         hw_telemetry = self.hw_driver.get_data()
         self.sim_pos = {"x": (hw_telemetry['lng']-0)*100000, "y": hw_telemetry['alt'], "z": (hw_telemetry['lat']-0)*100000}
+        self.attitude = {"pitch": hw_telemetry['pitch'], "roll": hw_telemetry['roll'], "yaw": hw_telemetry['yaw']}
         self.battery = hw_telemetry['battery_remaining']
         self.status = hw_telemetry['mode']
 
-    def _update_sim(self):
+    def _update_sim(self, dt: float = NOMINAL_DT):
+        # Motion constants are tuned per nominal 50 ms tick; scale them by the real timestep
+        k = dt / NOMINAL_DT
+
         # Auto-activate if joystick is being used
         is_manual = any(abs(v) > 0.01 for v in self.joystick_vector.values())
         if is_manual and self.status == "IDLE":
@@ -157,6 +330,9 @@ class AIGISystemHAL:
             self.last_ai_msg = "GEMINI-3 FLASH // MANUAL OVERRIDE DETECTED. PILOT IN CONTROL."
             self.log_event("MANUAL OVERRIDE: Joystick Input Detected")
 
+        if self.mission is not None:
+            self._steer_mission()
+
         if self.status in ["FLYING", "RETURNING", "SEARCHING", "SCANNING", "MANUAL"]:
             # Move towards target waypoint if set
             if self.target_wp:
@@ -164,125 +340,406 @@ class AIGISystemHAL:
                 dz = self.target_wp["z"] - self.sim_pos["z"]
                 dist = (dx**2 + dz**2)**0.5
                 if dist > 0.5:
-                    self.sim_pos["x"] += (dx/dist) * 0.2
-                    self.sim_pos["z"] += (dz/dist) * 0.2
+                    step = min(dist, 0.2 * k)
+                    self.sim_pos["x"] += (dx/dist) * step
+                    self.sim_pos["z"] += (dz/dist) * step
+                    self.attitude["yaw"] = math.atan2(dx, dz)
             else:
-                self.sim_pos["x"] += random.uniform(-0.1, 0.1)
-                self.sim_pos["z"] += random.uniform(-0.1, 0.1)
+                self.sim_pos["x"] += self.rng.uniform(-0.1, 0.1) * k
+                self.sim_pos["z"] += self.rng.uniform(-0.1, 0.1) * k
             
             # Apply manual robotic control if active (increased sensitivity)
-            self.sim_pos["x"] += self.joystick_vector["x"] * 1.5
-            self.sim_pos["y"] = max(0.5, min(150, self.sim_pos["y"] + self.joystick_vector["y"] * 1.5))
-            self.sim_pos["z"] += self.joystick_vector["z"] * 1.5
+            self.sim_pos["x"] += self.joystick_vector["x"] * 1.5 * k
+            self.sim_pos["y"] = max(0.5, min(150, self.sim_pos["y"] + self.joystick_vector["y"] * 1.5 * k))
+            self.sim_pos["z"] += self.joystick_vector["z"] * 1.5 * k
 
-            self.battery -= 0.015
+            self.battery -= 0.015 * k
         elif self.status == "EMERGENCY":
-            self.sim_pos["y"] = max(5, self.sim_pos["y"] - 0.8)
-            self.battery -= 0.05
+            self.sim_pos["y"] = max(5, self.sim_pos["y"] - 0.8 * k)
+            self.battery -= 0.05 * k
+
+        # AI Perception Logic (grid hash: only cells around the drone are checked)
+        for target in self.target_index.query_radius(self.sim_pos["x"], self.sim_pos["z"], DETECTION_RADIUS, pending_only=True):
+            self._target_detected(target, by="primary")
+
+    def _target_detected(self, target: Dict[str, Any], by: str):
+        # One path for every detector (primary vehicle, fleet): flag, re-plan, notify
+        target["detected"] = True
+        if self.mission is not None:
+            self.mission.drop_target(target["id"])
+        self.events.append(("target_detected", {
+            "id": target["id"], "type": target.get("type"), "priority": target.get("priority"),
+            "x": target["x"], "z": target["z"], "by": by,
+        }))
+        self.log_event(f"TARGET {target['id']} DETECTED ({target.get('priority')} {target.get('type')}) BY {by.upper()}")
+        self.last_ai_msg = f"GEMINI-3 FLASH ⚡ // THINKING: Humanoid heat signature detected. Probability 98%. Flagging Sector {target['id']} as 'STABLE RESCUE'."
 
-        # AI Perception Logic
-        for target in self.targets:
-            dist = ((self.sim_pos["x"] - target["x"])**2 + (self.sim_pos["z"] - target["z"])**2)**0.5
-            if dist < 8 and not target["detected"]:
-                target["detected"] = True
-                self.last_ai_msg = f"GEMINI-3 FLASH ⚡ // THINKING: Humanoid heat signature detected. Probability 98%. Flagging Sector {target['id']} as 'STABLE RESCUE'."
+    def _steer_mission(self):
+        if not (self.status in MISSION_STATES or (self.status == "RETURNING" and self.mission.rtl_reason)):
+            return # Paused (manual, emergency, landed)
+        self.target_wp = self.mission.steer(self.sim_pos["x"], self.sim_pos["z"], self.battery)
+        if self.target_wp is None:
+            self.status = "LANDED"
+            self.log_event("MISSION COMPLETE: Landed at home")
+            self.mission = None
+        elif self.mission.rtl_reason and self.status != "RETURNING":
+            self.status = "RETURNING"
+            self.log_event(f"MISSION RTL: {self.mission.rtl_reason}")
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Telemetry as of the last physics tick, built on first use and shared by every reader. Do not mutate."""
+        if self._snapshot_tick != self.ticks:
+            self._snapshot = self.get_telemetry()
+            self._snapshot_tick = self.ticks
+            self.snapshot_log_total = self.log_total
+        return self._snapshot
 
     def get_telemetry(self):
+        started = time.perf_counter()
         # Aerospace-grade health diagnostics
         health = {"imu": "OK", "gps": "G-RTK: FIXED", "link": "128-AES", "cpu": "18.2%", "temp": "42°C"}
         
-        velocity = 22.4 + random.uniform(-2, 2) if self.status != "IDLE" else 0.0
+        velocity = 22.4 + self.rng.uniform(-2, 2) if self.status != "IDLE" else 0.0
         
-        return {
-            "position": self.sim_pos,
+        # Copies of the live state, so a published frame never changes after the fact
+        telemetry = {
+            "position": dict(self.sim_pos),
+            "attitude": dict(self.attitude),
             "status": {
                 "battery": round(self.battery, 2), "state": self.status,
                 "ai_alert": self.last_ai_msg, "mission_time": round(time.time() - self.start_time, 0),
                 "hardware_link": not self.simulation_mode, "altitude": round(self.sim_pos["y"], 1),
-                "velocity": round(velocity, 1), "health": health
+                "velocity": round(velocity, 1), "health": health,
+                "coverage_m2": round(self.coverage.covered_area()),
             },
-            "targets": self.targets,
-            "logs": self.logs
+            "targets": [dict(t) for t in self.targets],
+            "logs": list(self.logs)
         }
+        TELEMETRY_BUILD.observe(time.perf_counter() - started)
+        return telemetry
 
 # --- PATH CONFIGURATION ---
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DIST_DIR = os.path.join(BASE_DIR, "aigis-uav-system", "dist")
 ROOT_INDEX = os.path.join(BASE_DIR, "index.html")
+RECORDER_DIR = os.environ.get("AIGIS_RECORDER_DIR", os.path.join(BASE_DIR, "flight_data"))
+LEGACY_RADAR = os.path.join(BASE_DIR, "radar-standalone.html")
+static_cache = AssetCache() # Dashboards and bundles, precompressed in memory (backend/net/static_assets.py)
 
 hal = AIGISystemHAL()
 
 # --- WEBSOCKET MANAGER ---
-class ConnectionManager:
-    def __init__(self):
-        self.active_connections: List[WebSocket] = []
-
-    async def connect(self, websocket: WebSocket):
-        await websocket.accept()
-        self.active_connections.append(websocket)
-
-    def disconnect(self, websocket: WebSocket):
-        if websocket in self.active_connections:
-            self.active_connections.remove(websocket)
-
-    async def broadcast(self, message: dict):
-        # Broadcast needed for telemetry fan-out
-        for connection in self.active_connections:
-            try:
-                await connection.send_json(message)
-            except Exception:
-                pass # Connection likely dead, will be cleaned up
-
 manager = ConnectionManager()
+fleet_channels: Dict[int, ConnectionManager] = {} # Per-drone fan-out for /ws/fleet/{id}
+status_feed = SnapshotFeed() # Serialized /api/status state (backend/net/snapshot.py)
+LONG_POLL_MAX = 30.0 # seconds
 
-@app.on_event("startup")
-async def startup_event():
+def status_snapshot() -> StatusSnapshot:
+    # The current tick's telemetry, encoded at most once however many readers ask
+    return status_feed.update(hal.snapshot(), log_total=hal.snapshot_log_total)
+
+async def discover_models() -> List[str]:
     print("[AIGIS] LOGISTICS: Checking available AI models...")
-    if GEN_API_KEY:
-        try:
-            available_models = [m.name for m in genai.list_models()]
-            print(f"[AIGIS] AVAILABLE MODELS: {available_models}")
-        except Exception as e:
-            print(f"[AIGIS] COULD NOT LIST MODELS: {e}")
+    available_models = await asyncio.to_thread(list_models, GEN_API_KEY)
+    print(f"[AIGIS] AVAILABLE MODELS: {available_models}")
+    return available_models
+
+async def start_state_owner():
+    """Everything only the vehicle owner runs: HAL boot, the clocks, then the slow startup probes."""
+    if hub.latest is not None:
+        hal.adopt_telemetry(hub.latest, replicated_plan) # Promoted follower: continue the previous owner's flight
     await hal.initialize()
     # Continuous Simulation Clock (Async)
     asyncio.create_task(simulation_engine_loop())
     asyncio.create_task(telemetry_broadcast_loop())
+    health.mark_ready()
+    # Network-bound checks run behind a serving backend; results at GET /api/health
+    if GEN_API_KEY:
+        health.probe("ai_models", discover_models, timeout=20.0)
+    else:
+        health.skip("ai_models", "GOOGLE_API_KEY not set")
+    if os.environ.get("AUTO_CONNECT_HW") == "1":
+        health.probe("hardware", hal.connect_hardware, timeout=15.0)
+    else:
+        health.skip("hardware", "AUTO_CONNECT_HW not set")
+
+async def relay_telemetry(data: Dict[str, Any], log_total: Optional[int], version: Optional[int] = None):
+    # Follower workers: re-broadcast the owner's frame to this worker's consoles
+    health.mark_ready() # First downlink frame: this worker can serve telemetry
+    snapshot = status_feed.update(data, version=version, log_total=log_total)
+    await manager.broadcast(snapshot.data, log_total=snapshot.log_total, encoded=snapshot.text)
+    manager.publish_topics(data, hal.coverage)
+
+async def pull_coverage(version: int):
+    # Follower workers mirror the owner's coverage map (served to topic clients, kept for failover)
+    try:
+        while hal.coverage.version < version:
+            status, _, body = await hub.forward("GET", "/api/coverage/tiles", f"since={hal.coverage.version}", [], b"")
+            if status != 200:
+                return
+            frame = json.loads(body)
+            hal.coverage.apply(frame)
+            if not frame["more"]:
+                return
+    except (ConnectionError, asyncio.TimeoutError, ValueError):
+        pass # Next announcement retries
+
+async def relay_coverage(version: int):
+    # Runs off the downlink reader: the pull's responses arrive on that same stream
+    global coverage_pull
+    if coverage_pull is None or coverage_pull.done():
+        coverage_pull = asyncio.create_task(pull_coverage(version))
+
+coverage_pull: Optional[asyncio.Task] = None
+
+replicated_plan: Optional[Dict[str, Any]] = None # The owner's replication_state(), resumed on promotion
+
+async def relay_plan(**plan):
+    global replicated_plan
+    replicated_plan = plan
+
+async def relay_event(event: str, data: Dict[str, Any]):
+    manager.publish_event(event, data)
+
+async def relay_drone(drone_id: int, data: Dict[str, Any]):
+    channel = fleet_channels.get(drone_id)
+    if channel is not None:
+        await channel.broadcast(data)
+
+def apply_joystick(vector: Dict[str, Any], seq: Optional[int] = None, ts: Optional[float] = None,
+                   source: str = "rest") -> str:
+    # Vector: {lv: thrust/y, lh: yaw, rv: pitch, rh: roll}; applied by the next physics tick (sim -> x/y/z)
+    return hal.control.submit(vector, seq=seq, ts=ts, source=source)
+
+def apply_drone_joystick(drone_id: int, vector: Dict[str, Any]):
+    if hal.fleet is not None and 0 <= drone_id < hal.fleet.size:
+        hal.fleet.set_joystick(drone_id, vector)
+
+hub.on_telemetry = relay_telemetry
+hub.on_drone = relay_drone
+hub.on_event = relay_event
+hub.downlink.update(coverage=relay_coverage, plan=relay_plan)
+hub.handlers.update(joystick=apply_joystick, joystick_forget=hal.control.forget, drone_joystick=apply_drone_joystick)
+
+@app.on_event("startup")
+async def startup_event():
+    LOOP_MONITOR.start()
+    # Every worker serves the dashboards itself; compress them before the first operator asks
+    health.probe("static_assets", lambda: asyncio.to_thread(static_cache.warm, ROOT_INDEX, LEGACY_RADAR, DIST_DIR))
+    await hub.start(on_promote=start_state_owner)
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await hub.close()
+    if hal.recorder is not None:
+        hal.recorder.close()
+
+# Absolute-deadline clocks; rates are configurable per loop
+physics_clock = FixedRateClock("PHYSICS", hz=float(os.environ.get("AIGIS_PHYSICS_HZ", "20")), observer=PHYSICS_TICK.observe)
+radio_clock = FixedRateClock("RADIO", hz=float(os.environ.get("AIGIS_BROADCAST_HZ", "12.5")), observer=BROADCAST_TICK.observe)
+manager.topic_max_rate = physics_clock.hz # Topic subscriptions are served from the physics tick
+
+# --- METRICS (scrape-time gauges; hot paths only feed histograms) ---
+def _clock_samples(attr: str):
+    return [({"clock": "physics"}, getattr(physics_clock, attr)), ({"clock": "broadcast"}, getattr(radio_clock, attr))]
+
+def _queue_depths():
+    channels = list(manager.active_connections.values())
+    return [({"stat": "sum"}, sum(c.queue_depth for c in channels)),
+            ({"stat": "max"}, max((c.queue_depth for c in channels), default=0))]
+
+def _mavlink_rates():
+    return [({"link": link.connection_string, "type": t}, rate)
+            for link in hal.hw_driver.links for t, rate in link.rates.items()]
+
+def _mavlink_dropped():
+    return [({"link": s["link"]}, s["dropped"]) for s in hal.hw_driver.link_stats()["links"]]
+
+def _ai_counters():
+    return [({"event": k}, v) for k, v in hal.ai_engine.metrics.items()]
+
+REGISTRY.gauge("aigis_ws_clients", "Connected /ws/telemetry clients", lambda: len(manager.active_connections))
+REGISTRY.gauge("aigis_ws_queue_depth", "Outbound frames queued across telemetry clients", _queue_depths)
+REGISTRY.gauge("aigis_ws_topic_clients", "Telemetry clients in topic-subscription mode", lambda: len(manager.topic_channels()))
+REGISTRY.gauge("aigis_ws_throttled_clients", "Topic clients whose rates are scaled down for backpressure",
+               lambda: sum(1 for c in manager.topic_channels() if c.subscription.scale < 1.0))
+REGISTRY.counter_fn("aigis_ws_evicted_total", "Telemetry clients evicted for stalling", lambda: manager.evicted_total)
+REGISTRY.gauge("aigis_command_queue_depth", "MAVLink commands waiting for the writer", lambda: hal.command_queue.queue.qsize(),
+               scope=VEHICLE)
+REGISTRY.gauge("aigis_mavlink_message_rate_hz", "MAVLink ingest rate per link and message type", _mavlink_rates, scope=VEHICLE)
+REGISTRY.counter_fn("aigis_mavlink_dropped_total", "MAVLink packets lost (sequence gaps)", _mavlink_dropped, scope=VEHICLE)
+REGISTRY.counter_fn("aigis_clock_overruns_total", "Ticks whose work exceeded the period", lambda: _clock_samples("overruns"),
+                    scope=VEHICLE)
+REGISTRY.counter_fn("aigis_clock_missed_deadlines_total", "Deadlines skipped beyond the catch-up budget",
+                    lambda: _clock_samples("missed"), scope=VEHICLE)
+REGISTRY.counter_fn("aigis_ai_events_total", "Tactical AI service events", _ai_counters, scope=VEHICLE)
+REGISTRY.counter_fn("aigis_joystick_samples_total", "Joystick samples by outcome",
+                    lambda: [({"outcome": k}, v) for k, v in hal.control.counts.items()], scope=VEHICLE)
+REGISTRY.counter_fn("aigis_status_responses_total", "/api/status responses by kind",
+                    lambda: [({"kind": k}, v) for k, v in status_feed.counts.items()])
+REGISTRY.counter_fn("aigis_static_responses_total", "Static file responses by encoding (disk: not cached yet)",
+                    lambda: [({"kind": k}, v) for k, v in static_cache.counts.items()])
+REGISTRY.gauge("aigis_static_cache_bytes", "Static asset bytes held in memory, all encodings", lambda: static_cache.bytes)
+REGISTRY.gauge("aigis_battery_percent", "Primary vehicle battery", lambda: hal.battery, scope=VEHICLE)
+REGISTRY.gauge("aigis_fleet_size", "Simulated fleet size", lambda: hal.fleet.size if hal.fleet is not None else 0,
+               scope=VEHICLE)
+REGISTRY.gauge("aigis_state_hub_followers", "Follower workers attached to this state owner", lambda: len(hub.followers),
+               scope=VEHICLE)
+REGISTRY.gauge("aigis_recorder_records", "Flight recorder records this session",
+               lambda: hal.recorder.total_records if hal.recorder is not None else None, scope=VEHICLE)
+
+announced_coverage = 0 # Last coverage version announced to follower workers
+announced_plan: Optional[Tuple] = None # plan_key() as last retained for follower workers
+
+def plan_key() -> Tuple:
+    # Changes whenever replication_state() would: a new mission or fleet, or progress along the route
+    mission = hal.mission
+    progress = (mission.index, mission.replans, len(mission.waypoints), mission.rtl_reason) if mission is not None else None
+    return hal.plan_version, progress
+
+async def broadcast_tick(dt: float):
+    global announced_coverage, announced_plan
+    if hub.role == "owner" and plan_key() != announced_plan:
+        announced_plan = plan_key()
+        hub.retain("plan", **hal.replication_state()) # Followers that connect later get it too
+    # Downlink current state to all pilots, on this worker and on every follower worker
+    if manager.active_connections or hub.followers:
+        snapshot = status_snapshot()
+        await manager.broadcast(snapshot.data, log_total=snapshot.log_total, encoded=snapshot.text)
+        hub.publish("telemetry", data=snapshot.data, log_total=snapshot.log_total, version=snapshot.version)
+        if hal.coverage.version != announced_coverage:
+            announced_coverage = hal.coverage.version
+            hub.publish("coverage", version=hal.coverage.version) # Followers pull the changed tiles
+    if hal.fleet is not None:
+        remote = hub.drone_subscriptions()
+        for drone_id in set(fleet_channels) | remote:
+            if drone_id >= hal.fleet.size:
+                continue
+            channel = fleet_channels.get(drone_id)
+            if (channel is None or not channel.active_connections) and drone_id not in remote:
+                continue
+            data = hal.fleet.get_drone(drone_id)
+            if channel is not None:
+                await channel.broadcast(data)
+            if drone_id in remote:
+                hub.publish("drone", id=drone_id, data=data)
+
+async def physics_tick(dt: float):
+    await hal.update(dt)
+    # Events go out on the tick they happen; topic subscribers get whatever is due this tick
+    for event, data in hal.drain_events():
+        manager.publish_event(event, data)
+        hub.publish("event", event=event, data=data)
+    if manager.topic_channels():
+        manager.publish_topics(hal.snapshot(), hal.coverage)
+    if status_feed.waiting:
+        status_snapshot() # Long-polls wake on the tick the state changes
 
 async def telemetry_broadcast_loop():
-    """Independent Telemetry Broadcast (12.5Hz)"""
-    print("[AIGIS] RADIO BROADCAST TOWER ONLINE")
-    while True:
-        try:
-             # Downlink current state to all pilots
-             if len(manager.active_connections) > 0:
-                 data = hal.get_telemetry()
-                 await manager.broadcast(data)
-        except Exception as e:
-            print(f"[RADIO ERROR] {e}")
-        await asyncio.sleep(0.08)
+    """Independent Telemetry Broadcast (12.5Hz default)"""
+    print(f"[AIGIS] RADIO BROADCAST TOWER ONLINE [{radio_clock.hz:g}Hz]")
+    await radio_clock.run(broadcast_tick)
 
 async def simulation_engine_loop():
-    """Independent High-Frequency Physics Clock (20Hz)"""
-    print("[AIGIS] PHYSICS ENGINE ONLINE [20Hz]")
-    while True:
-        try:
-            await hal.update()
-        except Exception as e:
-            print(f"[PHYSICS ERROR] {e}")
-        await asyncio.sleep(0.05) # 20fps for physics
+    """Independent High-Frequency Physics Clock (20Hz default)"""
+    print(f"[AIGIS] PHYSICS ENGINE ONLINE [{physics_clock.hz:g}Hz]")
+    await physics_clock.run(physics_tick)
 
 # --- TACTICAL API & DATA ROUTES ---
 @app.get("/api/status")
-async def get_status():
-    return hal.get_telemetry()
+async def get_status(request: Request, since: Optional[int] = None, timeout: float = 25.0):
+    # ETag / If-None-Match -> 304; ?since=<X-Telemetry-Version> long-polls for the next change
+    if hub.is_follower:
+        # Served from the owner's last downlink frame; no round trip
+        snapshot = status_feed.current
+        if snapshot is None:
+            raise HTTPException(status_code=503, detail="Waiting for state owner")
+    else:
+        snapshot = status_snapshot()
+    if since is not None:
+        status_feed.counts["long_poll"] += 1
+        changed = await status_feed.wait_changed(since, max(0.0, min(timeout, LONG_POLL_MAX)))
+        if changed is None:
+            status_feed.counts["long_poll_timeout"] += 1
+            return _status_response(snapshot, not_modified=True)
+        snapshot = changed
+    elif snapshot.matches(request.headers.get("if-none-match")):
+        status_feed.counts["not_modified"] += 1
+        return _status_response(snapshot, not_modified=True)
+    status_feed.counts["full"] += 1
+    return _status_response(snapshot)
+
+def _status_response(snapshot: StatusSnapshot, not_modified: bool = False) -> Response:
+    headers = {"ETag": snapshot.etag, "X-Telemetry-Version": str(snapshot.version), "Cache-Control": "no-cache"}
+    if not_modified:
+        return Response(status_code=304, headers=headers)
+    return Response(content=snapshot.body, media_type="application/json", headers=headers)
+
+@app.get("/api/health")
+async def get_health():
+    # 503 until this worker can serve telemetry (owner: clocks running; follower: first downlink frame)
+    body = {"role": hub.role, **health.stats(), "hardware_link": not hal.simulation_mode}
+    if hub.is_follower:
+        body["owner_connected"] = hub.connected # Probes run on the owner only
+    return JSONResponse(body, status_code=200 if health.ready else 503)
+
+@app.get("/api/hub")
+async def get_hub():
+    # Worker role in multi-process deployments (standalone / owner / follower)
+    return hub.stats()
+
+async def _vehicle_metrics() -> str:
+    # Vehicle, fleet and mission metrics live on the state owner; a follower's own HAL is idle
+    if not hub.is_follower:
+        return REGISTRY.render(VEHICLE)
+    try:
+        status, _, payload = await hub.forward("GET", "/api/metrics", "scope=vehicle", [], b"")
+    except (ConnectionError, asyncio.TimeoutError):
+        return "# vehicle metrics unavailable: state owner unreachable\n"
+    if status != 200:
+        return f"# vehicle metrics unavailable: state owner answered {status}\n"
+    return payload.decode()
+
+@app.get("/api/metrics")
+async def get_metrics(scope: Optional[str] = None):
+    # Prometheus text exposition format: the owner's vehicle metrics plus this worker's process metrics
+    if scope not in (None, VEHICLE, PROCESS):
+        raise HTTPException(status_code=422, detail=f"scope must be {VEHICLE!r} or {PROCESS!r}")
+    parts = []
+    if scope != PROCESS:
+        parts.append(await _vehicle_metrics())
+    if scope != VEHICLE:
+        parts.append(REGISTRY.render(PROCESS, {"worker": hub.role, "pid": str(os.getpid())}))
+    return PlainTextResponse("".join(parts), media_type="text/plain; version=0.0.4")
+
+@app.get("/api/ai")
+async def get_ai_stats():
+    # Insight service health: cache hits, coalescing, rate limiting, latency
+    return hal.ai_engine.stats()
+
+@app.get("/api/clocks")
+async def get_clocks():
+    # Tick jitter, overruns and missed deadlines per loop
+    clocks = {"physics": physics_clock.stats(), "broadcast": radio_clock.stats()}
+    if hal.rc_override is not None:
+        clocks["rc_override"] = hal.rc_override.clock.stats()
+    return clocks
+
+@app.get("/api/link")
+async def get_link():
+    # MAVLink ingest health: snapshot version/age plus per-link rates and drop counters
+    return {"hardware_link": not hal.simulation_mode, **hal.hw_driver.link_stats()}
 
 @app.post("/api/command/{cmd}")
-async def send_command(cmd: str):
+async def send_command(cmd: str, wait: bool = False, timeout: float = 5.0):
     print(f"[COMMAND] Received: {cmd}")
+    record = None
     if not hal.simulation_mode: 
-        print(f"[MAVLINK] Sending {cmd} to hardware...")
-        hal.hw_driver.send_command(cmd)
+        # Queued for the MAVLink writer; ?wait=true blocks until COMMAND_ACK (or timeout)
+        print(f"[MAVLINK] Queueing {cmd} for hardware...")
+        record = hal.command_queue.submit(cmd)
+        if wait:
+            await hal.command_queue.wait(record, timeout=timeout)
     if cmd == "takeoff": 
         hal.status = "FLYING"
         hal.last_ai_msg = "GEMINI-3 FLASH // PROTOCOL 101: Initializing vertical ascent. Stabilizing at mission altitude."
@@ -291,6 +748,8 @@ async def send_command(cmd: str):
         hal.last_ai_msg = "GEMINI-3 FLASH // PROTOCOL 102: Landing sequence engaged. Descending to stable surface."
     elif cmd == "rtl": 
         hal.status = "RETURNING"
+        if hal.mission is not None:
+            hal.mission.return_home()
         hal.last_ai_msg = "GEMINI-3 FLASH // PROTOCOL 103: Return to Launch initiated. Recalculating path."
     elif cmd == "scan": 
         hal.status = "SEARCHING"
@@ -303,27 +762,179 @@ async def send_command(cmd: str):
         hal.battery = 15.0
         hal.last_ai_msg = "GEMINI-3 FLASH // ALERT: Manual emergency override detected. Critical recovery pattern active."
         
-    return {"status": "ACK", "drone_state": hal.status, "ai_msg": hal.last_ai_msg}
+    return {
+        "status": "ACK", "drone_state": hal.status, "ai_msg": hal.last_ai_msg,
+        "command": record.to_dict() if record else None,
+    }
+
+@app.get("/api/commands")
+async def list_commands():
+    return hal.command_queue.status()
+
+@app.get("/api/commands/{command_id}")
+async def get_command(command_id: int, wait: bool = False, timeout: float = 5.0):
+    record = hal.command_queue.get(command_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail=f"Command {command_id} not found")
+    if wait:
+        await hal.command_queue.wait(record, timeout=timeout)
+    return record.to_dict()
 
 @app.post("/api/scenario/{name}")
 async def set_scenario(name: str):
     hal.run_scenario(name)
     return {"status": "INJECTED", "scenario": name}
 
+@app.post("/api/targets")
+async def load_targets(targets: List[dict], replace: bool = True):
+    # Each target needs at least {"id", "x", "z"}
+    for t in targets:
+        if not all(k in t for k in ("id", "x", "z")):
+            raise HTTPException(status_code=422, detail="each target requires id, x and z")
+    hal.load_targets(targets, replace=replace)
+    return {"status": "LOADED", "count": len(hal.targets)}
+
+@app.delete("/api/targets/{target_id}")
+async def remove_target(target_id: int):
+    if not hal.remove_target(target_id):
+        raise HTTPException(status_code=404, detail=f"Target {target_id} not found")
+    return {"status": "REMOVED", "target": target_id}
+
 @app.post("/api/joystick")
 async def post_joystick(vector: dict):
-    # Vector: {lv: thrust/y, lh: yaw, rv: pitch, rh: roll} -> mapped to internal sim
-    # Simplified mapping for sim: rh/rv -> x/z movement, lv -> y movement
-    hal.joystick_vector = {
-        "x": vector.get("rh", 0),
-        "y": vector.get("lv", 0),
-        "z": -vector.get("rv", 0)
-    }
-    return {"status": "RC_ACK"}
+    # Optional "seq" and "ts" (ms) fields enable out-of-order and stale rejection
+    try:
+        sample = normalize_sample(vector, vector.get("seq"), vector.get("ts"))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    result = apply_joystick(**sample)
+    return {"status": "RC_ACK", "sample": result}
+
+@app.get("/api/control")
+async def get_control():
+    # Stick uplink health: accepted/coalesced/dropped counts, deadman trips, input-to-applied latency
+    stats = hal.control.stats()
+    if hal.rc_override is not None:
+        stats["rc_override"] = hal.rc_override.stats()
+    return stats
+
+# --- MISSION PLANNER ---
+@app.post("/api/mission")
+async def plan_mission(params: dict):
+    # {"polygon": [[x, z], ...], "pattern": "lawnmower" | "expanding_square", "width", "angle", "center", "radius", "reserve"}
+    allowed = {"polygon", "pattern", "width", "angle", "center", "radius", "reserve"}
+    unknown = set(params) - allowed
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"unknown mission fields: {sorted(unknown)}")
+    try:
+        mission = hal.plan_mission(**params)
+    except (ValueError, TypeError, IndexError) as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return mission.stats(hal.sim_pos["x"], hal.sim_pos["z"], waypoints=True)
+
+@app.get("/api/mission")
+async def get_mission(waypoints: bool = False):
+    if hal.mission is None:
+        raise HTTPException(status_code=409, detail="No active mission")
+    return hal.mission.stats(hal.sim_pos["x"], hal.sim_pos["z"], waypoints=waypoints)
+
+@app.delete("/api/mission")
+async def abort_mission():
+    hal.clear_mission()
+    return {"status": "ABORTED"}
+
+# --- SEARCH COVERAGE ---
+@app.get("/api/coverage")
+async def get_coverage():
+    return hal.coverage.stats()
+
+@app.get("/api/coverage/tiles")
+async def get_coverage_tiles(since: int = 0, max_tiles: int = 256):
+    # Incremental sync: pass the returned "version" as the next `since`; repeat while "more"
+    return hal.coverage.frame(since, max_tiles=max(1, max_tiles))
+
+@app.delete("/api/coverage")
+async def reset_coverage():
+    hal.coverage.reset()
+    return {"status": "RESET", "version": hal.coverage.version}
+
+# --- FLIGHT RECORDER ---
+def _require_recorder() -> FlightRecorder:
+    if hal.recorder is None:
+        raise HTTPException(status_code=409, detail="Flight recorder disabled")
+    return hal.recorder
+
+@app.get("/api/recorder")
+async def recorder_info():
+    return _require_recorder().info()
+
+@app.get("/api/recorder/track")
+async def recorder_track(start: float = 0.0, end: Optional[float] = None, max_points: int = 1000):
+    recorder = _require_recorder()
+    records = recorder.query(start, end if end is not None else time.time(), max_points=max(1, max_points))
+    return {"session": recorder.session, "count": len(records), "track": FlightRecorder.to_columns(records)}
+
+REPLAY_HZ = 12.5 # Never replay denser than the live downlink
+REPLAY_PAGE = 2000 # frames per owner round trip when a follower worker relays a replay
+
+def _replay_page(recorder: FlightRecorder, start: float, end: float, offset: int = 0,
+                 limit: Optional[int] = None) -> Dict[str, Any]:
+    records = recorder.query(start, end, max_points=int((end - start) * REPLAY_HZ) + 1)
+    page = records[offset:offset + limit] if limit is not None else records[offset:]
+    return {"total": len(records), "frames": [FlightRecorder.to_frame(r) for r in page]}
+
+@app.get("/api/recorder/replay")
+async def recorder_replay(start: float, end: float, offset: int = 0, limit: int = REPLAY_PAGE):
+    # Paged replay frames; follower workers relay /ws/telemetry?replay_start= through this
+    return _replay_page(_require_recorder(), start, end, max(0, offset), max(1, limit))
+
+async def _fetch_replay(start: float, end: float, offset: int) -> Optional[Dict[str, Any]]:
+    """Replay frames from this worker's recorder, or from the owner's on follower workers; None if unavailable."""
+    if not hub.is_follower:
+        return _replay_page(hal.recorder, start, end, offset) if hal.recorder is not None else None
+    query = f"start={start!r}&end={end!r}&offset={offset}&limit={REPLAY_PAGE}"
+    try:
+        status, _, payload = await hub.forward("GET", "/api/recorder/replay", query, [], b"")
+    except (ConnectionError, asyncio.TimeoutError):
+        return None
+    return json.loads(payload) if status == 200 else None
+
+async def stream_replay(websocket: WebSocket, start: float, end: Optional[float], speed: float):
+    """Play a recorded time range back at `speed`x, paced by the recorded timestamps."""
+    await websocket.accept()
+    end = end if end is not None else time.time()
+    speed = max(0.01, speed)
+    page = await _fetch_replay(start, end, 0)
+    if page is None:
+        await websocket.close(code=1011)
+        return
+    print(f"[WS] Replay Client Connected ({page['total']} frames)")
+    sent, prev_t = 0, None
+    try:
+        while page is not None and page["frames"]:
+            for frame in page["frames"]:
+                t = frame["replay"]["t"]
+                if prev_t is not None:
+                    await asyncio.sleep(min(5.0, (t - prev_t) / speed))
+                prev_t = t
+                await websocket.send_json(frame)
+            sent += len(page["frames"])
+            page = await _fetch_replay(start, end, sent) if sent < page["total"] else None
+        await websocket.send_json({"replay": {"done": True, "frames": sent}})
+        await websocket.close()
+    except Exception:
+        pass # Client left mid-replay
 
 @app.websocket("/ws/telemetry")
-async def websocket_telemetry(websocket: WebSocket):
-    await manager.connect(websocket)
+async def websocket_telemetry(websocket: WebSocket, proto: str = "json", replay_start: Optional[float] = None,
+                              replay_end: Optional[float] = None, speed: float = 1.0):
+    # proto: json (legacy full frames) | delta | binary -- see backend/net/telemetry_codec.py
+    # replay_start/replay_end: stream a flight recorder range instead of the live downlink
+    if replay_start is not None:
+        await stream_replay(websocket, replay_start, replay_end, speed)
+        return
+    await manager.connect(websocket, protocol=proto)
+    source = f"ws-{os.getpid()}-{id(websocket)}"
     print("[WS] Client Connected")
     try:
         while True:
@@ -332,12 +943,18 @@ async def websocket_telemetry(websocket: WebSocket):
             
             # Process Joystick Packet
             if data.get("type") == "JOYSTICK":
-                vector = data.get("data", {})
-                hal.joystick_vector = {
-                    "x": vector.get("rh", 0),
-                    "y": vector.get("lv", 0),
-                    "z": -vector.get("rv", 0)
-                }
+                try:
+                    sample = normalize_sample(data.get("data", {}), data.get("seq"), data.get("ts"))
+                except ValueError:
+                    continue # Malformed stick sample (NaN, strings, ...): dropped, like /ws/control
+                hub.uplink("joystick", source=source, **sample)
+            elif data.get("type") == "RESYNC":
+                manager.request_keyframe(websocket)
+            elif data.get("type") == "SUBSCRIBE":
+                # Topic mode, see backend/net/topics.py
+                manager.subscribe(websocket, data.get("topics", {}))
+            elif data.get("type") == "UNSUBSCRIBE":
+                manager.unsubscribe(websocket, data.get("topics", []))
             
             # Keep-alive logic implied by receive loop
             
@@ -347,31 +964,129 @@ async def websocket_telemetry(websocket: WebSocket):
     except Exception as e:
         manager.disconnect(websocket)
         # print(f"[WS LINK ERROR] {e}") # Silent error
+    finally:
+        hub.uplink("joystick_forget", source=source)
+
+@app.websocket("/ws/control")
+async def websocket_control(websocket: WebSocket):
+    # Dedicated pilot uplink for high-rate stick samples; no downlink (see backend/drivers/rc_uplink.py)
+    await websocket.accept()
+    source = f"ctl-{os.getpid()}-{id(websocket)}"
+    try:
+        while True:
+            sample = parse_sample(await websocket.receive_text())
+            if sample is not None:
+                hub.uplink("joystick", source=source, **sample)
+    except Exception:
+        pass # Disconnect; the deadman centres the sticks
+    finally:
+        hub.uplink("joystick_forget", source=source)
+
+# --- FLEET (SWARM) ROUTES ---
+def _require_fleet() -> FleetSimulator:
+    if hal.fleet is None:
+        raise HTTPException(status_code=409, detail="Fleet mode not active")
+    return hal.fleet
+
+def _require_drone(drone_id: int) -> FleetSimulator:
+    fleet = _require_fleet()
+    if not 0 <= drone_id < fleet.size:
+        raise HTTPException(status_code=404, detail=f"Drone {drone_id} not in fleet")
+    return fleet
+
+@app.post("/api/fleet/spawn")
+async def spawn_fleet(count: int = 100, seed: Optional[int] = None):
+    if not 1 <= count <= MAX_FLEET_SIZE:
+        raise HTTPException(status_code=422, detail=f"count must be between 1 and {MAX_FLEET_SIZE}")
+    hal.enable_fleet(count, seed=seed)
+    return {"status": "SPAWNED", "size": count}
+
+@app.delete("/api/fleet")
+async def release_fleet():
+    hal.disable_fleet()
+    return {"status": "RELEASED"}
+
+@app.get("/api/fleet")
+async def get_fleet(positions: bool = False):
+    return _require_fleet().summary(include_positions=positions)
+
+@app.post("/api/fleet/command/{cmd}")
+async def fleet_command(cmd: str):
+    if not _require_fleet().command(cmd):
+        raise HTTPException(status_code=400, detail=f"Unknown command {cmd}")
+    return {"status": "ACK", "scope": "fleet", "command": cmd}
+
+@app.get("/api/fleet/{drone_id}")
+async def get_drone(drone_id: int):
+    return _require_drone(drone_id).get_drone(drone_id)
+
+@app.post("/api/fleet/{drone_id}/command/{cmd}")
+async def drone_command(drone_id: int, cmd: str):
+    fleet = _require_drone(drone_id)
+    if not fleet.command(cmd, drone_id):
+        raise HTTPException(status_code=400, detail=f"Unknown command {cmd}")
+    return {"status": "ACK", "drone": drone_id, "drone_state": fleet.get_drone(drone_id)["status"]["state"]}
+
+@app.post("/api/fleet/{drone_id}/waypoint")
+async def drone_waypoint(drone_id: int, waypoint: dict):
+    fleet = _require_drone(drone_id)
+    if "x" in waypoint and "z" in waypoint:
+        fleet.set_waypoint(drone_id, float(waypoint["x"]), float(waypoint["z"]))
+    else:
+        fleet.clear_waypoint(drone_id)
+    return {"status": "WP_ACK", "drone": drone_id}
+
+@app.post("/api/fleet/{drone_id}/joystick")
+async def drone_joystick(drone_id: int, vector: dict):
+    _require_drone(drone_id).set_joystick(drone_id, vector)
+    return {"status": "RC_ACK", "drone": drone_id}
+
+@app.websocket("/ws/fleet/{drone_id}")
+async def websocket_drone(websocket: WebSocket, drone_id: int):
+    channel = fleet_channels.setdefault(drone_id, ConnectionManager())
+    await channel.connect(websocket)
+    hub.set_drone_interest(drone_id, True)
+    try:
+        while True:
+            data = await websocket.receive_json()
+            if data.get("type") == "JOYSTICK":
+                try:
+                    vector = normalize_sample(data.get("data", {}))["vector"]
+                except ValueError:
+                    continue # Malformed stick sample: dropped
+                hub.uplink("drone_joystick", drone_id=drone_id, vector=vector)
+    except Exception:
+        pass # Disconnect or malformed uplink
+    finally:
+        channel.disconnect(websocket)
+        if not channel.active_connections:
+            fleet_channels.pop(drone_id, None)
+            hub.set_drone_interest(drone_id, False)
 
 # --- UI & STATIC FILE ROUTES ---
 
 # Route for the Modern React App
 @app.get("/app")
-async def read_app():
-    return FileResponse(os.path.join(DIST_DIR, "index.html"))
+async def read_app(request: Request):
+    return await static_cache.file(request, os.path.join(DIST_DIR, "index.html"))
 
-# Explicit route for assets to avoid any path confusion
+# Explicit route for assets to avoid any path confusion; Vite hashes these names, so they never change
 if os.path.exists(os.path.join(DIST_DIR, "assets")):
-    app.mount("/assets", StaticFiles(directory=os.path.join(DIST_DIR, "assets")), name="assets")
+    app.mount("/assets", CachedStaticFiles(directory=os.path.join(DIST_DIR, "assets"), cache=static_cache, immutable=True), name="assets")
 
 # Route for the Legacy Standalone Radar (Maintains compatibility)
 @app.get("/radar-standalone.html")
-async def read_legacy():
-    return FileResponse(os.path.join(BASE_DIR, "radar-standalone.html"))
+async def read_legacy(request: Request):
+    return await static_cache.file(request, LEGACY_RADAR)
 
 # Route for the Main Tactical Portal
 @app.get("/")
-async def read_index():
-    return FileResponse(ROOT_INDEX)
+async def read_index(request: Request):
+    return await static_cache.file(request, ROOT_INDEX)
 
 # Final Catch-all for static files in dist (vite.svg, style.css, etc)
 if os.path.exists(DIST_DIR):
-    app.mount("/", StaticFiles(directory=DIST_DIR), name="root_static")
+    app.mount("/", CachedStaticFiles(directory=DIST_DIR, cache=static_cache), name="root_static")
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,78 @@
+"""
+Startup health: readiness plus background probes.
+
+Slow checks (AI model discovery, the hardware heartbeat) never hold up boot;
+each runs as a task once the backend is serving and records its outcome here
+for GET /api/health.
+"""
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+PROBE_STATES = ("pending", "running", "ok", "failed", "skipped")
+
+
+class Probe:
+    def __init__(self, name: str):
+        self.name = name
+        self.state = "pending"
+        self.detail: Any = None
+        self.started_at: Optional[float] = None
+        self.duration: Optional[float] = None
+        self.task: Optional[asyncio.Task] = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "detail": self.detail,
+            "duration_s": round(self.duration, 3) if self.duration is not None else None,
+        }
+
+
+class StartupHealth:
+    """Process readiness (time from import to serving) and the outcome of each startup probe."""
+    def __init__(self):
+        self.created = time.monotonic() # ~ module import
+        self.ready_at: Optional[float] = None
+        self.probes: Dict[str, Probe] = {}
+
+    @property
+    def ready(self) -> bool:
+        return self.ready_at is not None
+
+    def mark_ready(self):
+        if self.ready_at is None:
+            self.ready_at = time.monotonic()
+            print(f"[HEALTH] Ready in {self.ready_at - self.created:.3f}s")
+
+    def skip(self, name: str, reason: str):
+        probe = self.probes[name] = Probe(name)
+        probe.state, probe.detail = "skipped", reason
+
+    def probe(self, name: str, check: Callable[[], Awaitable[Any]], timeout: float = 30.0) -> Probe:
+        """Run `check` in the background. A falsy result or an exception marks the probe failed."""
+        probe = self.probes[name] = Probe(name)
+        probe.task = asyncio.create_task(self._run(probe, check, timeout))
+        return probe
+
+    async def _run(self, probe: Probe, check: Callable[[], Awaitable[Any]], timeout: float):
+        probe.state = "running"
+        probe.started_at = time.monotonic()
+        try:
+            result = await asyncio.wait_for(check(), timeout)
+            probe.state = "ok" if result else "failed"
+            probe.detail = result
+        except asyncio.TimeoutError:
+            probe.state, probe.detail = "failed", f"timed out after {timeout:g}s"
+        except Exception as e:
+            probe.state, probe.detail = "failed", str(e)
+        probe.duration = time.monotonic() - probe.started_at
+        print(f"[HEALTH] Probe {probe.name}: {probe.state} ({probe.duration:.2f}s)")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "ready_after_s": round(self.ready_at - self.created, 3) if self.ready_at is not None else None,
+            "uptime_s": round(time.monotonic() - self.created, 1),
+            "probes": {name: probe.stats() for name, probe in self.probes.items()},
+        }
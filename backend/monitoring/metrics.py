@@ -0,0 +1,178 @@
+"""
+Lightweight in-process instrumentation with Prometheus text exposition.
+
+Hot paths only ever call Histogram.observe / Counter.inc (a bisect and two adds);
+everything else is a gauge callback evaluated at scrape time, so the cost of
+instrumentation stays in the microseconds per tick.
+
+Every metric has a scope. VEHICLE metrics describe the shared vehicle, fleet and
+mission, which only the state owner runs; PROCESS metrics (sockets, caches, the
+event loop) belong to whichever worker renders them and carry its role as a label.
+"""
+import asyncio
+import bisect
+import math
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+Labels = Dict[str, str]
+Sample = Tuple[Labels, float]
+GaugeValue = Union[float, Iterable[Sample]]
+
+VEHICLE = "vehicle"
+PROCESS = "process"
+
+# Seconds; spans sub-millisecond encode/send work up to multi-second AI calls
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _fmt_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in sorted(labels.items())) + "}"
+
+
+def _fmt_value(value: float) -> str:
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, buckets: Sequence[float] = LATENCY_BUCKETS, scope: str = PROCESS):
+        self.name = name
+        self.help = help_text
+        self.scope = scope
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def render(self, labels: Optional[Labels] = None) -> List[str]:
+        labels = labels or {}
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        cumulative = 0
+        for bound, n in zip(self.buckets, self.counts):
+            cumulative += n
+            lines.append(f"{self.name}_bucket{_fmt_labels({**labels, 'le': str(bound)})} {cumulative}")
+        lines.append(f"{self.name}_bucket{_fmt_labels({**labels, 'le': '+Inf'})} {self.count}")
+        lines.append(f"{self.name}_sum{_fmt_labels(labels)} {self.sum!r}")
+        lines.append(f"{self.name}_count{_fmt_labels(labels)} {self.count}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, scope: str = PROCESS):
+        self.name = name
+        self.help = help_text
+        self.scope = scope
+        self.value = 0
+
+    def inc(self, amount: float = 1):
+        self.value += amount
+
+    def render(self, labels: Optional[Labels] = None) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter",
+                f"{self.name}{_fmt_labels(labels or {})} {_fmt_value(self.value)}"]
+
+
+class CallbackMetric:
+    """Gauge (or externally maintained counter) read from a callback at scrape time."""
+    def __init__(self, name: str, help_text: str, fn: Callable[[], GaugeValue], kind: str = "gauge", scope: str = PROCESS):
+        self.name = name
+        self.help = help_text
+        self.fn = fn
+        self.kind = kind
+        self.scope = scope
+
+    def render(self, labels: Optional[Labels] = None) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        try:
+            value = self.fn()
+        except Exception as e:
+            return lines + [f"# error: {e}"]
+        if value is None:
+            return lines
+        samples = [({}, value)] if isinstance(value, (int, float)) else value
+        for sample_labels, v in samples:
+            if v is not None:
+                lines.append(f"{self.name}{_fmt_labels({**(labels or {}), **sample_labels})} {_fmt_value(v)}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics: Dict[str, Union[Histogram, Counter, CallbackMetric]] = {}
+
+    def histogram(self, name: str, help_text: str, buckets: Sequence[float] = LATENCY_BUCKETS,
+                  scope: str = PROCESS) -> Histogram:
+        return self._register(Histogram(name, help_text, buckets, scope))
+
+    def counter(self, name: str, help_text: str, scope: str = PROCESS) -> Counter:
+        return self._register(Counter(name, help_text, scope))
+
+    def gauge(self, name: str, help_text: str, fn: Callable[[], GaugeValue], scope: str = PROCESS) -> CallbackMetric:
+        return self._register(CallbackMetric(name, help_text, fn, "gauge", scope))
+
+    def counter_fn(self, name: str, help_text: str, fn: Callable[[], GaugeValue], scope: str = PROCESS) -> CallbackMetric:
+        return self._register(CallbackMetric(name, help_text, fn, "counter", scope))
+
+    def _register(self, metric):
+        self.metrics[metric.name] = metric # Re-registration replaces (module reloads, tests)
+        return metric
+
+    def render(self, scope: Optional[str] = None, labels: Optional[Labels] = None) -> str:
+        """Exposition text for the metrics in `scope` (all if None), each sample extended with `labels`."""
+        lines: List[str] = []
+        for metric in self.metrics.values():
+            if scope is None or metric.scope == scope:
+                lines.extend(metric.render(labels))
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+# Hot-path instruments
+PHYSICS_TICK = REGISTRY.histogram("aigis_physics_tick_seconds", "Work time of one physics tick", scope=VEHICLE)
+BROADCAST_TICK = REGISTRY.histogram("aigis_broadcast_tick_seconds", "Work time of one telemetry broadcast tick", scope=VEHICLE)
+TELEMETRY_BUILD = REGISTRY.histogram("aigis_telemetry_build_seconds", "Time to build the get_telemetry() dict", scope=VEHICLE)
+WS_SEND = REGISTRY.histogram("aigis_ws_send_seconds", "Per-client WebSocket frame send time")
+AI_CALL = REGISTRY.histogram("aigis_ai_call_seconds", "Latency of tactical AI model calls", scope=VEHICLE)
+WS_DROPPED = REGISTRY.counter("aigis_ws_frames_dropped_total", "Frames dropped or flushed for slow clients")
+JOYSTICK_LATENCY = REGISTRY.histogram("aigis_joystick_apply_seconds", "Joystick sample receipt to applied by physics/RC override",
+                                      scope=VEHICLE)
+LOOP_LAG = REGISTRY.histogram("aigis_event_loop_lag_seconds", "Event loop scheduling lag (sleep overshoot)")
+
+
+class LoopLagMonitor:
+    """Sleeps `interval` repeatedly and records how late the loop wakes it up."""
+    def __init__(self, interval: float = 0.25):
+        self.interval = interval
+        self.last_lag = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.last_lag = max(0.0, loop.time() - expected)
+            LOOP_LAG.observe(self.last_lag)
+
+
+LOOP_MONITOR = LoopLagMonitor()
+REGISTRY.gauge("aigis_event_loop_lag_last_seconds", "Most recent event loop lag sample", lambda: LOOP_MONITOR.last_lag)
@@ -0,0 +1,225 @@
+import asyncio
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import WebSocket
+
+from backend.monitoring.metrics import WS_DROPPED, WS_SEND
+from backend.net.telemetry_codec import PROTOCOLS, FrameSet, TelemetryCodec, encode_frame
+from backend.net.topics import TOPICS, Pinned, Subscription, TopicFrames, encode_ack, encode_event
+
+
+class ClientChannel:
+    """
+    Outbound lane for a single operator console.
+    Holds a small bounded queue of pre-encoded frames drained by a dedicated writer task.
+    When the console falls behind, the oldest frame is dropped (latest-frame-wins).
+    Delta clients cannot skip frames, so they are resynced with a keyframe instead.
+    Clients in topic mode (see topics.py) carry a Subscription and skip the broadcast.
+    """
+    def __init__(self, websocket: WebSocket, protocol: str = "json", max_queue: int = 2):
+        self.websocket = websocket
+        self.protocol = protocol
+        self.needs_keyframe = protocol != "json"
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self.writer_task: Optional[asyncio.Task] = None
+        self.connected_at = time.time()
+        self.frames_sent = 0
+        self.frames_dropped = 0
+        self.last_send_duration = 0.0
+        self.subscription: Optional[Subscription] = None
+
+    def _drain(self) -> List[Tuple[Any, ...]]:
+        items = []
+        while not self.queue.empty():
+            items.append(self.queue.get_nowait())
+        return items
+
+    def enqueue(self, item: Tuple[Any, ...]):
+        if self.queue.full():
+            queued = self._drain()
+            droppable = next((i for i, q in enumerate(queued) if not isinstance(q, Pinned)), None)
+            if droppable is not None:
+                del queued[droppable] # Latest wins: the oldest telemetry frame goes
+                self.frames_dropped += 1
+                WS_DROPPED.inc()
+            else:
+                # Only acks/events queued: never dropped, folded into one group (in order) to make room
+                queued = [Pinned(sum(queued, ()))]
+            for q in queued:
+                self.queue.put_nowait(q)
+        self.queue.put_nowait(item)
+
+    def push_frames(self, frames: FrameSet):
+        if self.protocol == "json":
+            self.enqueue(frames.full())
+            return
+        if self.queue.full():
+            # Dropping a delta would break the chain; flush the frames (not acks/events) and resync instead
+            for queued in self._drain():
+                if isinstance(queued, Pinned):
+                    self.queue.put_nowait(queued)
+                else:
+                    self.frames_dropped += 1
+                    WS_DROPPED.inc()
+            self.needs_keyframe = True
+        if self.needs_keyframe:
+            self.needs_keyframe = False
+            self.enqueue(frames.keyframe(self.protocol))
+        else:
+            self.enqueue(frames.delta_frame(self.protocol))
+
+    @property
+    def queue_depth(self) -> int:
+        return self.queue.qsize()
+
+
+class ConnectionManager:
+    """
+    Telemetry fan-out engine.
+    Each frame is encoded once per broadcast and handed to every client's own queue,
+    so broadcast cost stays flat and a slow console only ever delays itself.
+    Sockets that stall past `send_timeout` or raise on send are evicted.
+    """
+    def __init__(self, max_queue: int = 2, send_timeout: float = 2.0):
+        self.active_connections: Dict[WebSocket, ClientChannel] = {}
+        self.max_queue = max_queue
+        self.send_timeout = send_timeout
+        self.evicted_total = 0
+        self.codec = TelemetryCodec()
+        self.topic_seq = 0
+        self.topic_max_rate = 20.0 # Topic delivery runs on the physics clock; set from its rate
+
+    async def connect(self, websocket: WebSocket, protocol: str = "json") -> ClientChannel:
+        await websocket.accept()
+        if protocol not in PROTOCOLS:
+            protocol = "json"
+        channel = ClientChannel(websocket, protocol=protocol, max_queue=self.max_queue)
+        channel.writer_task = asyncio.create_task(self._writer(channel))
+        self.active_connections[websocket] = channel
+        return channel
+
+    def disconnect(self, websocket: WebSocket):
+        channel = self.active_connections.pop(websocket, None)
+        if channel and channel.writer_task and channel.writer_task is not asyncio.current_task():
+            channel.writer_task.cancel()
+
+    def request_keyframe(self, websocket: WebSocket):
+        channel = self.active_connections.get(websocket)
+        if channel:
+            channel.needs_keyframe = channel.protocol != "json"
+
+    def subscribe(self, websocket: WebSocket, topics: Dict[str, Optional[float]]):
+        channel = self.active_connections.get(websocket)
+        if channel is None or not isinstance(topics, dict):
+            return
+        if channel.subscription is None:
+            channel.subscription = Subscription()
+        _, rejected = channel.subscription.update(topics, self.topic_max_rate)
+        channel.enqueue(Pinned((encode_ack(channel.subscription, rejected),)))
+
+    def unsubscribe(self, websocket: WebSocket, topics: List[str]):
+        channel = self.active_connections.get(websocket)
+        if channel is None or channel.subscription is None:
+            return
+        channel.subscription.remove(topics or list(channel.subscription.rates))
+        channel.enqueue(Pinned((encode_ack(channel.subscription, []),)))
+        if not channel.subscription.rates:
+            # Back to the regular downlink; delta chains restart from a keyframe
+            channel.subscription = None
+            channel.needs_keyframe = channel.protocol != "json"
+
+    def topic_channels(self) -> List[ClientChannel]:
+        return [c for c in self.active_connections.values() if c.subscription is not None]
+
+    def publish_topics(self, telemetry: Dict[str, Any], coverage=None):
+        """Topic-mode delivery; called every physics tick, sends only what is due per client."""
+        channels = self.topic_channels()
+        if not channels:
+            return
+        self.topic_seq += 1
+        frames = TopicFrames(self.topic_seq, telemetry, coverage)
+        now = time.monotonic()
+        for channel in channels:
+            subscription = channel.subscription
+            due = subscription.due(now)
+            if not due:
+                continue
+            subscription.observe_queue(channel.queue_depth)
+            payloads = tuple(frames.frame(topic) for topic in due if topic in TOPICS)
+            if "coverage" in due and coverage is not None:
+                payload, version, more = frames.coverage_frame(subscription.coverage_version)
+                subscription.coverage_version = version
+                if more:
+                    subscription.next_due["coverage"] = now # Keep syncing the backlog every tick
+                if payload is not None:
+                    if payloads:
+                        channel.enqueue(payloads)
+                    channel.enqueue(Pinned((payload,))) # Incremental: must not be dropped
+                    continue
+            if payloads:
+                channel.enqueue(payloads)
+
+    def publish_event(self, event: str, data: Dict[str, Any]):
+        """Push an event to topic-mode clients now, ahead of any rate schedule."""
+        channels = self.topic_channels()
+        if not channels:
+            return
+        payload = Pinned((encode_event(event, data),))
+        for channel in channels:
+            channel.enqueue(payload)
+
+    async def _evict(self, channel: ClientChannel, reason: str):
+        if channel.websocket not in self.active_connections:
+            return
+        self.evicted_total += 1
+        print(f"[WS] Evicting client ({reason})")
+        self.disconnect(channel.websocket)
+        try:
+            await asyncio.wait_for(channel.websocket.close(code=1011), timeout=self.send_timeout)
+        except Exception:
+            pass # Socket already gone
+
+    async def _writer(self, channel: ClientChannel):
+        """Drains one client's queue; never touches any other client."""
+        ws = channel.websocket
+        try:
+            while True:
+                item = await channel.queue.get()
+                started = time.perf_counter()
+                try:
+                    for payload in item:
+                        if isinstance(payload, bytes):
+                            send = ws.send_bytes(payload)
+                        else:
+                            send = ws.send_text(payload)
+                        await asyncio.wait_for(send, timeout=self.send_timeout)
+                except asyncio.TimeoutError:
+                    await self._evict(channel, "stalled")
+                    return
+                except Exception:
+                    await self._evict(channel, "send failed")
+                    return
+                channel.last_send_duration = time.perf_counter() - started
+                WS_SEND.observe(channel.last_send_duration)
+                channel.frames_sent += 1
+        except asyncio.CancelledError:
+            pass
+
+    def broadcast_encoded(self, payload: str):
+        for channel in list(self.active_connections.values()):
+            if channel.subscription is None:
+                channel.enqueue((payload,))
+
+    async def broadcast(self, message: dict, log_total: Optional[int] = None, encoded: Optional[str] = None):
+        # Serialize once per protocol, fan out to per-client queues without awaiting any socket
+        # (`encoded`: the message already serialized with encode_frame, e.g. a status snapshot)
+        channels = [ch for ch in self.active_connections.values() if ch.subscription is None]
+        if not channels:
+            return
+        if all(ch.protocol == "json" for ch in channels):
+            self.broadcast_encoded(encoded if encoded is not None else encode_frame(message))
+            return
+        frames = self.codec.advance(message, log_total=log_total, encoded=encoded)
+        for channel in channels:
+            channel.push_frames(frames)
@@ -0,0 +1,112 @@
+"""
+Versioned telemetry snapshots for /api/status.
+
+Each physics tick's telemetry is serialized once into an immutable
+StatusSnapshot (JSON text + bytes + ETag). The version and the (weak) ETag only
+move when the vehicle state changes: the mission clock and the velocity jitter
+(VOLATILE) tick without one, so they refresh the body but leave the ETag alone
+and an idle vehicle keeps answering 304. The ETag is a content hash, hence
+identical on every worker serving the same state; follower workers also adopt
+the owner's version.
+
+  GET /api/status                          -> 200 + ETag
+  GET /api/status  If-None-Match: <etag>   -> 304 while unchanged
+  GET /api/status?since=<version>          -> long-poll: returns once version != since
+                                              (304 after `timeout` seconds)
+"""
+import asyncio
+import hashlib
+import time
+from typing import Any, Dict, NamedTuple, Optional
+
+from backend.net.telemetry_codec import encode_frame
+
+VOLATILE = ("mission_time", "velocity") # status fields that change every tick or second on their own
+
+
+def _state_key(data: Dict[str, Any]) -> bytes:
+    status = data.get("status")
+    if isinstance(status, dict):
+        data = {**data, "status": {k: v for k, v in status.items() if k not in VOLATILE}}
+    return encode_frame(data).encode()
+
+
+class StatusSnapshot(NamedTuple):
+    """One published telemetry state. Never mutated; replaced by reference."""
+    version: int
+    timestamp: float
+    data: Dict[str, Any]
+    text: str
+    body: bytes
+    etag: str
+    log_total: Optional[int] = None # log events counted into data["logs"] (drives delta log streaming)
+
+    def matches(self, if_none_match: Optional[str]) -> bool:
+        """Weak If-None-Match comparison against this snapshot's ETag."""
+        if not if_none_match:
+            return False
+        return if_none_match.strip() == "*" or any(
+            tag.strip().removeprefix("W/") == self.etag.removeprefix("W/") for tag in if_none_match.split(","))
+
+
+class SnapshotFeed:
+    """Latest-wins holder of the current StatusSnapshot, with long-poll waiters."""
+    def __init__(self):
+        self.current: Optional[StatusSnapshot] = None
+        self.waiting = 0 # long-poll requests parked on the next change
+        self.counts = {"full": 0, "not_modified": 0, "long_poll": 0, "long_poll_timeout": 0}
+        self._source: Optional[Dict[str, Any]] = None
+        self._changed = asyncio.Event()
+
+    def update(self, data: Dict[str, Any], version: Optional[int] = None,
+               log_total: Optional[int] = None) -> StatusSnapshot:
+        """Publish `data` (treated as frozen from here on); a no-op if it is the dict already published."""
+        current = self.current
+        if current is not None and data is self._source:
+            return current
+        self._source = data
+        text = encode_frame(data)
+        if current is not None and text == current.text and version in (None, current.version):
+            return current # Same bytes: keep version and ETag
+        body = text.encode()
+        etag = f'W/"{hashlib.blake2b(_state_key(data), digest_size=8).hexdigest()}"'
+        if current is not None and etag == current.etag and version in (None, current.version):
+            # Only VOLATILE fields moved: fresh body, same version and ETag, nobody woken
+            self.current = current._replace(timestamp=time.time(), data=data, text=text, body=body, log_total=log_total)
+            return self.current
+        if version is None:
+            version = current.version + 1 if current is not None else 1
+        self.current = StatusSnapshot(version, time.time(), data, text, body, etag, log_total)
+        # Wake every parked long-poll; later waiters park on a fresh event
+        self._changed.set()
+        self._changed = asyncio.Event()
+        return self.current
+
+    async def wait_changed(self, since: int, timeout: float) -> Optional[StatusSnapshot]:
+        """Current snapshot once its version differs from `since` (also after an owner restart); None on timeout."""
+        deadline = time.monotonic() + timeout
+        while True:
+            current = self.current
+            if current is not None and current.version != since:
+                return current
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            changed = self._changed
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(changed.wait(), remaining)
+            except asyncio.TimeoutError:
+                return None
+            finally:
+                self.waiting -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        current = self.current
+        return {
+            "version": current.version if current is not None else None,
+            "etag": current.etag if current is not None else None,
+            "bytes": len(current.body) if current is not None else 0,
+            "waiting": self.waiting,
+            **self.counts,
+        }
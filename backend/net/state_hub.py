@@ -0,0 +1,384 @@
+"""
+Cross-worker state hub for multi-process deployments (gunicorn -w N).
+
+Exactly one worker owns the vehicle: it runs the physics clock, the hardware
+link and the HAL. It is elected with an exclusive flock on `<socket>.lock`
+and then serves a Unix-socket hub. Every other worker is a follower that never
+simulates anything:
+
+    downlink  owner -> followers   telemetry frames each broadcast tick, topic
+                                   events, per-drone fleet frames a follower
+                                   subscribed to, and the retained mission/fleet
+                                   plan a promoted follower resumes from
+    uplink    followers -> owner   forwarded /api/* requests, joystick input,
+                                   fleet subscriptions
+
+Followers re-broadcast the owner's frames to their own WebSocket clients, so
+fan-out scales across cores while the state stays single-sourced. If the owner
+dies, followers race for the lock and the winner is promoted.
+
+Wire format: one compact JSON object per line, keyed by "op". Request and
+response bodies are base64 so arbitrary payloads survive the JSON envelope.
+"""
+import asyncio
+import base64
+import itertools
+import json
+import os
+import tempfile
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+try:
+    import fcntl
+    SHARED_STATE_AVAILABLE = hasattr(asyncio, "start_unix_server")
+except ImportError: # Windows: single-process only
+    SHARED_STATE_AVAILABLE = False
+
+DEFAULT_SOCKET = os.path.join(tempfile.gettempdir(), "aigis-state.sock")
+STREAM_LIMIT = 1 << 24 # Max line size; telemetry with large target sets is a few MB at most
+MAX_BACKLOG = 1 << 20 # Follower write buffer beyond which downlink frames are skipped
+RETRY_INTERVAL = 0.5 # Follower reconnect / election retry
+FORWARD_TIMEOUT = 30.0 # Covers ?wait=true commands waiting on COMMAND_ACK
+
+Response = Tuple[int, List[Tuple[bytes, bytes]], bytes]
+
+
+def _line(message: Dict[str, Any]) -> bytes:
+    return (json.dumps(message, separators=(",", ":")) + "\n").encode()
+
+
+class _Follower:
+    """Owner-side view of one connected follower worker."""
+    def __init__(self, writer: asyncio.StreamWriter):
+        self.writer = writer
+        self.drones: Set[int] = set()
+        self.skipped = 0
+
+    def send(self, line: bytes, droppable: bool = True) -> bool:
+        if droppable and self.writer.transport.get_write_buffer_size() > MAX_BACKLOG:
+            self.skipped += 1 # Latest-frame-wins, same policy as ClientChannel
+            return False
+        self.writer.write(line)
+        return True
+
+
+class StateHub:
+    """
+    Role election plus the owner/follower transport.
+    Roles: "standalone" (shared state disabled; behaves exactly like one process),
+    "owner" or "follower". Uplink handlers and downlink callbacks are plain
+    dispatch tables so backend.main keeps all vehicle logic.
+    """
+    def __init__(self, app, path: str = DEFAULT_SOCKET, enabled: bool = False):
+        self.app = app
+        self.path = path
+        self.enabled = enabled and SHARED_STATE_AVAILABLE
+        self.role = "standalone"
+        # Owner side
+        self.handlers: Dict[str, Callable[..., Any]] = {} # uplink op -> handler(**args)
+        self.followers: Set[_Follower] = set()
+        self.published = 0
+        self.forwarded = 0
+        self.retained: Dict[str, bytes] = {} # op -> last retained line, replayed to every follower that connects
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._lock_fd: Optional[int] = None
+        # Follower side
+        self.on_telemetry: Optional[Callable[[Dict[str, Any], int, Optional[int]], Awaitable[None]]] = None
+        self.on_drone: Optional[Callable[[int, Dict[str, Any]], Awaitable[None]]] = None
+        self.on_event: Optional[Callable[[str, Dict[str, Any]], Awaitable[None]]] = None
+        self.downlink: Dict[str, Callable[..., Awaitable[None]]] = {} # any other op -> handler(**payload)
+        self.latest: Optional[Dict[str, Any]] = None # last telemetry frame from the owner
+        self.latest_at = 0.0
+        self.drones: Set[int] = set() # fleet drones this worker has WebSocket clients for
+        self.promotions = 0
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._ids = itertools.count(1)
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def is_follower(self) -> bool:
+        return self.role == "follower"
+
+    @property
+    def connected(self) -> bool:
+        return self._writer is not None
+
+    # --- ELECTION ---
+    async def start(self, on_promote: Callable[[], Awaitable[None]]):
+        """Become owner (running `on_promote`) or follow the current owner."""
+        if not self.enabled:
+            await on_promote()
+            return
+        if await self._try_promote(on_promote):
+            return
+        self.role = "follower"
+        print(f"[HUB] Worker {os.getpid()} following state owner on {self.path}")
+        self._task = asyncio.create_task(self._follow(on_promote))
+
+    def _try_lock(self) -> bool:
+        fd = os.open(self.path + ".lock", os.O_CREAT | os.O_RDWR, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        self._lock_fd = fd
+        return True
+
+    async def _try_promote(self, on_promote: Callable[[], Awaitable[None]]) -> bool:
+        if not self._try_lock():
+            return False
+        if self.role == "follower":
+            self.promotions += 1
+        self.role = "owner"
+        if os.path.exists(self.path):
+            os.unlink(self.path) # Stale socket from a dead owner; we hold the lock
+        self._server = await asyncio.start_unix_server(self._serve_follower, path=self.path, limit=STREAM_LIMIT)
+        print(f"[HUB] Worker {os.getpid()} is the state owner [{self.path}]")
+        await on_promote()
+        return True
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+        if self._server is not None:
+            self._server.close()
+            for follower in list(self.followers):
+                follower.writer.close()
+        if self._writer is not None:
+            self._writer.close()
+        if self._lock_fd is not None:
+            os.close(self._lock_fd) # Releases the flock; a follower takes over
+            self._lock_fd = None
+
+    # --- OWNER ---
+    async def _serve_follower(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        follower = _Follower(writer)
+        self.followers.add(follower)
+        for line in self.retained.values():
+            follower.send(line, droppable=False)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                message = json.loads(line)
+                op = message.get("op")
+                if op == "req":
+                    asyncio.create_task(self._serve_request(follower, message))
+                elif op == "sub":
+                    follower.drones = set(message.get("drones", []))
+                else:
+                    self._dispatch(op, message.get("args", {}))
+        except (ConnectionError, ValueError, asyncio.IncompleteReadError):
+            pass # Follower died or sent garbage; it reconnects on its own
+        finally:
+            self.followers.discard(follower)
+            writer.close()
+
+    def _dispatch(self, op: str, args: Dict[str, Any]):
+        handler = self.handlers.get(op)
+        if handler is None:
+            return
+        try:
+            handler(**args)
+        except Exception as e:
+            print(f"[HUB] Uplink {op} failed: {e}")
+
+    async def _serve_request(self, follower: _Follower, message: Dict[str, Any]):
+        """Run a forwarded HTTP request through this worker's own ASGI app."""
+        self.forwarded += 1
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "scheme": "http",
+            "method": message["method"], "path": message["path"], "raw_path": message["path"].encode(),
+            "root_path": "", "query_string": message["query"].encode("latin-1"),
+            "headers": [(k.encode("latin-1"), v.encode("latin-1")) for k, v in message["headers"]],
+            "client": None, "server": None, "state": {},
+        }
+        body = base64.b64decode(message["body"])
+        done = asyncio.Event()
+        delivered = False
+
+        async def receive():
+            nonlocal delivered
+            if not delivered:
+                delivered = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            await done.wait()
+            return {"type": "http.disconnect"}
+
+        status, headers, chunks = 500, [], []
+
+        async def send(event):
+            nonlocal status, headers
+            if event["type"] == "http.response.start":
+                status = event["status"]
+                headers = [(k.decode("latin-1"), v.decode("latin-1")) for k, v in event.get("headers", [])]
+            elif event["type"] == "http.response.body":
+                chunks.append(event.get("body", b""))
+
+        try:
+            await self.app(scope, receive, send)
+        except Exception as e:
+            print(f"[HUB] Forwarded {message['method']} {message['path']} failed: {e}")
+            status, headers, chunks = 500, [("content-type", "text/plain")], [b"Internal Server Error"]
+        finally:
+            done.set()
+        follower.send(_line({
+            "op": "res", "id": message["id"], "status": status, "headers": headers,
+            "body": base64.b64encode(b"".join(chunks)).decode(),
+        }), droppable=False)
+
+    def publish(self, op: str, **payload):
+        """Fan a downlink frame out to every follower; encoded once."""
+        if not self.followers:
+            return
+        line = _line({"op": op, **payload})
+        self.published += 1
+        for follower in list(self.followers):
+            follower.send(line)
+
+    def retain(self, op: str, **payload):
+        """publish(), and also replay the frame to followers that connect later (state they must not miss)."""
+        line = _line({"op": op, **payload})
+        self.retained[op] = line
+        self.published += 1
+        for follower in list(self.followers):
+            follower.send(line, droppable=False)
+
+    def drone_subscriptions(self) -> Set[int]:
+        subscribed: Set[int] = set()
+        for follower in self.followers:
+            subscribed |= follower.drones
+        return subscribed
+
+    # --- FOLLOWER ---
+    async def _follow(self, on_promote: Callable[[], Awaitable[None]]):
+        while True:
+            try:
+                reader, writer = await asyncio.open_unix_connection(self.path, limit=STREAM_LIMIT)
+            except OSError:
+                if await self._try_promote(on_promote):
+                    return
+                await asyncio.sleep(RETRY_INTERVAL)
+                continue
+            self._writer = writer
+            if self.drones:
+                writer.write(_line({"op": "sub", "drones": sorted(self.drones)}))
+            try:
+                await self._read_downlink(reader)
+            except (ConnectionError, ValueError, asyncio.IncompleteReadError):
+                pass
+            finally:
+                self._writer = None
+                writer.close()
+                for future in self._pending.values():
+                    if not future.done():
+                        future.set_exception(ConnectionError("state owner connection lost"))
+                self._pending.clear()
+            print("[HUB] Lost state owner; re-electing")
+
+    async def _read_downlink(self, reader: asyncio.StreamReader):
+        while True:
+            line = await reader.readline()
+            if not line:
+                return
+            message = json.loads(line)
+            op = message.get("op")
+            if op == "telemetry":
+                self.latest = message["data"]
+                self.latest_at = time.time()
+                if self.on_telemetry is not None:
+                    await self.on_telemetry(message["data"], message.get("log_total"), message.get("version"))
+            elif op == "drone":
+                if self.on_drone is not None:
+                    await self.on_drone(message["id"], message["data"])
+            elif op == "event":
+                if self.on_event is not None:
+                    await self.on_event(message["event"], message["data"])
+            elif op == "res":
+                future = self._pending.pop(message["id"], None)
+                if future is not None and not future.done():
+                    future.set_result(message)
+            elif op in self.downlink:
+                message.pop("op")
+                await self.downlink[op](**message)
+
+    def _send(self, message: Dict[str, Any]):
+        if self._writer is None:
+            raise ConnectionError("state owner not connected")
+        self._writer.write(_line(message))
+
+    def uplink(self, op: str, **args):
+        """Apply an uplink on the owner: locally if this worker owns the vehicle, else forwarded."""
+        if not self.is_follower:
+            self._dispatch(op, args)
+            return
+        try:
+            self._send({"op": op, "args": args})
+        except ConnectionError:
+            pass # Control input is perishable; the next packet goes to the new owner
+
+    def set_drone_interest(self, drone_id: int, interested: bool):
+        (self.drones.add if interested else self.drones.discard)(drone_id)
+        if self.is_follower and self._writer is not None:
+            self._send({"op": "sub", "drones": sorted(self.drones)})
+
+    async def forward(self, method: str, path: str, query: str, headers: List[Tuple[str, str]], body: bytes) -> Response:
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        try:
+            self._send({
+                "op": "req", "id": request_id, "method": method, "path": path, "query": query,
+                "headers": headers, "body": base64.b64encode(body).decode(),
+            })
+            reply = await asyncio.wait_for(future, timeout=FORWARD_TIMEOUT)
+        finally:
+            self._pending.pop(request_id, None)
+        response_headers = [(k.encode("latin-1"), v.encode("latin-1")) for k, v in reply["headers"]]
+        return reply["status"], response_headers, base64.b64decode(reply["body"])
+
+    def stats(self) -> Dict[str, Any]:
+        stats: Dict[str, Any] = {"role": self.role, "pid": os.getpid(), "socket": self.path if self.enabled else None}
+        if self.role == "owner":
+            stats.update(followers=len(self.followers), published=self.published, forwarded=self.forwarded,
+                         skipped=sum(f.skipped for f in self.followers), promotions=self.promotions)
+        elif self.role == "follower":
+            age = time.time() - self.latest_at if self.latest_at else None
+            stats.update(connected=self.connected, pending=len(self._pending),
+                         telemetry_age_s=round(age, 3) if age is not None else None)
+        return stats
+
+
+class ForwardToOwner:
+    """
+    ASGI middleware: on follower workers, /api/* requests execute on the owner.
+    `local_paths` are answered by this worker (cached telemetry, its own metrics).
+    """
+    def __init__(self, app, hub: StateHub, local_paths=()):
+        self.app = app
+        self.hub = hub
+        self.local_paths = frozenset(local_paths)
+
+    async def __call__(self, scope, receive, send):
+        if (scope["type"] != "http" or not self.hub.is_follower
+                or not scope["path"].startswith("/api/") or scope["path"] in self.local_paths):
+            await self.app(scope, receive, send)
+            return
+        body, more = b"", True
+        while more:
+            message = await receive()
+            body += message.get("body", b"")
+            more = message.get("more_body", False)
+        headers = [(k.decode("latin-1"), v.decode("latin-1")) for k, v in scope["headers"]]
+        try:
+            status, response_headers, payload = await self.hub.forward(
+                scope["method"], scope["path"], scope["query_string"].decode("latin-1"), headers, body)
+        except (ConnectionError, asyncio.TimeoutError):
+            status, response_headers = 503, [(b"content-type", b"application/json")]
+            payload = b'{"detail":"State owner unavailable"}'
+        await send({"type": "http.response.start", "status": status, "headers": response_headers})
+        await send({"type": "http.response.body", "body": payload})
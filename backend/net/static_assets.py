@@ -0,0 +1,317 @@
+"""
+Precompressed, in-memory static assets for the dashboards.
+
+Hot files (the HTML entry points and the Vite bundle) are read once and held in
+memory together with gzip and brotli variants; each request picks the
+representation its Accept-Encoding allows and If-None-Match is answered with 304.
+
+  /assets/*       content-hashed Vite output  -> Cache-Control: immutable, 1 year
+  HTML and rest   stable names                -> Cache-Control: no-cache (revalidated by ETag)
+
+Variants are taken from `<file>.br` / `<file>.gz` beside the source when those are
+at least as new (build time), otherwise compressed once when the file is loaded:
+at startup by warm(), or in the background after the first request for it. A file
+is reloaded when its size or mtime changes, so a rebuilt dist needs no restart.
+Brotli is optional (`pip install brotli`); without it only gzip is offered.
+
+  python -m backend.net.static_assets aigis-uav-system/dist   # write .gz/.br at build time
+"""
+import argparse
+import asyncio
+import gzip
+import hashlib
+import mimetypes
+import os
+import stat
+import threading
+from collections import OrderedDict
+from email.utils import formatdate
+from typing import Any, Dict, Iterable, NamedTuple, Optional
+
+from starlette.datastructures import Headers
+from starlette.requests import Request
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import StaticFiles
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+COMPRESSIBLE = ("text/", "application/javascript", "application/json", "application/xml", "image/svg+xml")
+MIN_COMPRESS = 512 # bytes; below this a variant is not worth the extra header
+MAX_FILE = 8 * 1024 * 1024 # larger files stream from disk via FileResponse
+CACHE_BUDGET = 64 * 1024 * 1024 # all variants of all cached files
+ENCODINGS = ("br", "gzip") # server preference when the client accepts several equally
+SUFFIXES = {"br": ".br", "gzip": ".gz"}
+BROTLI_QUALITY = 9 # at runtime: ~0.15s for the 1 MB bundle; quality 11 is 9% smaller but 20x slower, so build time only
+
+
+class StaticAsset(NamedTuple):
+    """One file as served: every representation's bytes and ETag. Replaced, never mutated."""
+    path: str
+    mtime_ns: int
+    size: int
+    media_type: str
+    last_modified: str
+    variants: Dict[str, bytes] # encoding ("identity", "gzip", "br") -> body
+    etags: Dict[str, str]
+
+    @property
+    def nbytes(self) -> int:
+        return sum(len(body) for body in self.variants.values())
+
+
+def _compress(encoding: str, body: bytes, quality: int = BROTLI_QUALITY) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=quality)
+    return gzip.compress(body, compresslevel=9, mtime=0) # mtime=0: same bytes on every worker
+
+
+def _encodings():
+    return [e for e in ENCODINGS if e != "br" or brotli is not None]
+
+
+def _variant(path: str, source: os.stat_result, encoding: str, body: bytes) -> Optional[bytes]:
+    prebuilt = path + SUFFIXES[encoding]
+    try:
+        if os.stat(prebuilt).st_mtime_ns >= source.st_mtime_ns:
+            with open(prebuilt, "rb") as fh:
+                return fh.read()
+    except OSError:
+        pass
+    if encoding == "br" and brotli is None:
+        return None
+    return _compress(encoding, body)
+
+
+def load_asset(path: str) -> Optional[StaticAsset]:
+    """Read `path` and build its representations (blocking: run off the event loop)."""
+    try:
+        with open(path, "rb") as fh:
+            st = os.fstat(fh.fileno())
+            body = fh.read()
+    except OSError:
+        return None
+    media_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+    digest = hashlib.blake2b(body, digest_size=8).hexdigest()
+    variants = {"identity": body}
+    etags = {"identity": f'"{digest}"'}
+    if len(body) >= MIN_COMPRESS and media_type.startswith(COMPRESSIBLE):
+        for encoding in ENCODINGS: # a prebuilt .br is served even without the brotli module
+            encoded = _variant(path, st, encoding, body)
+            if encoded is not None and len(encoded) < len(body):
+                variants[encoding] = encoded
+                etags[encoding] = f'"{digest}-{SUFFIXES[encoding][1:]}"' # one ETag per representation
+    return StaticAsset(path, st.st_mtime_ns, st.st_size, media_type,
+                       formatdate(st.st_mtime, usegmt=True), variants, etags)
+
+
+def _accepted(header: str) -> Dict[str, float]:
+    weights: Dict[str, float] = {}
+    for part in header.split(","):
+        coding, _, params = part.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        weight = 1.0
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[coding] = weight
+    return weights
+
+
+def negotiate(accept_encoding: Optional[str], available: Iterable[str]) -> str:
+    """Best encoding in `available` for an Accept-Encoding header; "identity" if none is acceptable."""
+    if not accept_encoding:
+        return "identity"
+    weights = _accepted(accept_encoding)
+    best, best_q = "identity", 0.0
+    for encoding in ENCODINGS:
+        if encoding in available:
+            q = weights.get(encoding, weights.get("*", 0.0))
+            if q > best_q:
+                best, best_q = encoding, q
+    return best
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+class AssetCache:
+    """Byte-budgeted LRU of StaticAssets keyed by absolute path."""
+    def __init__(self, budget: int = CACHE_BUDGET, max_file: int = MAX_FILE):
+        self.budget = budget
+        self.max_file = max_file
+        self.bytes = 0
+        self.loads = 0
+        self.counts = {"identity": 0, "gzip": 0, "br": 0, "not_modified": 0, "disk": 0}
+        self._assets: "OrderedDict[str, StaticAsset]" = OrderedDict()
+        self._loading: set = set()
+        self._lock = threading.Lock() # warm() and background loads run in worker threads
+
+    def peek(self, path: str, st: os.stat_result) -> Optional[StaticAsset]:
+        """The cached asset if it is still current for `st` (no I/O)."""
+        asset = self._assets.get(path)
+        if asset is None or (asset.mtime_ns, asset.size) != (st.st_mtime_ns, st.st_size):
+            return None
+        with self._lock:
+            if path in self._assets:
+                self._assets.move_to_end(path)
+        return asset
+
+    def load(self, path: str) -> Optional[StaticAsset]:
+        """(Re)load `path` into the cache (blocking). None if missing or larger than `max_file`."""
+        try:
+            if os.stat(path).st_size > self.max_file:
+                return None
+        except OSError:
+            return None
+        asset = load_asset(path)
+        if asset is None:
+            return None
+        with self._lock:
+            old = self._assets.pop(path, None)
+            if old is not None:
+                self.bytes -= old.nbytes
+            self._assets[path] = asset
+            self.bytes += asset.nbytes
+            self.loads += 1
+            while self.bytes > self.budget and len(self._assets) > 1:
+                _, evicted = self._assets.popitem(last=False)
+                self.bytes -= evicted.nbytes
+        return asset
+
+    def load_soon(self, path: str):
+        """Load `path` on a worker thread; requests keep streaming from disk meanwhile."""
+        if path in self._loading:
+            return
+        self._loading.add(path)
+        future = asyncio.get_running_loop().run_in_executor(None, self.load, path)
+        future.add_done_callback(lambda _: self._loading.discard(path))
+
+    def warm(self, *roots: str) -> Dict[str, Any]:
+        """Load every file under `roots` (files or directories) that fits the budget (blocking)."""
+        for root in roots:
+            if os.path.isdir(root):
+                paths = [os.path.join(d, f) for d, _, files in os.walk(root) for f in files
+                         if not f.endswith(tuple(SUFFIXES.values()))]
+            else:
+                paths = [root]
+            for path in sorted(paths):
+                self.load(os.path.realpath(path))
+        return self.stats()
+
+    def respond(self, asset: StaticAsset, headers: Headers, method: str = "GET", immutable: bool = False) -> Response:
+        encoding = negotiate(headers.get("accept-encoding"), asset.variants)
+        etag = asset.etags[encoding]
+        response_headers = {
+            "etag": etag,
+            "last-modified": asset.last_modified,
+            "cache-control": IMMUTABLE if immutable else REVALIDATE,
+        }
+        if len(asset.variants) > 1:
+            response_headers["vary"] = "Accept-Encoding"
+        if_none_match = headers.get("if-none-match")
+        if if_none_match is not None and _etag_matches(if_none_match, etag):
+            self.counts["not_modified"] += 1
+            return Response(status_code=304, headers=response_headers)
+        self.counts[encoding] += 1
+        body = asset.variants[encoding]
+        if encoding != "identity":
+            response_headers["content-encoding"] = encoding
+        response_headers["content-length"] = str(len(body))
+        return Response(body if method != "HEAD" else b"", media_type=asset.media_type, headers=response_headers)
+
+    async def file(self, request: Request, path: str, immutable: bool = False) -> Response:
+        """Serve one file (e.g. an HTML entry point) from the cache, loading it on a miss."""
+        path = os.path.realpath(path)
+        try:
+            asset = self.peek(path, os.stat(path))
+        except OSError:
+            asset = None
+        if asset is None:
+            asset = await asyncio.to_thread(self.load, path)
+        if asset is None:
+            self.counts["disk"] += 1
+            return FileResponse(path)
+        return self.respond(asset, request.headers, request.method, immutable)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "files": len(self._assets),
+            "bytes": self.bytes,
+            "budget": self.budget,
+            "loads": self.loads,
+            "brotli": brotli is not None,
+            **self.counts,
+        }
+
+
+class CachedStaticFiles(StaticFiles):
+    """
+    StaticFiles that answers regular files from an AssetCache.
+    Path resolution, directories and 404s stay with Starlette; files that are not
+    cached yet go out as a FileResponse while they load in the background.
+    """
+    def __init__(self, *, cache: AssetCache, immutable: bool = False, **kwargs):
+        super().__init__(**kwargs)
+        self.cache = cache
+        self.immutable = immutable
+
+    def file_response(self, full_path, stat_result: os.stat_result, scope, status_code: int = 200) -> Response:
+        path = os.fspath(full_path)
+        if status_code == 200 and stat.S_ISREG(stat_result.st_mode):
+            asset = self.cache.peek(path, stat_result)
+            if asset is not None:
+                return self.cache.respond(asset, Headers(scope=scope), scope["method"], self.immutable)
+            if stat_result.st_size <= self.cache.max_file:
+                self.cache.load_soon(path)
+        self.cache.counts["disk"] += 1
+        response = super().file_response(full_path, stat_result, scope, status_code)
+        if self.immutable:
+            response.headers["cache-control"] = IMMUTABLE
+        return response
+
+
+def build(*roots: str) -> Dict[str, int]:
+    """Write `.gz` (and `.br` when available) beside every compressible file under `roots`."""
+    written = {"gzip": 0, "br": 0}
+    for root in roots:
+        for directory, _, files in os.walk(root):
+            for name in files:
+                if name.endswith(tuple(SUFFIXES.values())):
+                    continue
+                path = os.path.join(directory, name)
+                media_type = mimetypes.guess_type(path)[0] or ""
+                if os.path.getsize(path) < MIN_COMPRESS or not media_type.startswith(COMPRESSIBLE):
+                    continue
+                with open(path, "rb") as fh:
+                    body = fh.read()
+                for encoding in _encodings():
+                    with open(path + SUFFIXES[encoding], "wb") as fh:
+                        fh.write(_compress(encoding, body, quality=11))
+                    written[encoding] += 1
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("roots", nargs="+", help="directories to precompress (e.g. aigis-uav-system/dist)")
+    args = parser.parse_args()
+    written = build(*args.roots)
+    print(f"[ASSETS] wrote {written['gzip']} .gz, {written['br']} .br" + ("" if brotli else " (brotli not installed)"))
+
+
+if __name__ == "__main__":
+    main()
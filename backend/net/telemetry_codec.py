@@ -0,0 +1,187 @@
+"""
+Compact telemetry downlink for /ws/telemetry.
+
+Clients negotiate the protocol with a query parameter on connect:
+  /ws/telemetry                 -> legacy full JSON frame every tick
+  /ws/telemetry?proto=delta     -> JSON keyframe, then field-level deltas
+  /ws/telemetry?proto=binary    -> delta protocol, with position/attitude/battery
+                                   moved into a packed binary frame
+
+Keyframe:  {"t": "K", "seq": n, "ts": <server unix time>, "state": <full telemetry>}
+Delta:     {"t": "D", "seq": n, "base": n-1, "ts": ..., "set": {"status.battery": 97.3, ...},
+            "del": [...], "targets": [<changed targets>], "targets_removed": [ids],
+            "logs": [<entries appended since base, newest first>]}
+Binary:    BINARY_FRAME = magic, state code, seq, x, y, z, pitch, roll, yaw, battery
+
+"del" lists removed leaf paths; a client drops any parent object left empty.
+A client whose last seq differs from a delta's `base` must discard it and
+send {"type": "RESYNC"} uplink; the next frame it receives is a keyframe.
+
+Clients that only need parts of the state can switch to topic subscriptions
+instead (per-topic rates, pushed events); see topics.py.
+"""
+import json
+import struct
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+PROTOCOLS = ("json", "delta", "binary")
+
+STATE_CODES = ["IDLE", "FLYING", "RETURNING", "SEARCHING", "SCANNING", "MANUAL", "EMERGENCY", "LANDED"]
+STATE_UNKNOWN = 255
+
+BINARY_MAGIC = 0xA1
+BINARY_FRAME = struct.Struct("<BBIfffffff")
+BINARY_PATHS = frozenset({
+    "position.x", "position.y", "position.z",
+    "attitude.pitch", "attitude.roll", "attitude.yaw",
+    "status.battery",
+})
+
+# Collections diffed by their own rules instead of field paths
+_SPECIAL_KEYS = ("targets", "logs")
+_MISSING = object()
+
+
+def encode_frame(message: dict) -> str:
+    """Serialize a telemetry frame once, using the same compact form as send_json."""
+    return json.dumps(message, separators=(",", ":"), ensure_ascii=False)
+
+
+def flatten(data: Dict[str, Any], prefix: str = "", out: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Flatten nested dicts into {"a.b": scalar}; lists are kept as values."""
+    if out is None:
+        out = {}
+    for key, value in data.items():
+        if not prefix and key in _SPECIAL_KEYS:
+            continue
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flatten(value, path + ".", out)
+        else:
+            out[path] = value
+    return out
+
+
+def pack_binary(seq: int, telemetry: Dict[str, Any]) -> bytes:
+    pos = telemetry.get("position", {})
+    att = telemetry.get("attitude", {})
+    status = telemetry.get("status", {})
+    state = status.get("state")
+    code = STATE_CODES.index(state) if state in STATE_CODES else STATE_UNKNOWN
+    return BINARY_FRAME.pack(
+        BINARY_MAGIC, code, seq & 0xFFFFFFFF,
+        pos.get("x", 0.0), pos.get("y", 0.0), pos.get("z", 0.0),
+        att.get("pitch", 0.0), att.get("roll", 0.0), att.get("yaw", 0.0),
+        status.get("battery", 0.0),
+    )
+
+
+class FrameSet:
+    """
+    All encodings of one broadcast tick.
+    Each payload is built lazily and at most once, however many clients use it.
+    """
+    def __init__(self, seq: int, base: int, telemetry: Dict[str, Any], delta: Dict[str, Any],
+                 encoded: Optional[str] = None):
+        self.seq = seq
+        self.base = base
+        self.telemetry = telemetry
+        self.delta = delta
+        self.ts = round(time.time(), 4)
+        self._cache: Dict[str, Any] = {}
+        if encoded is not None:
+            self._cache["full"] = (encoded,)
+
+    def _memo(self, key: str, build):
+        if key not in self._cache:
+            self._cache[key] = build()
+        return self._cache[key]
+
+    def full(self) -> Tuple[Any, ...]:
+        return self._memo("full", lambda: (encode_frame(self.telemetry),))
+
+    def keyframe(self, protocol: str) -> Tuple[Any, ...]:
+        def build():
+            frame = encode_frame({"t": "K", "seq": self.seq, "ts": self.ts, "state": self.telemetry})
+            if protocol == "binary":
+                return (frame, self._binary())
+            return (frame,)
+        return self._memo(f"key:{protocol}", build)
+
+    def delta_frame(self, protocol: str) -> Tuple[Any, ...]:
+        def build():
+            if protocol != "binary":
+                return (encode_frame(self._delta_body(self.delta)),)
+            changes = {p: v for p, v in self.delta.get("set", {}).items() if p not in BINARY_PATHS}
+            body = dict(self.delta)
+            if changes:
+                body["set"] = changes
+            else:
+                body.pop("set", None)
+            # Binary frame already carries seq; only ship JSON when something else changed
+            if len(body) == 0:
+                return (self._binary(),)
+            return (self._binary(), encode_frame(self._delta_body(body)))
+        return self._memo(f"delta:{protocol}", build)
+
+    def _delta_body(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        return {"t": "D", "seq": self.seq, "base": self.base, "ts": self.ts, **body}
+
+    def _binary(self) -> bytes:
+        return self._memo("binary", lambda: pack_binary(self.seq, self.telemetry))
+
+
+class TelemetryCodec:
+    """
+    Tracks the last broadcast state and produces a FrameSet per tick.
+    Diffing happens once per tick, independent of how many delta clients exist.
+    """
+    def __init__(self):
+        self.seq = 0
+        self._fields: Dict[str, Any] = {}
+        self._targets: Dict[Any, Dict[str, Any]] = {}
+        self._log_total: Optional[int] = None
+        self._logs: List[str] = []
+
+    def advance(self, telemetry: Dict[str, Any], log_total: Optional[int] = None,
+                encoded: Optional[str] = None) -> FrameSet:
+        base = self.seq
+        self.seq += 1
+
+        fields = flatten(telemetry)
+        delta: Dict[str, Any] = {}
+        changed = {p: v for p, v in fields.items() if self._fields.get(p, _MISSING) != v}
+        if changed:
+            delta["set"] = changed
+        removed = [p for p in self._fields if p not in fields]
+        if removed:
+            delta["del"] = removed
+
+        targets = {t.get("id"): dict(t) for t in telemetry.get("targets", [])}
+        changed_targets = [t for tid, t in targets.items() if self._targets.get(tid) != t]
+        if changed_targets:
+            delta["targets"] = changed_targets
+        removed_targets = [tid for tid in self._targets if tid not in targets]
+        if removed_targets:
+            delta["targets_removed"] = removed_targets
+
+        logs = telemetry.get("logs", [])
+        new_logs = self._new_logs(logs, log_total)
+        if new_logs:
+            delta["logs"] = new_logs
+
+        self._fields = fields
+        self._targets = targets
+        self._log_total = log_total
+        self._logs = list(logs)
+        return FrameSet(self.seq, base, telemetry, delta, encoded)
+
+    def _new_logs(self, logs: List[str], log_total: Optional[int]) -> List[str]:
+        # Logs are newest-first; a running total tells us how many were appended
+        if log_total is not None and self._log_total is not None:
+            count = min(log_total - self._log_total, len(logs))
+            return list(logs[:count]) if count > 0 else []
+        if logs == self._logs:
+            return []
+        return list(logs)
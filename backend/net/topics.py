@@ -0,0 +1,153 @@
+"""
+Topic subscriptions for /ws/telemetry.
+
+Instead of the whole frame at the broadcast rate, a client can ask for slices
+of the telemetry at their own rates over the normal uplink:
+
+  {"type": "SUBSCRIBE", "topics": {"position": 20, "logs": 1, "status": null, "coverage": 1}}
+  {"type": "UNSUBSCRIBE", "topics": ["logs"]}
+
+Rates are in Hz (null = the topic default) and are capped at the physics rate,
+which drives topic delivery. Unsubscribing from every topic returns the client
+to the regular downlink (with a keyframe for delta/binary clients).
+
+Downlink in topic mode:
+  Ack:    {"t": "S", "topics": {"position": 20.0, ...}, "rejected": [...]}
+  Topic:  {"t": "T", "topic": "position", "seq": n, "ts": ..., "data": {...}}
+  Event:  {"t": "E", "event": "target_detected" | "state_changed", "ts": ..., "data": {...}}
+
+"coverage" is incremental: its data is a CoverageGrid.frame() holding only the
+tiles that changed since the client's last coverage frame (everything on the
+first one, flagged "full"), so those frames are never dropped either.
+
+Events are pushed on the physics tick they happen in, regardless of topic
+rates, and are never dropped under backpressure. When a client's send queue
+keeps backing up, all of its topic rates are scaled down (halved per episode,
+multiplicative increase back once it keeps up again).
+"""
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from backend.net.telemetry_codec import encode_frame
+
+TOPICS: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+    "position": lambda t: {"position": t["position"], "attitude": t["attitude"]},
+    "status": lambda t: {k: v for k, v in t["status"].items() if k != "health"},
+    "health": lambda t: t["status"].get("health", {}),
+    "targets": lambda t: t["targets"],
+    "logs": lambda t: t["logs"],
+}
+# Payload depends on what the client already holds, not just on this tick
+INCREMENTAL_TOPICS = ("coverage",)
+DEFAULT_RATES = {"position": 12.5, "status": 2.0, "health": 0.5, "targets": 1.0, "logs": 1.0, "coverage": 1.0}
+MIN_RATE = 0.2 # Hz; floor for requested rates
+
+# Backpressure governor
+MIN_SCALE = 0.1
+CONGESTED_AFTER = 3 # consecutive sends that found the queue non-empty
+RECOVER_AFTER = 20 # consecutive sends that found it empty
+
+
+class Pinned(tuple):
+    """Frame group that must survive backpressure (acks, events); see ClientChannel.enqueue."""
+
+
+class Subscription:
+    """One client's topic rates, their next deadlines and its backpressure scale."""
+    def __init__(self):
+        self.rates: Dict[str, float] = {}
+        self.next_due: Dict[str, float] = {}
+        self.scale = 1.0
+        self.throttle_events = 0
+        self.coverage_version = 0 # last CoverageGrid version delivered
+        self._congested = 0
+        self._clear = 0
+
+    def update(self, topics: Dict[str, Optional[float]], max_rate: float) -> Tuple[Dict[str, float], List[str]]:
+        rejected = []
+        for name, rate in topics.items():
+            if name not in TOPICS and name not in INCREMENTAL_TOPICS:
+                rejected.append(name)
+                continue
+            try:
+                hz = DEFAULT_RATES[name] if rate is None else float(rate)
+            except (TypeError, ValueError):
+                rejected.append(name)
+                continue
+            self.rates[name] = max(MIN_RATE, min(max_rate, hz))
+            self.next_due[name] = 0.0 # First frame goes out on the next tick
+            if name == "coverage":
+                self.coverage_version = 0 # (Re)subscribing starts with a full map
+        return dict(self.rates), rejected
+
+    def remove(self, names: Iterable[str]):
+        for name in names:
+            self.rates.pop(name, None)
+            self.next_due.pop(name, None)
+
+    def due(self, now: float) -> List[str]:
+        topics = []
+        for name, rate in self.rates.items():
+            deadline = self.next_due[name]
+            if now < deadline:
+                continue
+            topics.append(name)
+            period = 1.0 / (rate * self.scale)
+            # Absolute deadlines keep the rate exact; a late tick does not cause a burst
+            self.next_due[name] = deadline + period if deadline + period > now else now + period
+        return topics
+
+    def observe_queue(self, depth: int):
+        """AIMD on the send rate, fed the queue depth found at each enqueue."""
+        if depth > 0:
+            self._clear = 0
+            self._congested += 1
+            if self._congested >= CONGESTED_AFTER and self.scale > MIN_SCALE:
+                self.scale = max(MIN_SCALE, self.scale / 2)
+                self.throttle_events += 1
+                self._congested = 0
+        else:
+            self._congested = 0
+            self._clear += 1
+            if self._clear >= RECOVER_AFTER and self.scale < 1.0:
+                self.scale = min(1.0, self.scale * 1.25)
+                self._clear = 0
+
+    def effective_rates(self) -> Dict[str, float]:
+        return {name: round(rate * self.scale, 3) for name, rate in self.rates.items()}
+
+
+class TopicFrames:
+    """Per-tick topic payloads; each slice is encoded at most once for all clients."""
+    def __init__(self, seq: int, telemetry: Dict[str, Any], coverage=None):
+        self.seq = seq
+        self.telemetry = telemetry
+        self.coverage = coverage
+        self.ts = round(time.time(), 4)
+        self._cache: Dict[str, str] = {}
+        self._coverage: Dict[int, Tuple[Optional[str], int, bool]] = {}
+
+    def frame(self, topic: str) -> str:
+        if topic not in self._cache:
+            self._cache[topic] = encode_frame({
+                "t": "T", "topic": topic, "seq": self.seq, "ts": self.ts, "data": TOPICS[topic](self.telemetry),
+            })
+        return self._cache[topic]
+
+    def coverage_frame(self, since: int) -> Tuple[Optional[str], int, bool]:
+        """(payload or None if nothing changed, version to resume from, more pending); shared per `since`."""
+        if since not in self._coverage:
+            data = self.coverage.frame(since)
+            payload = None
+            if data["tiles"] or data["full"]:
+                payload = encode_frame({"t": "T", "topic": "coverage", "seq": self.seq, "ts": self.ts, "data": data})
+            self._coverage[since] = (payload, data["version"], data["more"])
+        return self._coverage[since]
+
+
+def encode_event(event: str, data: Dict[str, Any]) -> str:
+    return encode_frame({"t": "E", "event": event, "ts": round(time.time(), 4), "data": data})
+
+
+def encode_ack(subscription: Subscription, rejected: List[str]) -> str:
+    return encode_frame({"t": "S", "topics": subscription.effective_rates(), "rejected": rejected})
@@ -0,0 +1,162 @@
+import json
+import math
+import os
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+
+from backend.net.telemetry_codec import STATE_CODES, STATE_UNKNOWN
+
+# Fixed 40-byte record; `t` is unix time, 0.0 marks an unwritten slot
+RECORD_DTYPE = np.dtype([
+    ("t", "<f8"),
+    ("x", "<f4"), ("y", "<f4"), ("z", "<f4"),
+    ("pitch", "<f4"), ("roll", "<f4"), ("yaw", "<f4"),
+    ("battery", "<f4"),
+    ("state", "u1"),
+    ("_pad", "V3"),
+])
+FIELDS = [name for name in RECORD_DTYPE.names if not name.startswith("_")]
+
+CHUNK_RECORDS = 1 << 16 # ~55 min at 20 Hz, 2.5 MB per chunk file
+FLUSH_EVERY = 1000
+
+
+class FlightRecorder:
+    """
+    Append-only Black Box.
+    Fixed-size records go into chunked memory-mapped files; only the chunk being
+    written is kept mapped, so RAM stays flat however long the sortie runs.
+    A per-chunk time index (first/last timestamp) lets range queries touch only
+    the chunks they need, then binary-search inside them.
+    """
+    def __init__(self, root_dir: str, session: Optional[str] = None, chunk_records: int = CHUNK_RECORDS):
+        self.session = session or time.strftime("%Y%m%d-%H%M%S")
+        self.path = os.path.join(root_dir, self.session)
+        self.chunk_records = chunk_records
+        os.makedirs(self.path, exist_ok=True)
+        self.chunks: List[Dict[str, Any]] = [] # [{"file", "t_first", "t_last", "count"}]
+        self._map: Optional[np.memmap] = None
+        self._since_flush = 0
+        self._load_index()
+
+    # --- WRITE PATH ---
+    def _index_path(self) -> str:
+        return os.path.join(self.path, "index.json")
+
+    def _load_index(self):
+        if os.path.exists(self._index_path()):
+            with open(self._index_path()) as fh:
+                self.chunks = json.load(fh)["chunks"]
+        if self.chunks and self.chunks[-1]["count"] < self.chunk_records:
+            self._map = np.memmap(os.path.join(self.path, self.chunks[-1]["file"]), dtype=RECORD_DTYPE, mode="r+")
+
+    def _open_chunk(self):
+        name = f"chunk_{len(self.chunks):05d}.bin"
+        self._map = np.memmap(os.path.join(self.path, name), dtype=RECORD_DTYPE, mode="w+", shape=(self.chunk_records,))
+        self.chunks.append({"file": name, "t_first": 0.0, "t_last": 0.0, "count": 0})
+
+    def append(self, t: float, position: Dict[str, float], attitude: Dict[str, float], battery: float, state: str):
+        """Hot path: one row written straight into the mapped page."""
+        if self._map is None:
+            self._open_chunk()
+        chunk = self.chunks[-1]
+        n = chunk["count"]
+        self._map[n] = (
+            t, position["x"], position["y"], position["z"],
+            attitude.get("pitch", 0.0), attitude.get("roll", 0.0), attitude.get("yaw", 0.0),
+            battery, STATE_CODES.index(state) if state in STATE_CODES else STATE_UNKNOWN, b"\x00\x00\x00",
+        )
+        if n == 0:
+            chunk["t_first"] = t
+        chunk["t_last"] = t
+        chunk["count"] = n + 1
+
+        self._since_flush += 1
+        if chunk["count"] >= self.chunk_records:
+            self.flush()
+            self._map = None # Next append opens a fresh chunk; the full one is unmapped
+        elif self._since_flush >= FLUSH_EVERY:
+            self.flush()
+
+    def flush(self):
+        if self._map is not None:
+            self._map.flush()
+        tmp = self._index_path() + ".tmp"
+        with open(tmp, "w") as fh:
+            json.dump({"session": self.session, "record_size": RECORD_DTYPE.itemsize, "chunks": self.chunks}, fh)
+        os.replace(tmp, self._index_path())
+        self._since_flush = 0
+
+    def close(self):
+        self.flush()
+        self._map = None
+
+    # --- READ PATH ---
+    @property
+    def total_records(self) -> int:
+        return sum(c["count"] for c in self.chunks)
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "session": self.session,
+            "records": self.total_records,
+            "chunks": len(self.chunks),
+            "t_first": self.chunks[0]["t_first"] if self.chunks else None,
+            "t_last": self.chunks[-1]["t_last"] if self.chunks else None,
+            "bytes": self.total_records * RECORD_DTYPE.itemsize,
+        }
+
+    def _chunk_view(self, index: int) -> np.ndarray:
+        chunk = self.chunks[index]
+        if index == len(self.chunks) - 1 and self._map is not None:
+            return self._map[:chunk["count"]]
+        return np.memmap(os.path.join(self.path, chunk["file"]), dtype=RECORD_DTYPE, mode="r")[:chunk["count"]]
+
+    def _slices(self, start: float, end: float) -> Iterator[np.ndarray]:
+        for i, chunk in enumerate(self.chunks):
+            if chunk["count"] == 0 or chunk["t_last"] < start or chunk["t_first"] > end:
+                continue
+            view = self._chunk_view(i)
+            lo = np.searchsorted(view["t"], start, side="left")
+            hi = np.searchsorted(view["t"], end, side="right")
+            if hi > lo:
+                yield view[lo:hi]
+
+    def query(self, start: float, end: float, max_points: Optional[int] = None) -> np.ndarray:
+        """Records with start <= t <= end, stride-downsampled to at most max_points."""
+        slices = list(self._slices(start, end))
+        total = sum(len(s) for s in slices)
+        if total == 0:
+            return np.empty(0, dtype=RECORD_DTYPE)
+        stride = max(1, math.ceil(total / max_points)) if max_points else 1
+        parts, offset = [], 0
+        for s in slices:
+            # Keep the stride phase continuous across chunk boundaries
+            first = (-offset) % stride
+            parts.append(np.array(s[first::stride]))
+            offset += len(s)
+        return np.concatenate(parts)
+
+    @staticmethod
+    def to_columns(records: np.ndarray) -> Dict[str, List[Any]]:
+        out = {name: records[name].tolist() for name in FIELDS if name != "state"}
+        out["state"] = [STATE_CODES[c] if c < len(STATE_CODES) else "UNKNOWN" for c in records["state"].tolist()]
+        return out
+
+    @staticmethod
+    def to_frame(record: np.void) -> Dict[str, Any]:
+        """Shape one record like a live /ws/telemetry frame so dashboards can replay it unchanged."""
+        code = int(record["state"])
+        y = float(record["y"])
+        return {
+            "position": {"x": float(record["x"]), "y": y, "z": float(record["z"])},
+            "attitude": {"pitch": float(record["pitch"]), "roll": float(record["roll"]), "yaw": float(record["yaw"])},
+            "status": {
+                "battery": round(float(record["battery"]), 2),
+                "state": STATE_CODES[code] if code < len(STATE_CODES) else "UNKNOWN",
+                "altitude": round(y, 1),
+            },
+            "replay": {"t": float(record["t"])},
+        }
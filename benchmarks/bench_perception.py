@@ -0,0 +1,69 @@
+"""
+Perception tick cost vs. number of loaded targets.
+
+Compares the grid-hash detection used by AIGISystemHAL._update_sim against the
+previous linear scan over every target, for the single drone and for a fleet.
+
+    python -m benchmarks.bench_perception [--area 5000] [--fleet 1000]
+"""
+import argparse
+import random
+import time
+
+from backend.engine.fleet import DETECTION_RADIUS, FleetSimulator
+from backend.engine.spatial_index import TargetIndex
+from backend.main import AIGISystemHAL
+
+COUNTS = [10, 100, 1_000, 10_000, 100_000]
+
+
+def make_targets(count: int, area: float, rng: random.Random):
+    return [{"id": i, "x": rng.uniform(-area, area), "z": rng.uniform(-area, area)} for i in range(count)]
+
+
+def linear_scan(pos, targets):
+    for target in targets:
+        dist = ((pos["x"] - target["x"])**2 + (pos["z"] - target["z"])**2)**0.5
+        if dist < DETECTION_RADIUS and not target["detected"]:
+            target["detected"] = True
+
+
+def time_per_call(fn, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--area", type=float, default=5000.0, help="half-width of the survey square in metres")
+    parser.add_argument("--fleet", type=int, default=1000, help="fleet size for the swarm column")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    hal = AIGISystemHAL()
+    hal.status = "FLYING"
+
+    print(f"{'targets':>9} | {'tick grid ms':>12} | {'tick linear ms':>14} | {'fleet grid ms':>13}")
+    print("-" * 58)
+    for count in COUNTS:
+        targets = make_targets(count, args.area, rng)
+        hal.load_targets(targets)
+        grid_ms = time_per_call(hal._update_sim, args.repeat)
+
+        baseline = [dict(t, detected=False) for t in targets]
+        linear_ms = time_per_call(lambda: linear_scan(hal.sim_pos, baseline), max(1, args.repeat // 10))
+
+        fleet = FleetSimulator(args.fleet, spread=args.area, seed=1)
+        fleet.command("takeoff")
+        index = TargetIndex(cell_size=DETECTION_RADIUS)
+        index.bulk_load([dict(t, detected=False) for t in targets])
+        fleet_ms = time_per_call(lambda: fleet.step(index), max(1, args.repeat // 10))
+
+        print(f"{count:>9} | {grid_ms:>12.4f} | {linear_ms:>14.4f} | {fleet_ms:>13.4f}")
+
+
+if __name__ == "__main__":
+    main()
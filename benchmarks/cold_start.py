@@ -0,0 +1,137 @@
+"""
+Cold start: import time of backend.main and time-to-ready of a fresh server.
+
+Import: median wall time of `import backend.main` in a fresh interpreter (minus
+the bare interpreter start) and the slowest top-level imports from -X importtime.
+Readiness, per boot: process spawn -> TCP accept -> GET /api/health 200 ->
+first /ws/telemetry frame.
+
+    python -m benchmarks.cold_start --runs 5
+    python -m benchmarks.cold_start --hw-probe   # hardware probe against a silent port must not delay readiness
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from typing import Any, Dict, List, Optional
+
+from websockets.asyncio.client import connect
+
+from benchmarks.common import BASE_DIR, free_port, write_results
+
+
+def _python(code: str, env: Optional[Dict[str, str]] = None) -> float:
+    started = time.perf_counter()
+    subprocess.run([sys.executable, "-c", code], cwd=BASE_DIR, env=env, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - started
+
+
+def slowest_imports(top: int = 10) -> List[Dict[str, Any]]:
+    """Cumulative time of the modules imported directly by backend.main (-X importtime)."""
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", "import backend.main"],
+                         cwd=BASE_DIR, capture_output=True, text=True, check=True).stderr
+    baseline = subprocess.run([sys.executable, "-X", "importtime", "-c", "pass"],
+                              cwd=BASE_DIR, capture_output=True, text=True, check=True).stderr
+    preloaded = {line.split("|")[2].strip() for line in baseline.splitlines() if line.count("|") == 2}
+    rows = []
+    for line in out.splitlines():
+        if line.count("|") != 2 or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        name = name[1:] # Column separator space; then two spaces of indent per nesting level
+        if name.startswith("  ") and not name.startswith("   ") and name.strip() not in preloaded:
+            rows.append({"module": name.strip(), "ms": round(int(cumulative) / 1000, 1)})
+    return sorted(rows, key=lambda r: r["ms"], reverse=True)[:top]
+
+
+def measure_import(runs: int) -> Dict[str, Any]:
+    bare = [_python("pass") for _ in range(runs)]
+    full = [_python("import backend.main") for _ in range(runs)]
+    return {
+        "interpreter_s": round(statistics.median(bare), 3),
+        "import_s": round(statistics.median(full) - statistics.median(bare), 3),
+        "slowest": slowest_imports(),
+    }
+
+
+def _get(url: str) -> int:
+    try:
+        with urllib.request.urlopen(url, timeout=1) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+    except OSError:
+        return 0
+
+
+async def _first_frame(port: int) -> None:
+    async with connect(f"ws://127.0.0.1:{port}/ws/telemetry") as ws:
+        json.loads(await ws.recv())
+
+
+def measure_boot(env: Dict[str, str], timeout: float = 30.0) -> Dict[str, Optional[float]]:
+    port = free_port()
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        cwd=BASE_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    marks: Dict[str, Optional[float]] = {"listening_s": None, "healthy_s": None, "first_frame_s": None}
+    try:
+        deadline = started + timeout
+        while marks["listening_s"] is None and time.perf_counter() < deadline:
+            try:
+                with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                    marks["listening_s"] = time.perf_counter() - started
+            except OSError:
+                time.sleep(0.01)
+        while marks["healthy_s"] is None and time.perf_counter() < deadline:
+            if _get(f"http://127.0.0.1:{port}/api/health") == 200:
+                marks["healthy_s"] = time.perf_counter() - started
+            else:
+                time.sleep(0.01)
+        asyncio.run(asyncio.wait_for(_first_frame(port), max(0.1, deadline - time.perf_counter())))
+        marks["first_frame_s"] = time.perf_counter() - started
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+    return {k: round(v, 3) if v is not None else None for k, v in marks.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--hw-probe", action="store_true",
+                        help="boot with AUTO_CONNECT_HW=1 against a port nobody sends heartbeats to")
+    parser.add_argument("--out", help="result JSON path")
+    args = parser.parse_args()
+
+    env = {**os.environ, "AIGIS_RECORDER": "0"}
+    if args.hw_probe:
+        env.update(AUTO_CONNECT_HW="1", DRONE_PORT=f"udpin:127.0.0.1:{free_port()}")
+
+    imports = measure_import(args.runs)
+    print(f"[COLD] import backend.main: {imports['import_s']}s (interpreter {imports['interpreter_s']}s)")
+    boots = [measure_boot(env) for _ in range(args.runs)]
+    readiness = {
+        key: round(statistics.median(b[key] for b in boots), 3)
+        for key in ("listening_s", "healthy_s", "first_frame_s")
+    }
+    print(f"[COLD] listening {readiness['listening_s']}s  healthy {readiness['healthy_s']}s  "
+          f"first frame {readiness['first_frame_s']}s")
+    write_results("cold_start", {"config": vars(args), "import": imports, "readiness_median": readiness, "boots": boots}, args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Shared helpers for the localhost benchmark harness."""
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(BASE_DIR, "benchmarks", "results")
+
+
+def percentiles(values: Sequence[float], qs=(0.5, 0.95, 0.99)) -> Dict[str, Optional[float]]:
+    if not values:
+        return {f"p{int(q * 100)}": None for q in qs} | {"max": None}
+    ordered = sorted(values)
+    out = {f"p{int(q * 100)}": ordered[min(len(ordered) - 1, int(len(ordered) * q))] for q in qs}
+    out["max"] = ordered[-1]
+    return out
+
+
+def ms(stats: Dict[str, Optional[float]]) -> Dict[str, Optional[float]]:
+    return {k: round(v * 1000, 3) if v is not None else None for k, v in stats.items()}
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR, text=True).strip()
+    except Exception:
+        return None
+
+
+def environment() -> Dict[str, Any]:
+    return {
+        "git": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def write_results(name: str, results: Dict[str, Any], path: Optional[str] = None) -> str:
+    """Write one JSON document per run so results can be diffed across releases."""
+    if path is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        path = os.path.join(RESULTS_DIR, f"{name}-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(path, "w") as fh:
+        json.dump({"benchmark": name, "env": environment(), **results}, fh, indent=2)
+    print(f"[BENCH] results -> {path}")
+    return path
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class LocalServer:
+    """Runs backend.main under uvicorn on a free localhost port for the duration of a benchmark."""
+    def __init__(self, port: Optional[int] = None, env: Optional[Dict[str, str]] = None):
+        self.port = port or free_port()
+        self.env = {**os.environ, "AIGIS_RECORDER": "0", **(env or {})}
+        self.proc: Optional[subprocess.Popen] = None
+
+    @property
+    def http(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    @property
+    def ws(self) -> str:
+        return f"ws://127.0.0.1:{self.port}"
+
+    def __enter__(self):
+        self.proc = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "backend.main:app", "--host", "127.0.0.1",
+             "--port", str(self.port), "--log-level", "warning"],
+            cwd=BASE_DIR, env=self.env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        deadline = time.time() + 30
+        while time.time() < deadline:
+            try:
+                with socket.create_connection(("127.0.0.1", self.port), timeout=0.2):
+                    return self
+            except OSError:
+                time.sleep(0.05)
+        self.__exit__()
+        raise RuntimeError("backend did not start within 30 s")
+
+    def __exit__(self, *exc):
+        if self.proc is not None:
+            self.proc.terminate()
+            try:
+                self.proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+
+
+def parse_list(text: str) -> List[int]:
+    return [int(x) for x in text.split(",") if x.strip()]
@@ -0,0 +1,196 @@
+"""
+Synthetic MAVLink emitter: an autopilot that streams telemetry at configurable rates.
+
+Standalone it feeds a backend started in hardware mode:
+
+    DRONE_PORT=udpin:127.0.0.1:14550 AUTO_CONNECT_HW=1 uvicorn backend.main:app
+    python -m benchmarks.mavlink_emitter --target 127.0.0.1:14550 --ack
+
+With --ingest it instead runs MAVLinkDriver in-process on a fresh event loop,
+drives it from a separate emitter process and reports achieved ingest rate,
+sequence drops and event-loop lag:
+
+    python -m benchmarks.mavlink_emitter --ingest --scale 20 --duration 10
+"""
+import argparse
+import asyncio
+import heapq
+import math
+import multiprocessing
+import time
+from typing import Any, Dict
+
+from benchmarks.common import free_port, ms, percentiles, write_results
+
+# Roughly ArduPilot's default stream rates on a telemetry radio
+DEFAULT_RATES = {
+    "HEARTBEAT": 1.0,
+    "ATTITUDE": 10.0,
+    "GLOBAL_POSITION_INT": 5.0,
+    "VFR_HUD": 4.0,
+    "SYS_STATUS": 2.0,
+    "GPS_RAW_INT": 2.0,
+}
+
+
+def parse_rates(overrides, scale: float) -> Dict[str, float]:
+    rates = dict(DEFAULT_RATES)
+    for item in overrides or []:
+        name, _, hz = item.partition("=")
+        name = name.strip().upper()
+        if name not in DEFAULT_RATES:
+            raise ValueError(f"unknown message type {name}")
+        rates[name] = float(hz)
+    return {k: v * scale for k, v in rates.items() if v > 0}
+
+
+class SyntheticAutopilot:
+    """Generates a vehicle orbiting a fixed point; one *_send per message type."""
+    def __init__(self, target: str, ack: bool = False):
+        from pymavlink import mavutil
+        self.mavutil = mavutil
+        self.conn = mavutil.mavlink_connection(f"udpout:{target}", source_system=1, source_component=1)
+        self.mav = self.conn.mav
+        self.ack = ack
+        self.started = time.monotonic()
+        self.sent: Dict[str, int] = {}
+        self.acked = 0
+
+    def _boot_ms(self) -> int:
+        return int((time.monotonic() - self.started) * 1000) & 0xFFFFFFFF
+
+    def send(self, msg_type: str):
+        mavlink = self.mavutil.mavlink
+        t = time.monotonic() - self.started
+        lat, lon = int((47.3977 + 0.0005 * math.sin(t / 10)) * 1e7), int((8.5456 + 0.0005 * math.cos(t / 10)) * 1e7)
+        if msg_type == "HEARTBEAT":
+            self.mav.heartbeat_send(mavlink.MAV_TYPE_QUADROTOR, mavlink.MAV_AUTOPILOT_ARDUPILOTMEGA,
+                                    mavlink.MAV_MODE_FLAG_CUSTOM_MODE_ENABLED | mavlink.MAV_MODE_FLAG_SAFETY_ARMED,
+                                    4, mavlink.MAV_STATE_ACTIVE)
+        elif msg_type == "ATTITUDE":
+            self.mav.attitude_send(self._boot_ms(), 0.05 * math.sin(t), 0.05 * math.cos(t), (t / 10) % (2 * math.pi), 0, 0, 0.1)
+        elif msg_type == "GLOBAL_POSITION_INT":
+            self.mav.global_position_int_send(self._boot_ms(), lat, lon, 530_000, 30_000, 500, 0, 0, int(t * 100) % 36000)
+        elif msg_type == "VFR_HUD":
+            self.mav.vfr_hud_send(5.0, 5.0, int(t * 10) % 360, 45, 30.0, 0.0)
+        elif msg_type == "SYS_STATUS":
+            remaining = max(0, 100 - int(t / 6))
+            self.mav.sys_status_send(0, 0, 0, 300, 15_800, 1_200, remaining, 0, 0, 0, 0, 0, 0)
+        elif msg_type == "GPS_RAW_INT":
+            self.mav.gps_raw_int_send(int(t * 1e6), 3, lat, lon, 530_000, 80, 120, 500, 0, 14)
+        self.sent[msg_type] = self.sent.get(msg_type, 0) + 1
+
+    def answer_commands(self):
+        """Acknowledge any COMMAND_LONG so the backend's command queue sees ACCEPTED."""
+        while True:
+            msg = self.conn.recv_match(type="COMMAND_LONG", blocking=False)
+            if msg is None:
+                return
+            self.mav.command_ack_send(msg.command, self.mavutil.mavlink.MAV_RESULT_ACCEPTED)
+            self.acked += 1
+
+    def run(self, rates: Dict[str, float], duration: float) -> Dict[str, Any]:
+        """Earliest-deadline scheduler over all streams; absolute deadlines so rates do not drift."""
+        start = time.monotonic()
+        stop_at = start + duration
+        schedule = [(start, name) for name in rates]
+        heapq.heapify(schedule)
+        while schedule:
+            due, name = schedule[0]
+            if due >= stop_at:
+                break
+            delay = due - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            heapq.heapreplace(schedule, (due + 1.0 / rates[name], name))
+            self.send(name)
+            if self.ack:
+                self.answer_commands()
+        elapsed = time.monotonic() - start
+        return {
+            "sent": dict(self.sent),
+            "sent_rate_hz": {k: round(v / elapsed, 1) for k, v in self.sent.items()},
+            "commands_acked": self.acked,
+        }
+
+
+def _emit_process(target: str, rates: Dict[str, float], duration: float, delay: float, results):
+    autopilot = SyntheticAutopilot(target)
+    time.sleep(delay)
+    results.put(autopilot.run(rates, duration))
+
+
+async def measure_ingest(rates: Dict[str, float], duration: float) -> Dict[str, Any]:
+    """MAVLinkDriver on this loop, emitter in its own process, loop lag sampled throughout."""
+    from backend.drivers.mavlink_driver import MAVLinkDriver
+
+    port = free_port()
+    results = multiprocessing.Queue()
+    emitter = multiprocessing.Process(
+        target=_emit_process, args=(f"127.0.0.1:{port}", {**rates, "HEARTBEAT": max(rates.get("HEARTBEAT", 1.0), 1.0)}, duration, 0.5, results),
+        daemon=True)
+    emitter.start()
+
+    driver = MAVLinkDriver(f"udpin:127.0.0.1:{port}")
+    if not driver.connect():
+        emitter.terminate()
+        raise RuntimeError("driver did not see a heartbeat")
+    link = driver.primary
+
+    loop = asyncio.get_running_loop()
+    lags = []
+    version_start = driver.get_snapshot().version
+    stop_at = loop.time() + duration
+    while loop.time() < stop_at:
+        expected = loop.time() + 0.01
+        await asyncio.sleep(0.01)
+        lags.append(max(0.0, loop.time() - expected))
+    await asyncio.sleep(0.5) # drain what is still in flight
+
+    sent = await loop.run_in_executor(None, results.get, True, 30)
+    emitter.join(timeout=5)
+    received = {k: v for k, v in link.counts.items() if k in rates}
+    stats = link.stats()
+    driver.disconnect()
+    return {
+        "emitter": sent,
+        "received": received,
+        "received_rate_hz": {k: round(v / duration, 1) for k, v in received.items()},
+        "delivery_ratio": round(sum(received.values()) / max(1, sum(sent["sent"].values())), 4),
+        "dropped_seq": stats["dropped"],
+        "decode_errors": stats["decode_errors"],
+        "ingest_mode": stats["mode"],
+        "snapshot_versions": driver.get_snapshot().version - version_start,
+        "loop_lag_ms": ms(percentiles(lags)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", default="127.0.0.1:14550", help="host:port the backend listens on (udpin)")
+    parser.add_argument("--rate", action="append", metavar="TYPE=HZ", help="override a stream rate, e.g. ATTITUDE=50")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply every stream rate")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--ack", action="store_true", help="answer COMMAND_LONG with COMMAND_ACK ACCEPTED")
+    parser.add_argument("--ingest", action="store_true", help="measure MAVLinkDriver ingest in-process instead")
+    parser.add_argument("--out", help="result JSON path")
+    args = parser.parse_args()
+
+    try:
+        rates = parse_rates(args.rate, args.scale)
+    except ValueError as e:
+        parser.error(str(e))
+
+    if args.ingest:
+        results = asyncio.run(measure_ingest(rates, args.duration))
+        print(f"[MAVLINK] delivered {results['delivery_ratio'] * 100:.2f}%  "
+              f"dropped={results['dropped_seq']}  lag p99={results['loop_lag_ms']['p99']}ms")
+        write_results("mavlink_ingest", {"config": vars(args), "rates_hz": rates, **results}, args.out)
+    else:
+        results = SyntheticAutopilot(args.target, ack=args.ack).run(rates, args.duration)
+        print(f"[MAVLINK] sent {sum(results['sent'].values())} messages to {args.target}")
+        write_results("mavlink_emitter", {"config": vars(args), "rates_hz": rates, **results}, args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+REST hammer: concurrent load against the control-plane endpoints.
+
+Each worker loops over its endpoint as fast as the server answers for --duration
+seconds; reported per endpoint are throughput, latency percentiles and errors.
+Run it alongside ws_swarm to see how HTTP load bleeds into the broadcast rate.
+
+    python -m benchmarks.rest_hammer --concurrency 32 --duration 10
+    python -m benchmarks.rest_hammer --url http://127.0.0.1:8000 --endpoints status,joystick
+"""
+import argparse
+import asyncio
+import itertools
+import random
+import time
+from typing import Any, Callable, Dict, List
+
+import httpx
+
+from benchmarks.common import LocalServer, ms, percentiles, write_results
+
+# Commands cycled by the command hammer; all valid in simulation mode
+COMMAND_CYCLE = ("takeoff", "scan", "mission", "rtl")
+
+Request = Callable[[httpx.AsyncClient], Any]
+
+
+def _status(client: httpx.AsyncClient):
+    return client.get("/api/status")
+
+
+def _command(cycle):
+    def request(client: httpx.AsyncClient):
+        return client.post(f"/api/command/{next(cycle)}")
+    return request
+
+
+def _joystick(client: httpx.AsyncClient):
+    return client.post("/api/joystick", json={
+        "lv": random.uniform(-1, 1), "lh": random.uniform(-1, 1),
+        "rv": random.uniform(-1, 1), "rh": random.uniform(-1, 1),
+    })
+
+
+ENDPOINTS: Dict[str, Callable[[], Request]] = {
+    "status": lambda: _status,
+    "command": lambda: _command(itertools.cycle(COMMAND_CYCLE)),
+    "joystick": lambda: _joystick,
+}
+
+
+async def _worker(client: httpx.AsyncClient, request: Request, stop_at: float,
+                  latencies: List[float], errors: Dict[str, int]):
+    while time.perf_counter() < stop_at:
+        started = time.perf_counter()
+        try:
+            response = await request(client)
+            if response.status_code >= 400:
+                errors[str(response.status_code)] = errors.get(str(response.status_code), 0) + 1
+                continue
+        except httpx.HTTPError as e:
+            errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+            continue
+        latencies.append(time.perf_counter() - started)
+
+
+async def hammer(url: str, endpoints: List[str], concurrency: int, duration: float) -> Dict[str, Any]:
+    limits = httpx.Limits(max_connections=concurrency * len(endpoints), max_keepalive_connections=concurrency * len(endpoints))
+    results = {}
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=10.0) as client:
+        stop_at = time.perf_counter() + duration
+        runs = {name: ([], {}) for name in endpoints}
+        workers = []
+        for name, (latencies, errors) in runs.items():
+            request = ENDPOINTS[name]()
+            workers += [_worker(client, request, stop_at, latencies, errors) for _ in range(concurrency)]
+        await asyncio.gather(*workers)
+        for name, (latencies, errors) in runs.items():
+            results[name] = {
+                "requests": len(latencies),
+                "rps": round(len(latencies) / duration, 1),
+                "latency_ms": ms(percentiles(latencies)),
+                "errors": errors,
+            }
+            print(f"[REST] {name:<9} {results[name]['rps']:>8} req/s  "
+                  f"p50={results[name]['latency_ms']['p50']}ms  p99={results[name]['latency_ms']['p99']}ms  "
+                  f"errors={sum(errors.values())}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="http:// base of a running backend (default: start one on localhost)")
+    parser.add_argument("--endpoints", default="status,command,joystick", help=f"subset of {','.join(ENDPOINTS)}")
+    parser.add_argument("--concurrency", type=int, default=16, help="concurrent workers per endpoint")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--out", help="result JSON path")
+    args = parser.parse_args()
+
+    endpoints = [e.strip() for e in args.endpoints.split(",") if e.strip()]
+    unknown = set(endpoints) - set(ENDPOINTS)
+    if unknown:
+        parser.error(f"unknown endpoints: {', '.join(sorted(unknown))}")
+
+    if args.url:
+        results = asyncio.run(hammer(args.url, endpoints, args.concurrency, args.duration))
+    else:
+        with LocalServer() as server:
+            results = asyncio.run(hammer(server.http, endpoints, args.concurrency, args.duration))
+    write_results("rest_hammer", {"config": vars(args), "endpoints": results}, args.out)
+
+
+if __name__ == "__main__":
+    main()
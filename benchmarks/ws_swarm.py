@@ -0,0 +1,138 @@
+"""
+WebSocket swarm: N concurrent /ws/telemetry consoles.
+
+Measures per-client frame rate, end-to-end latency (server `ts` -> receipt, valid
+on localhost where both share a clock) and missed frames (sequence gaps). With
+--clients as a list it ramps up and reports the client count at which the
+broadcast rate collapses below --collapse x target.
+
+    python -m benchmarks.ws_swarm --clients 10,50,100,250,500 --duration 5
+    python -m benchmarks.ws_swarm --url ws://127.0.0.1:8000 --clients 200
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from typing import Any, Dict, List, Optional
+
+from websockets.asyncio.client import connect
+
+from backend.net.telemetry_codec import BINARY_FRAME, BINARY_MAGIC
+from benchmarks.common import LocalServer, ms, parse_list, percentiles, write_results
+
+
+class ClientStats:
+    def __init__(self):
+        self.frames = 0
+        self.missed = 0
+        self.latencies: List[float] = []
+        self.first: Optional[float] = None
+        self.last: Optional[float] = None
+        self.error: Optional[str] = None
+
+    @property
+    def fps(self) -> float:
+        if self.first is None or self.last is None or self.last <= self.first:
+            return 0.0
+        return (self.frames - 1) / (self.last - self.first)
+
+
+async def console(url: str, proto: str, stop_at: float, stats: ClientStats):
+    try:
+        async with connect(f"{url}/ws/telemetry?proto={proto}", max_size=None, open_timeout=30) as ws:
+            last_seq = None
+            while True:
+                remaining = stop_at - time.time()
+                if remaining <= 0:
+                    return
+                try:
+                    raw = await asyncio.wait_for(ws.recv(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    return
+                now = time.time()
+                frame = None
+                if isinstance(raw, bytes):
+                    # proto=binary: often the only payload of a tick; its header carries the seq
+                    if len(raw) < BINARY_FRAME.size or raw[0] != BINARY_MAGIC:
+                        continue
+                    seq = BINARY_FRAME.unpack_from(raw)[2]
+                elif proto == "json":
+                    seq = None
+                else:
+                    frame = json.loads(raw)
+                    seq = frame.get("seq")
+                if frame is not None and "ts" in frame:
+                    stats.latencies.append(now - frame["ts"])
+                if seq is not None and seq == last_seq:
+                    continue # JSON and binary halves of one tick count once
+                stats.frames += 1
+                stats.first = stats.first or now
+                stats.last = now
+                if last_seq is not None and seq is not None and seq > last_seq + 1:
+                    stats.missed += seq - last_seq - 1
+                if seq is not None:
+                    last_seq = seq
+    except Exception as e:
+        stats.error = f"{type(e).__name__}: {e}"
+
+
+async def run_swarm(url: str, clients: int, duration: float, proto: str, target_hz: float) -> Dict[str, Any]:
+    stop_at = time.time() + duration
+    stats = [ClientStats() for _ in range(clients)]
+    await asyncio.gather(*(console(url, proto, stop_at, s) for s in stats))
+    ok = [s for s in stats if s.error is None and s.frames > 1]
+    fps = [s.fps for s in ok]
+    latencies = [lat for s in ok for lat in s.latencies]
+    median_fps = statistics.median(fps) if fps else 0.0
+    return {
+        "clients": clients,
+        "connected": len(ok),
+        "errors": sorted({s.error for s in stats if s.error})[:5],
+        "fps": {"median": round(median_fps, 2), "min": round(min(fps), 2) if fps else 0.0,
+                "ratio_to_target": round(median_fps / target_hz, 3)},
+        "latency_ms": ms(percentiles(latencies)),
+        "frames_total": sum(s.frames for s in stats),
+        "missed_frames": sum(s.missed for s in stats),
+    }
+
+
+async def ramp(url: str, counts: List[int], duration: float, proto: str, target_hz: float, collapse: float):
+    steps, collapsed_at = [], None
+    for n in counts:
+        result = await run_swarm(url, n, duration, proto, target_hz)
+        print(f"[SWARM] {n:>5} clients  fps={result['fps']['median']:>6}  "
+              f"p95={result['latency_ms']['p95']}ms  missed={result['missed_frames']}")
+        steps.append(result)
+        if collapsed_at is None and result["fps"]["ratio_to_target"] < collapse:
+            collapsed_at = n
+    return {"steps": steps, "collapse_clients": collapsed_at}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="ws:// base of a running backend (default: start one on localhost)")
+    parser.add_argument("--clients", default="1,10,50,100", help="comma-separated client counts to ramp through")
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per step")
+    parser.add_argument("--proto", default="delta", choices=["json", "delta", "binary"])
+    parser.add_argument("--target-hz", type=float, default=12.5)
+    parser.add_argument("--collapse", type=float, default=0.9, help="fps ratio below which the broadcast counts as collapsed")
+    parser.add_argument("--out", help="result JSON path")
+    args = parser.parse_args()
+
+    counts = parse_list(args.clients)
+    config = vars(args)
+
+    def run(url):
+        return asyncio.run(ramp(url, counts, args.duration, args.proto, args.target_hz, args.collapse))
+
+    if args.url:
+        results = run(args.url)
+    else:
+        with LocalServer() as server:
+            results = run(server.ws)
+    write_results("ws_swarm", {"config": config, **results}, args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import asyncio
+
+from backend.drivers.command_queue import RESULT_ACCEPTED, RESULT_IN_PROGRESS, MAVLinkCommandQueue
+
+TAKEOFF = 22
+DENIED = 2
+
+
+class FakeDriver:
+    """Link double: records COMMAND_LONG sends and answers each with scripted (delay, result) ACKs."""
+    def __init__(self, *replies):
+        self.ack_listeners = []
+        self.replies = list(replies) # one list of ACKs per send, in send order; missing -> silence
+        self.sent = []
+        self.loop = None
+
+    def command_plan(self, command):
+        return [(TAKEOFF, [0.0] * 7)] if command == "TAKEOFF" else []
+
+    def send_command_long(self, mav_cmd, params, confirmation):
+        # Writer thread: ACKs come back on the loop later, as the reader would deliver them
+        self.sent.append(confirmation)
+        for delay, result in (self.replies.pop(0) if self.replies else []):
+            self.loop.call_soon_threadsafe(self.loop.call_later, delay, self._ack, mav_cmd, result)
+
+    def _ack(self, mav_cmd, result):
+        for listener in self.ack_listeners:
+            listener(mav_cmd, result)
+
+
+def _run(driver, command="TAKEOFF", **kwargs):
+    async def main():
+        driver.loop = asyncio.get_running_loop()
+        queue = MAVLinkCommandQueue(driver, **{"ack_timeout": 0.05, "retries": 2, "progress_timeout": 0.2, **kwargs})
+        queue.start()
+        return await queue.wait(queue.submit(command), timeout=2.0)
+    return asyncio.run(main())
+
+
+def test_accepted_first_try():
+    driver = FakeDriver([(0.0, RESULT_ACCEPTED)])
+    record = _run(driver)
+    assert (record.state, record.attempts, driver.sent) == ("ACCEPTED", 1, [0])
+
+
+def test_lost_ack_is_retried_with_confirmation_bumped():
+    driver = FakeDriver([], [], [(0.0, RESULT_ACCEPTED)])
+    record = _run(driver)
+    assert (record.state, record.attempts, driver.sent) == ("ACCEPTED", 3, [0, 1, 2])
+
+
+def test_timeout_after_retries():
+    driver = FakeDriver()
+    record = _run(driver)
+    assert record.state == "TIMEOUT"
+    assert driver.sent == [0, 1, 2]
+
+
+def test_in_progress_waits_for_final_ack_without_resending():
+    driver = FakeDriver([(0.0, RESULT_IN_PROGRESS), (0.1, RESULT_IN_PROGRESS), (0.15, RESULT_ACCEPTED)])
+    record = _run(driver)
+    assert record.state == "ACCEPTED"
+    assert driver.sent == [0] # 0.15 s > ack_timeout: a retry would have resent it
+
+
+def test_in_progress_without_final_ack_times_out_without_resending():
+    driver = FakeDriver([(0.0, RESULT_IN_PROGRESS)])
+    record = _run(driver)
+    assert record.state == "TIMEOUT" and "IN_PROGRESS" in record.detail
+    assert driver.sent == [0]
+
+
+def test_rejected_and_unsupported():
+    assert _run(FakeDriver([(0.0, DENIED)])).state == "REJECTED"
+    assert _run(FakeDriver(), command="BARREL_ROLL").state == "UNSUPPORTED"
@@ -0,0 +1,81 @@
+import math
+
+import numpy as np
+import pytest
+
+from backend.engine.planner import MAX_PATTERN_LEGS, MissionPlan, _tour, order_targets
+
+SQUARE = [[-20, -20], [20, -20], [20, 20], [-20, 20]]
+
+
+def _target(target_id, x, z, priority="MEDIUM", **extra):
+    return {"id": target_id, "x": x, "z": z, "priority": priority, **extra}
+
+
+@pytest.mark.parametrize("params", [
+    {"width": 0}, {"width": -4}, {"width": math.nan}, {"width": math.inf},
+    {"pattern": "expanding_square", "center": (0, 0), "radius": -1},
+    {"pattern": "expanding_square", "center": (0, 0), "radius": math.nan},
+    {"pattern": "zigzag", "polygon": SQUARE},
+    {"pattern": "lawnmower", "center": (0, 0)},
+    {"polygon": SQUARE[:2]},
+    {"polygon": [[0, 0], [1e6, 0], [1e6, 1e6], [0, 1e6]], "width": 1e6 / (MAX_PATTERN_LEGS + 1)},
+])
+def test_build_rejects_bad_parameters(params):
+    with pytest.raises(ValueError):
+        MissionPlan.build((0, 0), [], **params)
+
+
+def test_targets_by_priority_then_pattern_then_home():
+    targets = [_target(1, 5, 5, "LOW"), _target(2, -5, 0, "CRITICAL"), _target(3, 9, 9, "HIGH"),
+               _target(4, 1, 1, "CRITICAL", detected=True)]
+    plan = MissionPlan.build((0, 0), targets, polygon=SQUARE, width=10, home=(0, 0))
+    kinds = [w["kind"] for w in plan.waypoints]
+    assert [w["target_id"] for w in plan.waypoints if w["kind"] == "target"] == [2, 3, 1]
+    assert kinds[:3] == ["target"] * 3 and kinds[-1] == "home" and set(kinds[3:-1]) == {"search"}
+
+
+def test_add_target_stays_within_its_priority_window():
+    targets = [_target(1, 10, 0, "CRITICAL"), _target(2, 20, 0, "HIGH"), _target(3, 100, 0, "LOW")]
+    plan = MissionPlan.build((0, 0), targets)
+    plan.add_target(_target(4, 100, -5, "HIGH"), 0, 0) # cheapest right after the LOW visit, but must come before it
+    assert [w.get("target_id") for w in plan.waypoints] == [1, 2, 4, 3, None]
+
+
+def test_drop_target_and_return_home():
+    plan = MissionPlan.build((0, 0), [_target(1, 10, 0), _target(2, 20, 0)])
+    plan.drop_target(1)
+    assert [w.get("target_id") for w in plan.waypoints] == [2, None]
+    plan.return_home("commanded")
+    assert plan.current["kind"] == "home" and plan.rtl_reason == "commanded"
+
+
+def test_export_restore_resumes_at_the_head():
+    plan = MissionPlan.build((0, 0), [_target(1, 10, 0), _target(2, 20, 0)], polygon=SQUARE, reserve=30)
+    plan.steer(10, 0, 100.0) # reached target 1
+    restored = MissionPlan.restore(plan.export())
+    assert restored.waypoints == plan.waypoints[plan.index:]
+    assert restored.current == plan.current and restored.reserve == 30
+    assert restored.remaining_length(10, 0) == pytest.approx(plan.remaining_length(10, 0))
+
+
+@pytest.mark.parametrize("n", [0, 1, 2, 50, 400])
+@pytest.mark.parametrize("budget", [0.0, 0.003])
+def test_tour_visits_every_point_once(n, budget):
+    points = np.random.default_rng(n).uniform(-100, 100, (n, 2))
+    assert sorted(_tour(points, (0.0, 0.0), budget)) == list(range(n))
+
+
+def test_tour_beats_sweep_order_when_time_allows():
+    points = np.random.default_rng(7).uniform(-100, 100, (60, 2))
+
+    def length(order):
+        path = np.vstack([[0.0, 0.0], points[order]])
+        return float(np.hypot(*np.diff(path, axis=0).T).sum())
+
+    assert length(_tour(points, (0.0, 0.0), 1.0)) < length(_tour(points, (0.0, 0.0), 0.0))
+
+
+def test_order_targets_nearest_first_within_a_tier():
+    ordered = order_targets((0, 0), [_target(1, 30, 0), _target(2, 10, 0), _target(3, 20, 0)])
+    assert [t["id"] for t in ordered] == [2, 3, 1]
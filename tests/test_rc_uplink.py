@@ -0,0 +1,52 @@
+import json
+import math
+
+import pytest
+
+from backend.drivers.rc_uplink import NEUTRAL, JoystickUplink, normalize_sample, parse_sample
+
+
+def test_normalize_fills_missing_sticks():
+    sample = normalize_sample({"lv": 0.5, "rh": None}, seq=3.0, ts=1700000000000)
+    assert sample == {"vector": {**NEUTRAL, "lv": 0.5}, "seq": 3, "ts": 1700000000000.0}
+    assert isinstance(sample["seq"], int)
+
+
+def test_normalize_clamps_rounding_overshoot():
+    sample = normalize_sample({"lv": 1.0000001, "lh": -1.0000001})
+    assert sample["vector"]["lv"] == 1.0 and sample["vector"]["lh"] == -1.0
+
+
+@pytest.mark.parametrize("vector", [
+    {"lv": 1.5}, {"rv": -2}, {"lv": math.nan}, {"lh": math.inf}, {"rh": "0.5"}, {"rv": True}, [0, 0, 0, 0], None,
+])
+def test_normalize_rejects_bad_sticks(vector):
+    with pytest.raises(ValueError):
+        normalize_sample(vector)
+
+
+@pytest.mark.parametrize("seq, ts", [(1.5, None), ("7", None), (math.nan, None), (None, math.inf), (None, "now")])
+def test_normalize_rejects_bad_seq_and_ts(seq, ts):
+    with pytest.raises(ValueError):
+        normalize_sample({}, seq, ts)
+
+
+def test_parse_both_encodings():
+    compact = parse_sample(json.dumps([4, 1700000000000, 0.1, 0.2, 0.3, 0.4]))
+    verbose = parse_sample(json.dumps({"seq": 4, "ts": 1700000000000, "data": {"lv": 0.1, "lh": 0.2, "rv": 0.3, "rh": 0.4}}))
+    assert compact == verbose
+    assert compact["vector"] == {"lv": 0.1, "lh": 0.2, "rv": 0.3, "rh": 0.4}
+
+
+@pytest.mark.parametrize("raw", ["", "not json", "[]", "[1]", "42", '"x"', '[1, 0, 2, 0, 0, 0]', '{"data": {"lv": NaN}}'])
+def test_parse_malformed_is_none(raw):
+    assert parse_sample(raw) is None
+
+
+def test_uplink_drops_out_of_order_and_restarts_on_zero():
+    uplink = JoystickUplink()
+    assert uplink.submit({"lv": 0.1}, seq=5) == "accepted"
+    assert uplink.submit({"lv": 0.2}, seq=5) == "out_of_order"
+    assert uplink.submit({"lv": 0.3}, seq=4) == "out_of_order"
+    assert uplink.submit({"lv": 0.4}, seq=0) == "accepted" # client restarted its counter
+    assert uplink.poll()["lv"] == 0.4
@@ -0,0 +1,69 @@
+import gzip
+
+import pytest
+from starlette.datastructures import Headers
+
+from backend.net.static_assets import MIN_COMPRESS, AssetCache, brotli, load_asset, negotiate
+
+ALL = ("identity", "gzip", "br")
+
+
+@pytest.mark.parametrize("header, available, expected", [
+    (None, ALL, "identity"),
+    ("", ALL, "identity"),
+    ("gzip", ALL, "gzip"),
+    ("gzip, deflate, br", ALL, "br"), # equal weights: server preference
+    ("br;q=0.5, gzip", ALL, "gzip"),
+    ("BR;Q=1, gzip;q=0.9", ALL, "br"),
+    ("*", ALL, "br"),
+    ("*;q=0.2, gzip;q=0", ALL, "br"),
+    ("gzip;q=0", ALL, "identity"),
+    ("gzip;q=oops, br", ALL, "br"),
+    ("br", ("identity", "gzip"), "identity"),
+    ("deflate", ALL, "identity"),
+])
+def test_negotiate(header, available, expected):
+    assert negotiate(header, available) == expected
+
+
+@pytest.fixture
+def script(tmp_path):
+    path = tmp_path / "app.js"
+    path.write_text("console.log('aigis');\n" * (MIN_COMPRESS // 8))
+    return str(path)
+
+
+def test_load_asset_variants(script, tmp_path):
+    asset = load_asset(script)
+    assert asset.media_type in ("application/javascript", "text/javascript")
+    assert gzip.decompress(asset.variants["gzip"]) == asset.variants["identity"]
+    assert ("br" in asset.variants) == (brotli is not None)
+    assert len(set(asset.etags.values())) == len(asset.variants) # one ETag per representation
+
+    tiny = tmp_path / "tiny.js"
+    tiny.write_text("1;")
+    assert set(load_asset(str(tiny)).variants) == {"identity"}
+    assert load_asset(str(tmp_path / "missing.js")) is None
+
+
+def test_respond_negotiates_and_revalidates(script):
+    cache = AssetCache()
+    asset = cache.load(script)
+    response = cache.respond(asset, Headers({"accept-encoding": "gzip"}))
+    assert response.headers["content-encoding"] == "gzip" and response.headers["vary"] == "Accept-Encoding"
+    assert response.body == asset.variants["gzip"]
+
+    etag = response.headers["etag"]
+    assert cache.respond(asset, Headers({"accept-encoding": "gzip", "if-none-match": f"W/{etag}"})).status_code == 304
+    # Another representation's ETag does not validate this one
+    assert cache.respond(asset, Headers({"if-none-match": etag})).status_code == 200
+    assert cache.counts["gzip"] == 1 and cache.counts["not_modified"] == 1 and cache.counts["identity"] == 1
+
+
+def test_cache_budget_evicts_least_recent(script, tmp_path):
+    other = tmp_path / "other.js"
+    other.write_text("let x = 1;\n" * (MIN_COMPRESS // 4))
+    cache = AssetCache(budget=1)
+    cache.load(script)
+    cache.load(str(other))
+    assert cache.stats()["files"] == 1 and cache.bytes == cache.load(str(other)).nbytes
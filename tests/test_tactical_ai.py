@@ -0,0 +1,102 @@
+import asyncio
+
+import pytest
+
+from backend.ai.tactical_ai import StubModel, TacticalAIEngine, TokenBucket, quantize_status
+
+SEARCHING = {"state": "SEARCHING", "battery": 87.0, "altitude": 25.0}
+
+
+def _status(**changes):
+    return {**SEARCHING, **changes}
+
+
+def _insights(engine, *statuses):
+    async def main():
+        return [await engine.generate_insight(s) for s in statuses]
+    return asyncio.run(main())
+
+
+def test_quantize_status_bands():
+    assert quantize_status(SEARCHING) == quantize_status(_status(battery=80.5, altitude=29.9))
+    assert quantize_status(SEARCHING) != quantize_status(_status(battery=79.9))
+
+
+def test_token_bucket():
+    bucket = TokenBucket(rate=0.0, capacity=2)
+    assert [bucket.take() for _ in range(3)] == [True, True, False]
+    bucket = TokenBucket(rate=1000.0, capacity=1)
+    bucket.drain()
+    assert not bucket.tokens
+
+
+def test_cache_hit_within_band():
+    model = StubModel(reply="hold pattern")
+    engine = TacticalAIEngine(model=model)
+    first, second = _insights(engine, SEARCHING, _status(battery=85.0))
+    assert first == second == "GEMINI-3 FLASH // HOLD PATTERN"
+    assert len(model.calls) == 1 and engine.metrics["cache_hits"] == 1
+
+
+def test_cache_ttl_expiry():
+    model = StubModel()
+    engine = TacticalAIEngine(model=model, cache_ttl=0.0)
+    _insights(engine, SEARCHING, SEARCHING)
+    assert len(model.calls) == 2 and engine.metrics["cache_hits"] == 0
+
+
+def test_concurrent_requests_coalesce():
+    model = StubModel(delay=0.1)
+    engine = TacticalAIEngine(model=model)
+
+    async def main():
+        return await asyncio.gather(*(engine.generate_insight(SEARCHING) for _ in range(5)))
+
+    results = asyncio.run(main())
+    assert len(set(results)) == 1
+    assert len(model.calls) == 1 and engine.metrics["coalesced"] == 4
+    assert not engine.busy
+
+
+def test_rate_limit_falls_back_to_rules():
+    model = StubModel()
+    engine = TacticalAIEngine(model=model, rpm=0.0, burst=1)
+    _, limited = _insights(engine, SEARCHING, _status(state="SCANNING"))
+    assert limited.startswith("GEMINI-3 FLASH // [QUOTA_SHIELD]")
+    assert len(model.calls) == 1 and engine.metrics["rate_limited"] == 1
+
+
+def test_timeout_falls_back_to_rules():
+    engine = TacticalAIEngine(model=StubModel(delay=0.3), timeout=0.05)
+    [insight] = _insights(engine, _status(battery=15.0))
+    assert insight == "GEMINI-3 FLASH // [TIMEOUT_SHIELD] POWER CRITICAL 15%. RTL RECOMMENDED IMMEDIATELY."
+    assert engine.metrics["timeouts"] == 1 and engine.metrics["fallbacks"] == 1
+    assert not engine.cache # fallbacks are not cached; the next band change retries the model
+
+
+@pytest.mark.parametrize("error, reason, metric", [
+    (RuntimeError("boom"), "LOCAL_HEURISTICS", "errors"),
+    (RuntimeError("429 Resource has been exhausted"), "QUOTA_SHIELD", "rate_limited"),
+])
+def test_model_errors_fall_back_to_rules(error, reason, metric):
+    engine = TacticalAIEngine(model=StubModel(error=error))
+    [insight] = _insights(engine, SEARCHING)
+    assert insight == f"GEMINI-3 FLASH // [{reason}] SECTOR SWEEP NOMINAL. MAINTAIN PATTERN."
+    assert engine.metrics[metric] == 1
+    if metric == "rate_limited":
+        assert engine.bucket.tokens < 1 # 429 drains the bucket
+
+
+def test_context_is_bounded():
+    model = StubModel()
+    engine = TacticalAIEngine(model=model, burst=10, context_turns=1)
+    _insights(engine, *(_status(altitude=a) for a in (5, 15, 25, 35)))
+    assert [history for _, history in model.calls] == [0, 2, 2, 2]
+
+
+def test_offline_without_model(monkeypatch):
+    monkeypatch.delenv("GOOGLE_API_KEY", raising=False)
+    engine = TacticalAIEngine()
+    [insight] = _insights(engine, _status(state="EMERGENCY", altitude=12.0))
+    assert not engine.enabled
+    assert insight == "AIGIS // AI OFFLINE // EMERGENCY DESCENT ACTIVE. ALT 12M. CLEAR LANDING ZONE."
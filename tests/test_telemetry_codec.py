@@ -0,0 +1,126 @@
+import copy
+import json
+
+import pytest
+
+from backend.net.telemetry_codec import BINARY_FRAME, BINARY_MAGIC, BINARY_PATHS, STATE_CODES, TelemetryCodec
+
+
+def _telemetry(**status):
+    return {
+        "position": {"x": 1.0, "y": 5.0, "z": -2.0},
+        "attitude": {"pitch": 0.0, "roll": 0.0, "yaw": 0.5},
+        "status": {"battery": 100.0, "state": "IDLE", "ai_alert": "READY", "health": {"imu": "OK"}, **status},
+        "targets": [
+            {"id": 1, "x": 25, "z": 0, "detected": False},
+            {"id": 2, "x": -30, "z": -15, "detected": False},
+        ],
+        "logs": ["[00:00:01] BOOT"],
+    }
+
+
+def _apply(state, frame):
+    # What a delta client does with one "D" frame (see the telemetry_codec module docstring)
+    for path, value in frame.get("set", {}).items():
+        *parents, leaf = path.split(".")
+        node = state
+        for key in parents:
+            node = node.setdefault(key, {})
+        node[leaf] = value
+    for path in frame.get("del", []):
+        *parents, leaf = path.split(".")
+        nodes = [state]
+        for key in parents:
+            nodes.append(nodes[-1][key])
+        del nodes[-1][leaf]
+        for key, parent, node in zip(reversed(parents), reversed(nodes[:-1]), reversed(nodes[1:])):
+            if not node:
+                del parent[key] # A removed subtree arrives as its leaves
+    targets = {t["id"]: t for t in state["targets"]}
+    targets.update((t["id"], t) for t in frame.get("targets", []))
+    for target_id in frame.get("targets_removed", []):
+        targets.pop(target_id)
+    state["targets"] = list(targets.values())
+    state["logs"] = (frame.get("logs", []) + state["logs"])[:50]
+
+
+def _by_id(telemetry):
+    return {**telemetry, "targets": sorted(telemetry["targets"], key=lambda t: t["id"])}
+
+
+def _evolve():
+    # Successive broadcast states: motion, a nested change, removal, target changes, new logs
+    t0 = _telemetry()
+    t1 = copy.deepcopy(t0)
+    t1["position"]["x"] = 1.5
+    t1["status"]["state"] = "SEARCHING"
+    t1["logs"].insert(0, "[00:00:02] MISSION PLANNED")
+    t2 = copy.deepcopy(t1)
+    del t2["status"]["health"]
+    t2["targets"][0]["detected"] = True
+    t2["logs"][:0] = ["[00:00:04] TARGET 1 DETECTED", "[00:00:03] WAYPOINT"]
+    t3 = copy.deepcopy(t2)
+    t3["targets"] = [t3["targets"][0], {"id": 3, "x": 10, "z": -35, "detected": False}]
+    t3["status"]["battery"] = 99.1
+    return [t0, t1, t2, t3]
+
+
+def test_delta_stream_reconstructs_every_state():
+    codec = TelemetryCodec()
+    client = None
+    for telemetry, log_total in zip(_evolve(), (1, 2, 4, 4)):
+        frames = codec.advance(telemetry, log_total=log_total)
+        if client is None:
+            keyframe = json.loads(frames.keyframe("delta")[0])
+            assert keyframe["t"] == "K" and keyframe["seq"] == frames.seq
+            client, seq = copy.deepcopy(keyframe["state"]), keyframe["seq"]
+            continue
+        delta = json.loads(frames.delta_frame("delta")[0])
+        assert delta["t"] == "D" and delta["base"] == seq
+        _apply(client, delta)
+        seq = delta["seq"]
+        assert _by_id(client) == _by_id(telemetry)
+
+
+def test_unchanged_state_sends_empty_delta():
+    codec = TelemetryCodec()
+    telemetry = _telemetry()
+    codec.advance(telemetry, log_total=1)
+    delta = json.loads(codec.advance(copy.deepcopy(telemetry), log_total=1).delta_frame("delta")[0])
+    assert set(delta) == {"t", "seq", "base", "ts"}
+
+
+def test_binary_frame_round_trip():
+    codec = TelemetryCodec()
+    telemetry = _telemetry(state="SCANNING", battery=87.25)
+    frames = codec.advance(telemetry)
+    _, packed = frames.keyframe("binary")
+    magic, state, seq, x, y, z, pitch, roll, yaw, battery = BINARY_FRAME.unpack(packed)
+    assert (magic, STATE_CODES[state], seq) == (BINARY_MAGIC, "SCANNING", frames.seq)
+    assert (x, y, z) == pytest.approx((1.0, 5.0, -2.0))
+    assert (pitch, roll, yaw, battery) == pytest.approx((0.0, 0.0, 0.5, 87.25))
+
+
+def test_binary_delta_moves_packed_fields_out_of_json():
+    codec = TelemetryCodec()
+    telemetry = _telemetry()
+    codec.advance(telemetry)
+    moved = copy.deepcopy(telemetry)
+    moved["position"]["x"] = 4.0
+    moved["status"]["battery"] = 99.0
+    frames = codec.advance(moved)
+    assert frames.delta_frame("binary") == (frames.keyframe("binary")[1],) # Only packed fields changed: no JSON
+
+    changed = copy.deepcopy(moved)
+    changed["position"]["z"] = 7.0
+    changed["status"]["state"] = "FLYING"
+    packed, text = codec.advance(changed).delta_frame("binary")
+    assert BINARY_FRAME.unpack(packed)[5] == pytest.approx(7.0)
+    assert json.loads(text)["set"] == {"status.state": "FLYING"}
+    assert not BINARY_PATHS & set(json.loads(text)["set"])
+
+
+def test_frames_are_encoded_once():
+    frames = TelemetryCodec().advance(_telemetry())
+    assert frames.full() is frames.full()
+    assert frames.delta_frame("delta") is frames.delta_frame("delta")